@@ -1,11 +1,28 @@
+import logging
+
 import uvicorn
 
 from sara_timeseries.core.settings import settings
 
+logger = logging.getLogger(__name__)
+
 if __name__ == "__main__":
+    # uvicorn ignores workers when reloading, so run a single process then
+    workers: int = 1 if settings.RELOAD else settings.WORKERS
+    if settings.RELOAD and settings.WORKERS > 1:
+        logger.warning(
+            f"Ignoring SARA_TIMESERIES_WORKERS={settings.WORKERS} because "
+            "SARA_TIMESERIES_RELOAD is enabled, starting a single process"
+        )
+    elif workers > 1 and not settings.SHARED_CACHE_DIR:
+        logger.warning(
+            f"Starting {workers} workers without SARA_TIMESERIES_SHARED_CACHE_DIR, "
+            "each worker keeps its own caches"
+        )
     uvicorn.run(
         "sara_timeseries.app:app",
         host=settings.FAST_API_HOST,
         port=settings.FAST_API_PORT,
         reload=settings.RELOAD,
+        workers=workers,
     )
@@ -1,9 +1,22 @@
 from collections.abc import Callable
+from http import HTTPStatus
 from typing import Any
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
+from sara_timeseries.core.admission import (
+    AdmissionMiddleware,
+    AdmissionQueue,
+    build_ingest_admission,
+)
+from sara_timeseries.core.compression import CompressionMiddleware
+from sara_timeseries.core.deadline import (
+    DeadlineExceededError,
+    DeadlineMiddleware,
+    deadline_exceeded_handler,
+)
 from sara_timeseries.core.settings import settings
 from sara_timeseries.modules.sara_timeseries_api.timeseries_controller import (
     TimeseriesController,
@@ -18,9 +31,29 @@ class API:
         self,
         timeseries_controller: TimeseriesController,
         insights_controller: InsightsController,
+        ingest_admission: AdmissionQueue | None = None,
     ) -> None:
         self.timeseries_controller: TimeseriesController = timeseries_controller
         self.insights_controller: InsightsController = insights_controller
+        self.ingest_admission: AdmissionQueue = (
+            ingest_admission
+            if ingest_admission is not None
+            else build_ingest_admission()
+        )
+
+    def readiness(self) -> JSONResponse:
+        """Not ready while ingest admission is saturated, so traffic is shed elsewhere."""
+        queue: AdmissionQueue = self.ingest_admission
+        return JSONResponse(
+            {
+                "status": "saturated" if queue.saturated else "ready",
+                "ingest_in_flight": queue.in_flight,
+                "ingest_outstanding_bytes": queue.outstanding_bytes,
+            },
+            status_code=(
+                HTTPStatus.SERVICE_UNAVAILABLE if queue.saturated else HTTPStatus.OK
+            ),
+        )
 
     def create_app(self, lifespan: Callable[[FastAPI], Any] | None = None) -> FastAPI:
         app = FastAPI(
@@ -38,6 +71,32 @@ class API:
             allow_methods=["*"],
             allow_headers=["*"],
         )
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+            offload_min_bytes=settings.COMPRESSION_OFFLOAD_MIN_BYTES,
+        )
+        app.add_middleware(
+            DeadlineMiddleware,
+            default_timeout_seconds=settings.REQUEST_TIMEOUT_SECONDS,
+            route_timeouts={
+                "/insights/create-and-publish-co2-report": settings.REPORT_REQUEST_TIMEOUT_SECONDS
+            },
+        )
+        app.add_exception_handler(DeadlineExceededError, deadline_exceeded_handler)
+        app.add_middleware(
+            AdmissionMiddleware,
+            queue=self.ingest_admission,
+            method="POST",
+            path="/timeseries/datapoint",
+        )
+        app.add_api_route(
+            "/health/ready",
+            self.readiness,
+            methods=["GET"],
+            tags=["health"],
+            summary="Readiness probe, 503 while ingest admission is saturated",
+        )
         app.include_router(router=self.timeseries_controller.create_timeseries_router())
         app.include_router(router=self.insights_controller.create_insights_controller())
         return app
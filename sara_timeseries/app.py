@@ -3,20 +3,30 @@ import os
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 
+import anyio
 from fastapi import FastAPI
 
 from sara_timeseries.api import API
 from sara_timeseries.authentication import Authenticator
+from sara_timeseries.core.bulkhead import Bulkheads, build_bulkheads
 from sara_timeseries.core.logger import setup_logger
 from sara_timeseries.core.open_telemetry import setup_open_telemetry
 from sara_timeseries.core.settings import settings
-from sara_timeseries.modules.sara_timeseries_api.omnia_service import OmniaService
+from sara_timeseries.modules.sara_timeseries_api.omnia_service import (
+    OMNIA_TOKEN_SCOPE,
+    OmniaService,
+    build_omnia_credential,
+)
 from sara_timeseries.modules.sara_timeseries_api.timeseries_controller import (
     TimeseriesController,
 )
 from sara_timeseries.modules.sara_timeseries_api.timeseries_service import (
     TimeseriesService,
 )
+from sara_timeseries.modules.sara_timeseries_insights.blob_store import (
+    BLOB_TOKEN_SCOPE,
+    blob_credential,
+)
 from sara_timeseries.modules.sara_timeseries_insights.insights_controller import (
     InsightsController,
 )
@@ -35,10 +45,16 @@ if not settings.TIMESERIES_CLIENT_SECRET:
 USE_MOCK = os.getenv("USE_MOCK_TIMESERIES_API", "false").lower() == "true"
 
 # Services
+omnia_credential = build_omnia_credential(
+    client_id=settings.TIMESERIES_CLIENT_ID,
+    client_secret=settings.TIMESERIES_CLIENT_SECRET,
+    tenant_id=settings.TENANT_ID,
+)
 omnia_service = OmniaService(
     client_id=settings.TIMESERIES_CLIENT_ID,
     client_secret=settings.TIMESERIES_CLIENT_SECRET,
     tenant_id=settings.TENANT_ID,
+    credential=omnia_credential,
 )
 
 if USE_MOCK:
@@ -51,11 +67,12 @@ insights_service: InsightsService = InsightsService(
     timeseries_service=timeseries_service
 )
 # Controllers & API
+bulkheads: Bulkheads = build_bulkheads()
 timeseries_controller: TimeseriesController = TimeseriesController(
-    timeseries_service=timeseries_service
+    timeseries_service=timeseries_service, bulkheads=bulkheads
 )
 insights_controller: InsightsController = InsightsController(
-    insights_service=insights_service
+    insights_service=insights_service, bulkheads=bulkheads
 )
 api: API = API(
     timeseries_controller=timeseries_controller, insights_controller=insights_controller
@@ -66,8 +83,15 @@ authenticator = Authenticator()
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     setup_open_telemetry(app)
+    # Acquire tokens in the background so the first requests find them cached
+    if not USE_MOCK:
+        omnia_credential.prefetch(OMNIA_TOKEN_SCOPE)
+    blob_credential().prefetch(BLOB_TOKEN_SCOPE)
     await authenticator.load_config()
-    yield
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(authenticator.refresh_config_periodically)
+        yield
+        task_group.cancel_scope.cancel()
 
 
 app: FastAPI = api.create_app(lifespan=lifespan)
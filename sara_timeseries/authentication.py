@@ -1,18 +1,98 @@
+import hashlib
 import logging
+from datetime import UTC, datetime
+from typing import Any
 
+import anyio
 from fastapi import Depends, Security
+from fastapi.security import SecurityScopes
 from fastapi_azure_auth import SingleTenantAzureAuthorizationCodeBearer
 from fastapi_azure_auth.exceptions import InvalidAuthHttp
+from fastapi_azure_auth.openid_config import OpenIdConfig
 from fastapi_azure_auth.user import User
+from opentelemetry import metrics
+from starlette.requests import HTTPConnection
 
+from sara_timeseries.core.cache import MemoryCache
 from sara_timeseries.core.settings import settings
 
-azure_scheme = SingleTenantAzureAuthorizationCodeBearer(
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+_token_cache_lookups = meter.create_counter(
+    "sara_timeseries.auth.token_cache_lookups",
+    description="Bearer token validations served from (hit) or added to (miss) the cache",
+)
+
+
+class BackgroundRefreshedOpenIdConfig(OpenIdConfig):
+    """
+    OpenID configuration and signing keys that, once loaded, are only renewed
+    by refresh(), never on the request path.
+    """
+
+    def _config_is_fresh(self) -> bool:
+        return self._config_timestamp is not None
+
+    async def refresh(self) -> None:
+        async with self._refresh_lock:
+            await self._load_openid_config()
+            self._config_timestamp = datetime.now(UTC)
+
+
+class CachingAzureAuthorizationCodeBearer(SingleTenantAzureAuthorizationCodeBearer):
+    """
+    Bearer validation that remembers validated tokens. The User resolved from a
+    token whose signature and claims were verified is kept until the token's exp,
+    keyed by a hash of the token and the required scopes, so repeated requests
+    with the same token skip JWT decoding and signature verification.
+    """
+
+    def __init__(self, *args: Any, token_cache: MemoryCache, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.token_cache: MemoryCache = token_cache
+        self.openid_config: BackgroundRefreshedOpenIdConfig = (
+            BackgroundRefreshedOpenIdConfig(
+                tenant_id=self.openid_config.tenant_id,
+                app_id=self.openid_config.app_id,
+                config_url=self.openid_config.config_url,
+                http_client_config=self.openid_config.http_client_config,
+            )
+        )
+
+    async def __call__(
+        self, request: HTTPConnection, security_scopes: SecurityScopes
+    ) -> User | None:
+        access_token: str | None = await self.extract_access_token(request)
+        if access_token is None:
+            return await super().__call__(request, security_scopes)
+
+        key: str = "|".join(
+            (
+                hashlib.sha256(access_token.encode()).hexdigest(),
+                *sorted(security_scopes.scopes),
+            )
+        )
+        user: User | None = self.token_cache.get(key)
+        if user is not None:
+            _token_cache_lookups.add(1, {"result": "hit"})
+            request.state.user = user
+            return user
+
+        user = await super().__call__(request, security_scopes)
+        if user is not None:
+            _token_cache_lookups.add(1, {"result": "miss"})
+            self.token_cache.set_with_expiry(key, user, float(user.claims["exp"]))
+        return user
+
+
+azure_scheme = CachingAzureAuthorizationCodeBearer(
     app_client_id=settings.AZURE_CLIENT_ID,
     tenant_id=settings.TENANT_ID,
     scopes={
         f"api://{settings.AZURE_CLIENT_ID}/user_impersonation": "user_impersonation",
     },
+    token_cache=MemoryCache(settings.AUTH_TOKEN_CACHE_ENTRIES),
 )
 
 
@@ -40,3 +120,18 @@ class Authenticator:
         Load OpenID config on startup.
         """
         await azure_scheme.openid_config.load_config()
+
+    async def refresh_config_periodically(self) -> None:
+        """
+        Reload the OpenID config and signing keys every
+        OPENID_CONFIG_REFRESH_SECONDS, keeping the previous ones if that fails.
+        """
+        while True:
+            await anyio.sleep(settings.OPENID_CONFIG_REFRESH_SECONDS)
+            try:
+                await azure_scheme.openid_config.refresh()
+            except Exception:
+                self.logger.warning(
+                    "Failed to refresh OpenID config, keeping the current signing keys",
+                    exc_info=True,
+                )
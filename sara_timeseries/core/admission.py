@@ -0,0 +1,193 @@
+import logging
+import math
+import threading
+import time
+import weakref
+from collections.abc import Iterable
+from http import HTTPStatus
+
+from opentelemetry import metrics
+from opentelemetry.metrics import CallbackOptions, Observation
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from sara_timeseries.core.settings import settings
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+_rejected = meter.create_counter(
+    "sara_timeseries.admission.rejected",
+    description="Requests answered with 429 because their admission queue was full",
+)
+
+
+class AdmissionQueue:
+    """
+    Bounds the requests of one class that are accepted but not yet answered,
+    both by count (max_in_flight) and by declared body size (max_bytes). A
+    request that does not fit is refused up front, with a Retry-After estimated
+    from the average service time and how far over capacity the queue is.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_in_flight: int,
+        max_bytes: int,
+        max_retry_after_seconds: int = 30,
+        smoothing: float = 0.2,
+    ) -> None:
+        self.name: str = name
+        self.max_in_flight: int = max_in_flight
+        self.max_bytes: int = max_bytes
+        self.max_retry_after_seconds: int = max_retry_after_seconds
+        self.smoothing: float = smoothing
+        self.in_flight: int = 0
+        self.outstanding_bytes: int = 0
+        self.service_seconds: float = 1.0
+        self._lock = threading.Lock()
+        _queues.add(self)
+
+    @property
+    def saturated(self) -> bool:
+        return (
+            self.in_flight >= self.max_in_flight
+            or self.outstanding_bytes >= self.max_bytes
+        )
+
+    def try_admit(self, size: int) -> bool:
+        with self._lock:
+            if self.in_flight >= self.max_in_flight or (
+                # A single request larger than the byte budget is still let
+                # through on an otherwise empty queue
+                self.outstanding_bytes > 0
+                and self.outstanding_bytes + size > self.max_bytes
+            ):
+                return False
+            self.in_flight += 1
+            self.outstanding_bytes += size
+            return True
+
+    def release(self, size: int, seconds: float) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.outstanding_bytes -= size
+            self.service_seconds = (
+                1 - self.smoothing
+            ) * self.service_seconds + self.smoothing * seconds
+
+    def retry_after(self) -> int:
+        """Seconds until the queue has likely drained enough to take a request."""
+        load: float = max(
+            self.in_flight / self.max_in_flight,
+            self.outstanding_bytes / self.max_bytes,
+        )
+        return min(
+            max(math.ceil(self.service_seconds * load), 1),
+            self.max_retry_after_seconds,
+        )
+
+
+_queues: weakref.WeakSet[AdmissionQueue] = weakref.WeakSet()
+
+
+def _observe_in_flight(options: CallbackOptions) -> Iterable[Observation]:
+    for queue in list(_queues):
+        yield Observation(queue.in_flight, {"queue": queue.name})
+
+
+def _observe_outstanding_bytes(options: CallbackOptions) -> Iterable[Observation]:
+    for queue in list(_queues):
+        yield Observation(queue.outstanding_bytes, {"queue": queue.name})
+
+
+def _observe_saturated(options: CallbackOptions) -> Iterable[Observation]:
+    for queue in list(_queues):
+        yield Observation(int(queue.saturated), {"queue": queue.name})
+
+
+meter.create_observable_gauge(
+    "sara_timeseries.admission.in_flight",
+    callbacks=[_observe_in_flight],
+    description="Admitted requests not yet answered",
+)
+meter.create_observable_gauge(
+    "sara_timeseries.admission.outstanding_bytes",
+    callbacks=[_observe_outstanding_bytes],
+    description="Declared body bytes of admitted requests not yet answered",
+)
+meter.create_observable_gauge(
+    "sara_timeseries.admission.saturated",
+    callbacks=[_observe_saturated],
+    description="1 while the admission queue refuses new requests",
+)
+
+
+class AdmissionMiddleware:
+    """
+    Admits requests to the given method and path through an AdmissionQueue
+    before their body is read, answering 429 with Retry-After when it is full.
+    The slot is held until the response has been sent.
+    """
+
+    def __init__(
+        self, app: ASGIApp, queue: AdmissionQueue, method: str, path: str
+    ) -> None:
+        self.app: ASGIApp = app
+        self.queue: AdmissionQueue = queue
+        self.method: str = method
+        self.path: str = path
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != self.method
+            or scope["path"] != self.path
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        content_length: str = Headers(scope=scope).get("content-length") or "0"
+        try:
+            size: int = int(content_length)
+        except ValueError:
+            size = -1
+        if size < 0:
+            response = JSONResponse(
+                {"detail": f"Invalid Content-Length {content_length!r}"},
+                status_code=HTTPStatus.BAD_REQUEST,
+            )
+            await response(scope, receive, send)
+            return
+
+        if not self.queue.try_admit(size):
+            retry_after: int = self.queue.retry_after()
+            _rejected.add(1, {"queue": self.queue.name})
+            logger.warning(
+                f"Refusing {self.queue.name} request: {self.queue.in_flight} in flight "
+                f"with {self.queue.outstanding_bytes} bytes outstanding, retry after "
+                f"{retry_after} s"
+            )
+            response = JSONResponse(
+                {"detail": f"Too many {self.queue.name} requests in flight"},
+                status_code=HTTPStatus.TOO_MANY_REQUESTS,
+                headers={"Retry-After": str(retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        started: float = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.queue.release(size, time.perf_counter() - started)
+
+
+def build_ingest_admission() -> AdmissionQueue:
+    return AdmissionQueue(
+        "ingest",
+        max_in_flight=settings.INGEST_MAX_IN_FLIGHT,
+        max_bytes=settings.INGEST_MAX_OUTSTANDING_BYTES,
+    )
@@ -0,0 +1,145 @@
+import functools
+import logging
+import weakref
+from collections.abc import Callable, Iterable
+from http import HTTPStatus
+from typing import Any
+
+import anyio
+from fastapi import HTTPException
+from opentelemetry import metrics
+from opentelemetry.metrics import CallbackOptions, Observation
+
+from sara_timeseries.core.deadline import check_deadline
+from sara_timeseries.core.settings import settings
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+_rejected = meter.create_counter(
+    "sara_timeseries.bulkhead.rejected",
+    description="Requests rejected because their bulkhead queue was full",
+)
+
+
+class Bulkhead:
+    """
+    Dedicated worker capacity for one class of sync endpoints. At most
+    max_concurrency calls of the class run at once, in worker threads that
+    inherit the request's context variables; up to max_queue more wait for a
+    slot and any beyond that are rejected with 503, so a burst in one class
+    cannot take threads from another.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int) -> None:
+        self.name: str = name
+        self.max_concurrency: int = max_concurrency
+        self.max_queue: int = max_queue
+        self.limiter = anyio.CapacityLimiter(max_concurrency)
+        _bulkheads.add(self)
+
+    @property
+    def in_use(self) -> int:
+        return int(self.limiter.borrowed_tokens)
+
+    @property
+    def queued(self) -> int:
+        return self.limiter.statistics().tasks_waiting
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        if self.in_use >= self.max_concurrency and self.queued >= self.max_queue:
+            _rejected.add(1, {"bulkhead": self.name})
+            logger.warning(
+                f"Rejecting request: {self.name} bulkhead has {self.in_use} running "
+                f"and {self.queued} queued"
+            )
+            raise HTTPException(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                detail=f"Too many concurrent {self.name} requests",
+                headers={"Retry-After": "1"},
+            )
+
+        def run_unless_abandoned() -> Any:
+            # The request may have run out of time or lost its client while queued
+            check_deadline(f"{self.name} queue")
+            return fn(*args, **kwargs)
+
+        return await anyio.to_thread.run_sync(
+            run_unless_abandoned, limiter=self.limiter
+        )
+
+    def wrap(self, endpoint: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Turn a sync endpoint into an async one running in this bulkhead. The
+        signature is kept, so FastAPI resolves the same parameters.
+        """
+
+        @functools.wraps(endpoint)
+        async def run_in_bulkhead(*args: Any, **kwargs: Any) -> Any:
+            return await self.run(endpoint, *args, **kwargs)
+
+        return run_in_bulkhead
+
+
+class Bulkheads:
+    def __init__(self, ingest: Bulkhead, read: Bulkhead, report: Bulkhead) -> None:
+        self.ingest: Bulkhead = ingest
+        self.read: Bulkhead = read
+        self.report: Bulkhead = report
+
+
+_bulkheads: weakref.WeakSet[Bulkhead] = weakref.WeakSet()
+
+
+def _observe_in_use(options: CallbackOptions) -> Iterable[Observation]:
+    for bulkhead in list(_bulkheads):
+        yield Observation(bulkhead.in_use, {"bulkhead": bulkhead.name})
+
+
+def _observe_queued(options: CallbackOptions) -> Iterable[Observation]:
+    for bulkhead in list(_bulkheads):
+        yield Observation(bulkhead.queued, {"bulkhead": bulkhead.name})
+
+
+def _observe_utilization(options: CallbackOptions) -> Iterable[Observation]:
+    for bulkhead in list(_bulkheads):
+        yield Observation(
+            bulkhead.in_use / bulkhead.max_concurrency, {"bulkhead": bulkhead.name}
+        )
+
+
+meter.create_observable_gauge(
+    "sara_timeseries.bulkhead.in_use",
+    callbacks=[_observe_in_use],
+    description="Worker threads in use per bulkhead",
+)
+meter.create_observable_gauge(
+    "sara_timeseries.bulkhead.queued",
+    callbacks=[_observe_queued],
+    description="Requests waiting for a worker thread per bulkhead",
+)
+meter.create_observable_gauge(
+    "sara_timeseries.bulkhead.utilization",
+    callbacks=[_observe_utilization],
+    description="Fraction of a bulkhead's worker threads in use",
+)
+
+
+def build_bulkheads() -> Bulkheads:
+    return Bulkheads(
+        ingest=Bulkhead(
+            "ingest",
+            max_concurrency=settings.INGEST_WORKERS,
+            max_queue=settings.INGEST_QUEUE_LIMIT,
+        ),
+        read=Bulkhead(
+            "read",
+            max_concurrency=settings.READ_WORKERS,
+            max_queue=settings.READ_QUEUE_LIMIT,
+        ),
+        report=Bulkhead(
+            "report",
+            max_concurrency=settings.REPORT_WORKERS,
+            max_queue=settings.REPORT_QUEUE_LIMIT,
+        ),
+    )
@@ -0,0 +1,344 @@
+import hashlib
+import logging
+import os
+import struct
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from sara_timeseries.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Disk entries start with the absolute expiry time (unix seconds, 0 = never).
+_DISK_HEADER = struct.Struct("<d")
+_DISK_SUFFIX = ".cache"
+
+
+def _expires_at(ttl_seconds: float | None) -> float | None:
+    return None if ttl_seconds is None else time.time() + ttl_seconds
+
+
+def _is_expired(expires_at: float | None) -> bool:
+    return expires_at is not None and expires_at <= time.time()
+
+
+class MemoryCache:
+    """
+    Thread-safe in-process LRU cache with optional per-entry expiry. With
+    max_weight set, entries are also weighed (by weigh, e.g. len) and evicted
+    until their total weight fits; an entry heavier than max_weight is not
+    cached at all.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_weight: int | None = None,
+        weigh: Callable[[Any], int] | None = None,
+    ) -> None:
+        self.max_entries: int = max_entries
+        self.max_weight: int | None = max_weight
+        self.weigh: Callable[[Any], int] = weigh or (lambda value: 1)
+        self.weight: int = 0
+        self._entries: OrderedDict[str, tuple[Any, float | None]] = OrderedDict()
+        self._weights: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        entry = self.get_with_expiry(key)
+        return entry[0] if entry is not None else None
+
+    def get_with_expiry(self, key: str) -> tuple[Any, float | None] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if _is_expired(entry[1]):
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: Any, ttl_seconds: float | None = None) -> None:
+        self.set_with_expiry(key, value, _expires_at(ttl_seconds))
+
+    def set_with_expiry(self, key: str, value: Any, expires_at: float | None) -> None:
+        if self.max_entries <= 0:
+            return
+        weight: int = self.weigh(value) if self.max_weight is not None else 0
+        with self._lock:
+            self._remove(key)
+            if self.max_weight is not None and weight > self.max_weight:
+                return
+            self._entries[key] = (value, expires_at)
+            self._weights[key] = weight
+            self.weight += weight
+            while len(self._entries) > self.max_entries or (
+                self.max_weight is not None and self.weight > self.max_weight
+            ):
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> None:
+        if self._entries.pop(key, None) is not None:
+            self.weight -= self._weights.pop(key)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._weights.clear()
+            self.weight = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCache:
+    """
+    Size-bounded on-disk byte cache. Entries are written atomically and evicted
+    least-recently-used first (by modification time, which is refreshed on hits)
+    once the directory grows beyond max_bytes.
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int) -> None:
+        self.directory: Path = Path(directory)
+        self.max_bytes: int = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        entry = self.get_with_expiry(key)
+        return entry[0] if entry is not None else None
+
+    def get_with_expiry(self, key: str) -> tuple[bytes, float | None] | None:
+        path: Path = self._path(key)
+        try:
+            raw: bytes = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Failed to read cache entry {path}: {e}")
+            return None
+
+        if len(raw) < _DISK_HEADER.size:
+            self._unlink(path)
+            return None
+        (stored_expiry,) = _DISK_HEADER.unpack_from(raw)
+        expires_at: float | None = stored_expiry or None
+        if _is_expired(expires_at):
+            self._unlink(path)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return raw[_DISK_HEADER.size :], expires_at
+
+    def set(self, key: str, value: bytes, ttl_seconds: float | None = None) -> None:
+        self.set_with_expiry(key, value, _expires_at(ttl_seconds))
+
+    def set_with_expiry(self, key: str, value: bytes, expires_at: float | None) -> None:
+        if len(value) + _DISK_HEADER.size > self.max_bytes:
+            logger.info(
+                f"Skipping disk cache write of {len(value)} bytes, "
+                f"larger than the cache limit of {self.max_bytes} bytes"
+            )
+            return
+        path: Path = self._path(key)
+        try:
+            fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(_DISK_HEADER.pack(expires_at or 0.0))
+                fh.write(value)
+            os.replace(tmp_name, path)
+        except OSError as e:
+            logger.warning(f"Failed to write cache entry {path}: {e}")
+            return
+        self._evict()
+
+    def delete(self, key: str) -> None:
+        self._unlink(self._path(key))
+
+    def clear(self) -> None:
+        for entry in self._entries():
+            self._unlink(Path(entry.path))
+
+    def _path(self, key: str) -> Path:
+        digest: str = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}{_DISK_SUFFIX}"
+
+    def _entries(self) -> list[os.DirEntry[str]]:
+        try:
+            with os.scandir(self.directory) as it:
+                return [e for e in it if e.name.endswith(_DISK_SUFFIX)]
+        except OSError:
+            return []
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries: list[tuple[float, int, str]] = []
+            for entry in self._entries():
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total_bytes: int = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total_bytes <= self.max_bytes:
+                    break
+                self._unlink(Path(path))
+                total_bytes -= size
+
+    @staticmethod
+    def _unlink(path: Path) -> None:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Failed to remove cache entry {path}: {e}")
+
+
+class TieredCache:
+    """
+    Byte cache with a fast in-memory tier in front of an optional on-disk tier.
+    Disk hits are promoted to memory with their original expiry.
+    """
+
+    def __init__(self, memory: MemoryCache, disk: DiskCache | None = None) -> None:
+        self.memory: MemoryCache = memory
+        self.disk: DiskCache | None = disk
+
+    def get(self, key: str) -> bytes | None:
+        entry = self.memory.get_with_expiry(key)
+        if entry is not None:
+            return entry[0]
+        if self.disk is None:
+            return None
+        entry = self.disk.get_with_expiry(key)
+        if entry is None:
+            return None
+        self.memory.set_with_expiry(key, *entry)
+        return entry[0]
+
+    def set(self, key: str, value: bytes, ttl_seconds: float | None = None) -> None:
+        expires_at: float | None = _expires_at(ttl_seconds)
+        self.memory.set_with_expiry(key, value, expires_at)
+        if self.disk is not None:
+            self.disk.set_with_expiry(key, value, expires_at)
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+
+class SharedCache(TieredCache):
+    """
+    TieredCache whose disk tier lives in a directory shared by all worker
+    processes, so one worker's fetch serves the others. Keys are qualified by
+    the current epoch, a random token stored next to the entries; invalidate()
+    replaces it, which makes everything cached before, by any worker and in
+    either tier, unreachable. Other workers pick up a new epoch on their next
+    lookup. Without a disk tier the cache and its epoch are per process.
+    """
+
+    def __init__(self, memory: MemoryCache, disk: DiskCache | None = None) -> None:
+        super().__init__(memory, disk)
+        self._epoch_path: Path | None = (
+            disk.directory / "epoch" if disk is not None else None
+        )
+        self._epoch: str = ""
+        self._epoch_version: tuple[int, int] | None = None
+        self._lock = threading.Lock()
+
+    def epoch(self) -> str:
+        if self._epoch_path is None:
+            return self._epoch
+        try:
+            stat = os.stat(self._epoch_path)
+        except FileNotFoundError:
+            return ""
+        except OSError as e:
+            logger.warning(f"Failed to read cache epoch {self._epoch_path}: {e}")
+            return self._epoch
+        # The epoch file is replaced rather than rewritten, so a new inode or
+        # modification time means another process invalidated the cache
+        version: tuple[int, int] = (stat.st_ino, stat.st_mtime_ns)
+        with self._lock:
+            if version != self._epoch_version:
+                try:
+                    self._epoch = self._epoch_path.read_text()
+                    self._epoch_version = version
+                except OSError as e:
+                    logger.warning(
+                        f"Failed to read cache epoch {self._epoch_path}: {e}"
+                    )
+            return self._epoch
+
+    def invalidate(self) -> None:
+        epoch: str = uuid.uuid4().hex
+        if self._epoch_path is None:
+            self._epoch = epoch
+            return
+        try:
+            fd, tmp_name = tempfile.mkstemp(dir=self._epoch_path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w") as fh:
+                fh.write(epoch)
+            os.replace(tmp_name, self._epoch_path)
+        except OSError as e:
+            logger.warning(f"Failed to invalidate cache {self._epoch_path.parent}: {e}")
+            self.memory.clear()
+
+    def get(self, key: str) -> bytes | None:
+        return super().get(self._qualify(key))
+
+    def set(self, key: str, value: bytes, ttl_seconds: float | None = None) -> None:
+        super().set(self._qualify(key), value, ttl_seconds)
+
+    def delete(self, key: str) -> None:
+        super().delete(self._qualify(key))
+
+    def _qualify(self, key: str) -> str:
+        return f"{self.epoch()}|{key}"
+
+
+def build_shared_cache(
+    namespace: str,
+    memory_entries: int,
+    max_bytes: int,
+    directory: str | None = None,
+) -> SharedCache:
+    """
+    Shared cache stored in directory, or in the namespace's subdirectory of
+    SHARED_CACHE_DIR. Memory only when neither is set or usable.
+    """
+    disk: DiskCache | None = None
+    if directory is None and settings.SHARED_CACHE_DIR:
+        directory = str(Path(settings.SHARED_CACHE_DIR) / namespace)
+    if directory:
+        try:
+            disk = DiskCache(directory, max_bytes=max_bytes)
+        except OSError as e:
+            logger.warning(
+                f"Cache directory {directory} for {namespace} is unavailable, "
+                f"falling back to an in-memory cache: {e}"
+            )
+    return SharedCache(memory=MemoryCache(max_entries=memory_entries), disk=disk)
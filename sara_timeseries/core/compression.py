@@ -0,0 +1,267 @@
+import zlib
+from collections.abc import Callable
+from typing import Protocol
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:  # Python 3.14+
+    from compression import zstd  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - depends on the interpreter
+    zstd = None
+
+try:
+    import brotli  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# Already compressed payloads gain nothing from another pass
+INCOMPRESSIBLE_MEDIA_TYPES: frozenset[str] = frozenset(
+    {
+        "image/png",
+        "image/jpeg",
+        "image/webp",
+        "application/vnd.apache.parquet",
+        "application/zip",
+        "application/gzip",
+    }
+)
+
+
+class _Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes: ...
+
+    def finish(self) -> bytes: ...
+
+
+class _GzipCompressor:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _ZstdCompressor:
+    def __init__(self, level: int) -> None:
+        self._compressor = zstd.ZstdCompressor(level=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(mode=zstd.ZstdCompressor.FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(mode=zstd.ZstdCompressor.FLUSH_FRAME)
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def available_encodings() -> list[str]:
+    """Supported content codings, most preferred first."""
+    encodings: list[str] = []
+    if zstd is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+
+def select_encoding(accept_encoding: str, encodings: list[str]) -> str | None:
+    """
+    Pick the first supported coding the client accepts with a non-zero quality.
+    Ties are broken by server preference, as clients rarely rank codings.
+    """
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, parameters = part.strip().partition(";")
+        quality: float = 1.0
+        name, _, value = parameters.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = quality
+
+    wildcard: float = accepted.get("*", 0.0)
+    candidates: list[tuple[float, int, str]] = [
+        (accepted.get(encoding, wildcard), -preference, encoding)
+        for preference, encoding in enumerate(encodings)
+    ]
+    quality, _, encoding = max(candidates)
+    return encoding if quality > 0 else None
+
+
+class CompressionMiddleware:
+    """
+    Negotiated response compression (zstd, brotli or gzip, depending on what the
+    interpreter and the client support). Complete bodies below minimum_size are
+    sent as is; streamed bodies are compressed and flushed chunk by chunk so they
+    stay incremental. Chunks of at least offload_min_bytes are compressed on a
+    worker thread to keep the event loop responsive.
+
+    Strong ETags set by the application are suffixed with the coding, as the
+    compressed body is a different representation (see core.etag). Every response
+    that could be compressed carries Vary: Accept-Encoding, whether or not this
+    one was, so shared caches never serve one client's coding to another.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        offload_min_bytes: int = 256 * 1024,
+        gzip_level: int = 6,
+        zstd_level: int = 3,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app: ASGIApp = app
+        self.minimum_size: int = minimum_size
+        self.offload_min_bytes: int = offload_min_bytes
+        self.encodings: list[str] = available_encodings()
+        self._factories: dict[str, Callable[[], _Compressor]] = {
+            "gzip": lambda: _GzipCompressor(gzip_level),
+            "zstd": lambda: _ZstdCompressor(zstd_level),
+            "br": lambda: _BrotliCompressor(brotli_quality),
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding: str | None = select_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), self.encodings
+        )
+        responder = _CompressionResponder(
+            send,
+            encoding=encoding,
+            compressor_factory=self._factories[encoding] if encoding else None,
+            minimum_size=self.minimum_size,
+            offload_min_bytes=self.offload_min_bytes,
+        )
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(
+        self,
+        send: Send,
+        encoding: str | None,
+        compressor_factory: Callable[[], _Compressor] | None,
+        minimum_size: int,
+        offload_min_bytes: int,
+    ) -> None:
+        self._send: Send = send
+        self.encoding: str | None = encoding
+        self.compressor_factory: Callable[[], _Compressor] | None = compressor_factory
+        self.minimum_size: int = minimum_size
+        self.offload_min_bytes: int = offload_min_bytes
+        self._start_message: Message | None = None
+        self._compressor: _Compressor | None = None
+        self._passthrough: bool = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self._start_message = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+
+        if self._start_message is not None:
+            start_message: Message = self._start_message
+            self._start_message = None
+            headers = MutableHeaders(raw=start_message["headers"])
+            negotiable: bool = self._should_compress(start_message["status"], headers)
+            if negotiable:
+                headers.add_vary_header("Accept-Encoding")
+            if (
+                not negotiable
+                or self.compressor_factory is None
+                or (not more_body and len(body) < self.minimum_size)
+            ):
+                self._passthrough = True
+                await self._send(start_message)
+                await self._send(message)
+                return
+
+            assert self.encoding is not None
+            self._compressor = self.compressor_factory()
+            self._update_headers(headers, self.encoding)
+            if more_body:
+                del headers["Content-Length"]
+                await self._send(start_message)
+            else:
+                compressed: bytes = await self._run(self._compress_final, body)
+                headers["Content-Length"] = str(len(compressed))
+                await self._send(start_message)
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+
+        if self._passthrough or self._compressor is None:
+            await self._send(message)
+            return
+
+        chunk: bytes = await self._run(
+            self._compress_final if not more_body else self._compress_chunk, body
+        )
+        await self._send(
+            {"type": "http.response.body", "body": chunk, "more_body": more_body}
+        )
+
+    def _should_compress(self, status: int, headers: MutableHeaders) -> bool:
+        if status < 200 or status in (204, 304):
+            return False
+        if "content-encoding" in headers:
+            return False
+        media_type: str = headers.get("content-type", "").split(";")[0].strip()
+        return media_type.lower() not in INCOMPRESSIBLE_MEDIA_TYPES
+
+    @staticmethod
+    def _update_headers(headers: MutableHeaders, encoding: str) -> None:
+        headers["Content-Encoding"] = encoding
+        etag: str | None = headers.get("etag")
+        if etag is not None and etag.endswith('"') and not etag.startswith("W/"):
+            headers["ETag"] = f'{etag[:-1]}-{encoding}"'
+
+    async def _run(self, function: Callable[[bytes], bytes], data: bytes) -> bytes:
+        if len(data) >= self.offload_min_bytes:
+            return await anyio.to_thread.run_sync(function, data)
+        return function(data)
+
+    def _compress_chunk(self, data: bytes) -> bytes:
+        assert self._compressor is not None
+        return self._compressor.compress(data) + self._compressor.flush()
+
+    def _compress_final(self, data: bytes) -> bytes:
+        assert self._compressor is not None
+        return self._compressor.compress(data) + self._compressor.finish()
@@ -1,13 +1,27 @@
+import logging
 import os
+import threading
+import time
 from collections.abc import Callable
+from typing import Any
 
-from azure.core.credentials import TokenCredential
+from azure.core.credentials import AccessToken, TokenCredential
 from azure.identity import (
     AzureCliCredential,
     ChainedTokenCredential,
     ClientSecretCredential,
     WorkloadIdentityCredential,
 )
+from opentelemetry import metrics
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+_acquisitions = meter.create_counter(
+    "sara_timeseries.credentials.token_acquisitions",
+    description="Tokens acquired from the identity provider, in the background or "
+    "blocking a caller",
+)
 
 # Env vars injected by the workload-identity webhook on pods whose service
 # account is annotated with ``azure.workload.identity/client-id``.
@@ -116,3 +130,142 @@ def build_credential(
     if len(credentials) == 1:
         return credentials[0]
     return ChainedTokenCredential(*credentials)
+
+
+_TokenKey = tuple[tuple[str, ...], bool]
+
+
+class CachingTokenCredential:
+    """Cache tokens per scope and refresh them in the background before expiry.
+
+    Only the very first token for a scope is acquired on the caller's thread.
+    Afterwards a background thread re-acquires it ``refresh_before_seconds``
+    before it expires (or halfway through its lifetime for short-lived
+    tokens), so callers are always served from the cache. A failed refresh is
+    retried every ``retry_seconds`` while the cached token is still valid.
+    Requests carrying ``claims`` or ``tenant_id`` (claims challenges) bypass
+    the cache.
+
+    Args:
+        credential: the credential tokens are acquired from.
+        name: label for logs and metrics.
+        refresh_before_seconds: how long before expiry a token is refreshed.
+        retry_seconds: delay before retrying a failed background refresh.
+    """
+
+    def __init__(
+        self,
+        credential: TokenCredential,
+        name: str = "default",
+        refresh_before_seconds: float = 300.0,
+        retry_seconds: float = 30.0,
+    ) -> None:
+        self.credential: TokenCredential = credential
+        self.name: str = name
+        self.refresh_before_seconds: float = refresh_before_seconds
+        self.retry_seconds: float = retry_seconds
+        self._tokens: dict[_TokenKey, AccessToken] = {}
+        self._refresh_at: dict[_TokenKey, float] = {}
+        self._fetch_locks: dict[_TokenKey, threading.Lock] = {}
+        self._condition = threading.Condition()
+        self._refresher: threading.Thread | None = None
+        self._closed: bool = False
+
+    def get_token(
+        self,
+        *scopes: str,
+        claims: str | None = None,
+        tenant_id: str | None = None,
+        enable_cae: bool = False,
+        **kwargs: Any,
+    ) -> AccessToken:
+        if claims or tenant_id or kwargs:
+            return self.credential.get_token(
+                *scopes,
+                claims=claims,
+                tenant_id=tenant_id,
+                enable_cae=enable_cae,
+                **kwargs,
+            )
+        key: _TokenKey = (scopes, enable_cae)
+        token: AccessToken | None = self._tokens.get(key)
+        if token is not None and token.expires_on > time.time():
+            return token
+        return self._acquire(key, blocking=True)
+
+    def prefetch(self, *scopes: str) -> None:
+        """Acquire a token for scopes in the background, ahead of the first call."""
+        self._schedule((scopes, False), time.time())
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def _acquire(self, key: _TokenKey, blocking: bool) -> AccessToken:
+        with self._condition:
+            lock: threading.Lock = self._fetch_locks.setdefault(key, threading.Lock())
+        with lock:
+            token: AccessToken | None = self._tokens.get(key)
+            # Another caller may have acquired it while this one waited
+            if blocking and token is not None and token.expires_on > time.time():
+                return token
+            scopes, enable_cae = key
+            token = self.credential.get_token(*scopes, enable_cae=enable_cae)
+            _acquisitions.add(1, {"credential": self.name, "blocking": blocking})
+            if blocking:
+                logger.info(
+                    f"Acquired {self.name} token for {scopes} on the request path"
+                )
+            self._tokens[key] = token
+            now: float = time.time()
+            lifetime: float = max(token.expires_on - now, 0.0)
+            self._schedule(
+                key,
+                token.expires_on - min(self.refresh_before_seconds, lifetime / 2),
+            )
+            return token
+
+    def _schedule(self, key: _TokenKey, refresh_at: float) -> None:
+        with self._condition:
+            self._refresh_at[key] = refresh_at
+            if self._refresher is None:
+                self._refresher = threading.Thread(
+                    target=self._refresh_forever,
+                    name=f"{self.name}-token-refresh",
+                    daemon=True,
+                )
+                self._refresher.start()
+            self._condition.notify_all()
+
+    def _refresh_forever(self) -> None:
+        while True:
+            with self._condition:
+                while not self._closed:
+                    now: float = time.time()
+                    due: list[_TokenKey] = [
+                        k for k, at in self._refresh_at.items() if at <= now
+                    ]
+                    if due:
+                        break
+                    next_refresh: float | None = min(
+                        self._refresh_at.values(), default=None
+                    )
+                    self._condition.wait(
+                        None if next_refresh is None else next_refresh - now
+                    )
+                if self._closed:
+                    return
+                for key in due:
+                    del self._refresh_at[key]
+
+            for key in due:
+                try:
+                    self._acquire(key, blocking=False)
+                except Exception:
+                    logger.warning(
+                        f"Failed to refresh {self.name} token for {key[0]}, "
+                        f"retrying in {self.retry_seconds} s",
+                        exc_info=True,
+                    )
+                    self._schedule(key, time.time() + self.retry_seconds)
@@ -0,0 +1,175 @@
+import logging
+import math
+import threading
+import time
+from contextvars import ContextVar
+from http import HTTPStatus
+
+import anyio
+from opentelemetry import metrics
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+DEADLINE_HEADER: str = "X-Request-Timeout"
+
+_cancelled = meter.create_counter(
+    "sara_timeseries.requests.cancelled",
+    description="Requests whose remaining work was abandoned, by reason and stage",
+)
+
+
+class DeadlineExceededError(Exception):
+    """Raised by cooperative checks once the request's budget is spent."""
+
+    def __init__(self, reason: str, stage: str) -> None:
+        super().__init__(f"Request abandoned at {stage}: {reason}")
+        self.reason: str = reason
+        self.stage: str = stage
+
+
+class Deadline:
+    """
+    Time budget of one request, shared by everything working on its behalf. It
+    runs out when the timeout passes or when it is cancelled because the client
+    disconnected. Work is not interrupted; it checks the deadline before each
+    expensive step and bounds its waits by the remaining time.
+    """
+
+    def __init__(self, timeout_seconds: float, route: str) -> None:
+        self.route: str = route
+        self.expires_at: float = time.monotonic() + timeout_seconds
+        self.reason: str = "deadline"
+        self._cancelled = threading.Event()
+        self._counted: bool = False
+        self._lock = threading.Lock()
+
+    def remaining(self) -> float:
+        if self._cancelled.is_set():
+            return 0.0
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def cancel(self, reason: str) -> None:
+        if not self._cancelled.is_set():
+            self.reason = reason
+            self._cancelled.set()
+
+    def check(self, stage: str) -> None:
+        if not self.expired:
+            return
+        with self._lock:
+            first: bool = not self._counted
+            self._counted = True
+        if first:
+            _cancelled.add(1, {"reason": self.reason, "stage": stage})
+            logger.warning(
+                f"Abandoning {self.route} at {stage}: {self.reason.replace('_', ' ')}"
+            )
+        raise DeadlineExceededError(self.reason, stage)
+
+
+_current_deadline: ContextVar[Deadline | None] = ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Deadline | None:
+    return _current_deadline.get()
+
+
+def check_deadline(stage: str) -> None:
+    """Raise DeadlineExceededError if the current request's budget is spent."""
+    deadline: Deadline | None = _current_deadline.get()
+    if deadline is not None:
+        deadline.check(stage)
+
+
+def remaining_seconds(limit: float | None = None) -> float | None:
+    """Timeout for a downstream wait: limit, shrunk to the request's remaining budget."""
+    deadline: Deadline | None = _current_deadline.get()
+    if deadline is None:
+        return limit
+    remaining: float = deadline.remaining()
+    return remaining if limit is None else min(limit, remaining)
+
+
+async def deadline_exceeded_handler(request: Request, error: Exception) -> JSONResponse:
+    return JSONResponse({"detail": str(error)}, status_code=HTTPStatus.GATEWAY_TIMEOUT)
+
+
+class DeadlineMiddleware:
+    """
+    Gives every request a Deadline: the route's default timeout, shortened by
+    the client's X-Request-Timeout header (seconds). The client connection is
+    watched for the whole request, so a disconnect cancels the deadline and with
+    it the remaining work.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        default_timeout_seconds: float,
+        route_timeouts: dict[str, float] | None = None,
+    ) -> None:
+        self.app: ASGIApp = app
+        self.default_timeout_seconds: float = default_timeout_seconds
+        self.route_timeouts: dict[str, float] = route_timeouts or {}
+
+    def timeout_for(self, path: str, requested: str | None) -> float:
+        timeout: float = self.route_timeouts.get(path, self.default_timeout_seconds)
+        if requested:
+            try:
+                timeout = min(timeout, max(float(requested), 0.0))
+            except ValueError:
+                logger.debug(f"Ignoring invalid {DEADLINE_HEADER} header {requested}")
+        return timeout
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        deadline = Deadline(
+            self.timeout_for(scope["path"], Headers(scope=scope).get(DEADLINE_HEADER)),
+            scope["path"],
+        )
+        messages_in, messages_out = anyio.create_memory_object_stream[Message](math.inf)
+
+        async def watch_client() -> None:
+            async with messages_in:
+                while True:
+                    message: Message = await receive()
+                    if message["type"] == "http.disconnect":
+                        deadline.cancel("client_disconnected")
+                    await messages_in.send(message)
+                    if message["type"] == "http.disconnect":
+                        return
+
+        async def receive_watched() -> Message:
+            try:
+                return await messages_out.receive()
+            except anyio.EndOfStream:
+                return {"type": "http.disconnect"}
+
+        token = _current_deadline.set(deadline)
+        error: Exception | None = None
+        try:
+            async with anyio.create_task_group() as task_group:
+                task_group.start_soon(watch_client)
+                try:
+                    await self.app(scope, receive_watched, send)
+                except Exception as e:  # noqa: BLE001
+                    # Re-raised below, unwrapped from the task group's ExceptionGroup
+                    error = e
+                task_group.cancel_scope.cancel()
+        finally:
+            _current_deadline.reset(token)
+            messages_out.close()
+        if error is not None:
+            raise error
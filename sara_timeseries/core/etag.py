@@ -0,0 +1,57 @@
+import hashlib
+from http import HTTPStatus
+
+from fastapi import Request, Response
+
+from sara_timeseries.core.compression import available_encodings
+
+
+def compute_etag(body: bytes) -> str:
+    """Strong entity tag derived from the response body."""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip().removeprefix("W/")
+    # The compression middleware suffixes tags with the content coding
+    for encoding in available_encodings():
+        suffix: str = f'-{encoding}"'
+        if tag.endswith(suffix):
+            return f'{tag.removesuffix(suffix)}"'
+    return tag
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an entity tag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        _opaque_tag(candidate) == _opaque_tag(etag)
+        for candidate in if_none_match.split(",")
+    )
+
+
+def tag_response(response: Response) -> Response:
+    """Tag the response with a strong ETag over its body."""
+    response.headers["ETag"] = compute_etag(bytes(response.body))
+    return response
+
+
+def conditional_response(request: Request, response: Response) -> Response:
+    """
+    Tag the response with a strong ETag over its body and evaluate If-None-Match
+    against it. A match answers GET and HEAD with 304 Not Modified and any other
+    method with 412 Precondition Failed (RFC 9110, section 13.1.2), so only use
+    this before the request has had side effects.
+    """
+    tag_response(response)
+    etag: str = response.headers["ETag"]
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        if request.method in ("GET", "HEAD"):
+            return Response(status_code=HTTPStatus.NOT_MODIFIED, headers={"ETag": etag})
+        return Response(
+            status_code=HTTPStatus.PRECONDITION_FAILED, headers={"ETag": etag}
+        )
+    return response
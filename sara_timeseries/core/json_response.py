@@ -0,0 +1,56 @@
+from typing import Any
+
+import orjson
+import pandas as pd
+from fastapi.responses import JSONResponse
+from pandas import DataFrame
+
+_ORJSON_OPTIONS: int = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any) -> Any:
+    # Missing values (NaT, pd.NA) serialize as null, pandas timestamps like datetimes
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize straight to JSON bytes. NaN and infinity become null, datetimes are
+    written as ISO-8601 and numpy scalars and arrays are supported natively.
+    """
+    return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+
+
+def dataframe_to_records(dataframe: DataFrame) -> list[dict]:
+    """
+    Column-wise equivalent of DataFrame.to_dict("records") that yields plain Python
+    values (datetimes instead of pandas timestamps), so the records can be handed
+    to orjson without a per-value fallback.
+    """
+    columns: list[list] = [
+        (
+            list(series.dt.to_pydatetime())
+            if pd.api.types.is_datetime64_any_dtype(series)
+            else series.tolist()
+        )
+        for _, series in dataframe.items()
+    ]
+    names: list[str] = [str(name) for name in dataframe.columns]
+    return [dict(zip(names, row, strict=True)) for row in zip(*columns, strict=True)]
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response serialized with orjson. Returning it from an endpoint also skips
+    FastAPI's response model validation and jsonable_encoder pass, so the content
+    must already be JSON compatible as described by the route's response model.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, DataFrame):
+            content = dataframe_to_records(content)
+        return dumps(content)
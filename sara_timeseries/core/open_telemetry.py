@@ -3,17 +3,23 @@ from __future__ import annotations
 import logging
 
 from fastapi import FastAPI
-from opentelemetry import trace
+from opentelemetry import metrics, trace
 from opentelemetry._logs import set_logger_provider
 from opentelemetry.exporter.otlp.proto.grpc._log_exporter import (
     OTLPLogExporter as OTLPGrpcLogExporter,
 )
+from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import (
+    OTLPMetricExporter as OTLPGrpcMetricExporter,
+)
 from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import (
     OTLPSpanExporter as OTLPGrpcSpanExporter,
 )
 from opentelemetry.exporter.otlp.proto.http._log_exporter import (
     OTLPLogExporter as OTLPHttpLogExporter,
 )
+from opentelemetry.exporter.otlp.proto.http.metric_exporter import (
+    OTLPMetricExporter as OTLPHttpMetricExporter,
+)
 from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
     OTLPSpanExporter as OTLPHttpSpanExporter,
 )
@@ -21,6 +27,11 @@ from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
 from opentelemetry.instrumentation.requests import RequestsInstrumentor
 from opentelemetry.sdk._logs import LoggerProvider, LoggingHandler
 from opentelemetry.sdk._logs.export import BatchLogRecordProcessor, LogExporter
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import (
+    MetricExporter,
+    PeriodicExportingMetricReader,
+)
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter
@@ -47,11 +58,13 @@ def setup_open_telemetry(app: FastAPI | None = None) -> None:
 
     span_exporter: SpanExporter
     log_exporter: LogExporter
+    metric_exporter: MetricExporter
 
     if protocol == "http":
         base = endpoint.rstrip("/")
         span_exporter = OTLPHttpSpanExporter(endpoint=f"{base}/v1/traces")
         log_exporter = OTLPHttpLogExporter(endpoint=f"{base}/v1/logs")  # type: ignore
+        metric_exporter = OTLPHttpMetricExporter(endpoint=f"{base}/v1/metrics")
     elif protocol == "grpc":
         span_exporter = OTLPGrpcSpanExporter(
             endpoint=endpoint,
@@ -61,6 +74,7 @@ def setup_open_telemetry(app: FastAPI | None = None) -> None:
             endpoint=endpoint,
             insecure=True,
         )  # type: ignore
+        metric_exporter = OTLPGrpcMetricExporter(endpoint=endpoint, insecure=True)
     else:
         raise ValueError(
             f"Unknown OTLP protocol: {protocol!r} (expected 'grpc' or 'http')"
@@ -71,6 +85,14 @@ def setup_open_telemetry(app: FastAPI | None = None) -> None:
     tracer_provider.add_span_processor(BatchSpanProcessor(span_exporter))
     trace.set_tracer_provider(tracer_provider)
 
+    # --- Metrics ---
+    metrics.set_meter_provider(
+        MeterProvider(
+            resource=resource,
+            metric_readers=[PeriodicExportingMetricReader(metric_exporter)],
+        )
+    )
+
     # --- Logs ---
     log_provider = LoggerProvider(resource=resource)
     log_provider.add_log_record_processor(BatchLogRecordProcessor(log_exporter))
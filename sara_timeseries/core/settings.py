@@ -7,6 +7,9 @@ class Settings(BaseSettings):
     FAST_API_HOST: str = Field(default="0.0.0.0")
     FAST_API_PORT: int = Field(default=8200)
     RELOAD: bool = Field(default=False)
+    # Uvicorn worker processes. Concurrency limits, bulkheads and admission
+    # queues apply per worker; set SHARED_CACHE_DIR so workers share caches.
+    WORKERS: int = Field(default=1)
 
     TENANT_ID: str = Field(default="3aa4a235-b6e2-48d5-9195-7fcf05b459b0")
 
@@ -26,11 +29,20 @@ class Settings(BaseSettings):
         default_factory=lambda: ["WorkloadIdentity", "AzureCli"]
     )
 
+    # Validated bearer tokens are cached until they expire; the OpenID config
+    # and signing keys are refreshed in the background at this interval
+    AUTH_TOKEN_CACHE_ENTRIES: int = Field(default=1024)
+    OPENID_CONFIG_REFRESH_SECONDS: float = Field(default=3600.0)
+
     # Service principle authentication
     TIMESERIES_CLIENT_ID: str = Field(default="38ab1ef9-d7ea-4e2b-ae4c-466ca70a1093")
     TIMESERIES_CLIENT_SECRET: str | None = Field(default=None)
     USE_OMNIA_TIMESERIES_TEST_ENVIRONMENT: bool = Field(default=True)
 
+    # Cached Omnia and blob tokens are refreshed in the background this long
+    # before they expire, so requests never wait on token acquisition
+    TOKEN_REFRESH_BEFORE_SECONDS: float = Field(default=300.0)
+
     # OpenTelemetry
     OTEL_SERVICE_NAME: str = Field(default="sara-timeseries")
     OTEL_EXPORTER_OTLP_ENDPOINT: str = Field(default="http://localhost:4317")
@@ -41,6 +53,100 @@ class Settings(BaseSettings):
         default="https://saradevstoretime.blob.core.windows.net"
     )
 
+    # Directory for caches shared by all worker processes (timeseries catalog,
+    # map blobs and reports), one subdirectory each. Caches are per process when
+    # unset.
+    SHARED_CACHE_DIR: str | None = Field(default=None)
+    CATALOG_CACHE_TTL_SECONDS: int = Field(default=300)
+    CATALOG_CACHE_MAX_BYTES: int = Field(default=64 * 1024 * 1024)
+    MAP_CACHE_TTL_SECONDS: int = Field(default=300)
+    MAP_CACHE_MAX_BYTES: int = Field(default=256 * 1024 * 1024)
+
+    # Report cache. Stored in REPORT_CACHE_DIR when set, otherwise in the shared
+    # cache directory; mount a persistent volume there to keep renders across
+    # pod restarts.
+    REPORT_CACHE_MEMORY_ENTRIES: int = Field(default=16)
+    REPORT_CACHE_DIR: str | None = Field(default=None)
+    REPORT_CACHE_MAX_BYTES: int = Field(default=512 * 1024 * 1024)
+    # Windows ending within the grace period may still receive late datapoints
+    # and are cached with a TTL; older windows are considered closed and cached
+    # without expiry.
+    REPORT_CACHE_OPEN_WINDOW_TTL_SECONDS: int = Field(default=300)
+    REPORT_CACHE_CLOSED_WINDOW_GRACE_SECONDS: int = Field(default=3600)
+    # Interpolated concentration surfaces, keyed by facility and data fingerprint
+    INTERPOLATION_CACHE_ENTRIES: int = Field(default=8)
+
+    # Consolidations over windows at least this long are computed from Omnia
+    # server-side aggregates when no exact order statistic is requested
+    AGGREGATE_READ_MIN_WINDOW_HOURS: float = Field(default=24)
+
+    # Measurement read planning. Requests are split so that each is expected to
+    # return at most QUERY_MAX_ROWS_PER_REQUEST rows, with up to
+    # QUERY_MAX_PARALLELISM requests in flight per read.
+    QUERY_MAX_ROWS_PER_REQUEST: int = Field(default=50_000)
+    QUERY_MAX_PARALLELISM: int = Field(default=4)
+    # Other reads are chunked adaptively: chunks start at QUERY_CHUNK_TARGET_ROWS
+    # expected rows and are tuned between QUERY_CHUNK_MIN_ROWS and
+    # QUERY_MAX_ROWS_PER_REQUEST towards QUERY_CHUNK_TARGET_SECONDS per request.
+    QUERY_CHUNK_TARGET_ROWS: int = Field(default=20_000)
+    QUERY_CHUNK_MIN_ROWS: int = Field(default=1_000)
+    QUERY_CHUNK_TARGET_SECONDS: float = Field(default=2.0)
+    # Reads of closed windows (ended at least the grace period ago) are cached,
+    # bounded by entry count and total rows; larger reads are not cached
+    MEASUREMENT_CACHE_ENTRIES: int = Field(default=8)
+    MEASUREMENT_CACHE_MAX_ROWS: int = Field(default=200_000)
+    MEASUREMENT_CACHE_MAX_ENTRY_ROWS: int = Field(default=50_000)
+    MEASUREMENT_CACHE_CLOSED_WINDOW_GRACE_SECONDS: int = Field(default=3600)
+
+    # Worker threads and queue limits per endpoint class (bulkheads). Requests
+    # beyond WORKERS + QUEUE_LIMIT of a class are rejected with 503.
+    INGEST_WORKERS: int = Field(default=16)
+    INGEST_QUEUE_LIMIT: int = Field(default=64)
+    READ_WORKERS: int = Field(default=16)
+    READ_QUEUE_LIMIT: int = Field(default=64)
+    REPORT_WORKERS: int = Field(default=4)
+    REPORT_QUEUE_LIMIT: int = Field(default=8)
+    # Request deadlines. Clients may shorten them with an X-Request-Timeout header
+    # (seconds); work for a request is abandoned once its deadline passes or the
+    # client disconnects.
+    REQUEST_TIMEOUT_SECONDS: float = Field(default=60.0)
+    REPORT_REQUEST_TIMEOUT_SECONDS: float = Field(default=300.0)
+    # Ingest admission control. Datapoint writes beyond these in flight (or
+    # outstanding body bytes) are refused with 429 and a computed Retry-After,
+    # and the readiness probe reports not ready while the limits are reached.
+    INGEST_MAX_IN_FLIGHT: int = Field(default=64)
+    INGEST_MAX_OUTSTANDING_BYTES: int = Field(default=1024 * 1024)
+
+    # Omnia calls are split into ingest and read traffic, each with its own
+    # adaptive (AIMD) concurrency limit, starting at *_CONCURRENCY and growing up
+    # to *_MAX_CONCURRENCY, and its own circuit breaker. Calls slower than
+    # OMNIA_LATENCY_THRESHOLD_SECONDS shrink the limit like 429/5xx responses do.
+    OMNIA_INGEST_CONCURRENCY: int = Field(default=8)
+    OMNIA_INGEST_MAX_CONCURRENCY: int = Field(default=32)
+    OMNIA_READ_CONCURRENCY: int = Field(default=8)
+    OMNIA_READ_MAX_CONCURRENCY: int = Field(default=32)
+    OMNIA_LATENCY_THRESHOLD_SECONDS: float = Field(default=5.0)
+    OMNIA_ACQUIRE_TIMEOUT_SECONDS: float = Field(default=10.0)
+    # The circuit opens for OMNIA_CIRCUIT_OPEN_SECONDS once this fraction of recent
+    # calls (at least OMNIA_CIRCUIT_MIN_CALLS) failed with 429/5xx or timeouts
+    OMNIA_CIRCUIT_FAILURE_RATE: float = Field(default=0.5)
+    OMNIA_CIRCUIT_MIN_CALLS: int = Field(default=20)
+    OMNIA_CIRCUIT_OPEN_SECONDS: float = Field(default=30.0)
+
+    # Hedged Omnia reads. When enabled, a duplicate of a slow idempotent read is
+    # issued after OMNIA_HEDGE_DELAY_MS, or the observed p95 latency when unset,
+    # and the first response wins. Hedges are capped at OMNIA_HEDGE_BUDGET_RATIO
+    # of all reads.
+    OMNIA_HEDGING_ENABLED: bool = Field(default=False)
+    OMNIA_HEDGE_DELAY_MS: int | None = Field(default=None)
+    OMNIA_HEDGE_MIN_DELAY_MS: int = Field(default=50)
+    OMNIA_HEDGE_BUDGET_RATIO: float = Field(default=0.1)
+
+    # Response compression. Bodies below the minimum are sent uncompressed;
+    # chunks from the offload size upwards are compressed on a worker thread.
+    COMPRESSION_MINIMUM_SIZE: int = Field(default=1024)
+    COMPRESSION_OFFLOAD_MIN_BYTES: int = Field(default=256 * 1024)
+
     # Application settings
     LIB_LOG_LEVEL: str = Field(
         default="INFO"
@@ -0,0 +1,90 @@
+import logging
+import threading
+from collections.abc import Callable, Hashable
+from typing import Any, TypeVar
+
+from opentelemetry import metrics
+
+from sara_timeseries.core.deadline import (
+    DeadlineExceededError,
+    check_deadline,
+    remaining_seconds,
+)
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+T = TypeVar("T")
+
+_executions = meter.create_counter(
+    "sara_timeseries.single_flight.executions",
+    description="Computations started by a single-flight group",
+)
+_coalesced = meter.create_counter(
+    "sara_timeseries.single_flight.coalesced",
+    description="Requests served by joining an identical in-flight computation",
+)
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.waiters: int = 0
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent identical calls: while a computation for a key is in
+    flight, callers with the same key wait for it and all receive its result (or
+    its exception) instead of starting their own. Nothing is kept once the
+    computation finishes. Followers wait no longer than their own request's
+    deadline, and if the leader's request is abandoned they start over rather
+    than inherit its cancellation.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name: str = name
+        self._calls: dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        while True:
+            with self._lock:
+                call: _Call | None = self._calls.get(key)
+                leader: bool = call is None
+                if call is None:
+                    call = self._calls[key] = _Call()
+                else:
+                    call.waiters += 1
+            if leader:
+                break
+
+            _coalesced.add(1, {"operation": self.name})
+            while not call.done.wait(remaining_seconds()):
+                check_deadline(self.name)
+            if isinstance(call.error, DeadlineExceededError):
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        _executions.add(1, {"operation": self.name})
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            if call.waiters:
+                logger.info(
+                    f"Coalesced {call.waiters} concurrent {self.name} requests into one"
+                )
+            call.done.set()
+
+    def in_flight(self) -> int:
+        return len(self._calls)
@@ -0,0 +1,151 @@
+import logging
+import math
+import threading
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+from omnia_timeseries.models import TimeseriesModel
+
+logger = logging.getLogger(__name__)
+
+MAX_TIME_SLICES_PER_SERIES: int = 256
+
+
+class Chunk(NamedTuple):
+    series: list[TimeseriesModel]
+    start_time: datetime
+    end_time: datetime
+    expected_rows: float
+    reason: str
+
+
+class AdaptiveChunker:
+    """
+    Splits multi-datapoint reads into chunks of about target_rows expected
+    datapoints. Sparse series are packed together, up to max_series_per_request
+    per chunk; a series expected to exceed the target on its own is split into
+    contiguous time slices. Expected rows come from the observed datapoints per
+    hour of each series, and target_rows is tuned after every chunk: shrunk when
+    a chunk takes longer than target_seconds, grown when a full chunk returns
+    well within it.
+    """
+
+    def __init__(
+        self,
+        target_rows: int = 20_000,
+        min_rows: int = 1_000,
+        max_rows: int = 50_000,
+        target_seconds: float = 2.0,
+        max_series_per_request: int = 100,
+        default_rows_per_hour: float = 1.0,
+        smoothing: float = 0.3,
+    ) -> None:
+        self.target_rows: int = target_rows
+        self.min_rows: int = min_rows
+        self.max_rows: int = max_rows
+        self.target_seconds: float = target_seconds
+        self.max_series_per_request: int = max_series_per_request
+        self.default_rows_per_hour: float = default_rows_per_hour
+        self.smoothing: float = smoothing
+        self._rows_per_hour: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def rows_per_hour(self, timeseries_id: str) -> float:
+        return self._rows_per_hour.get(timeseries_id, self.default_rows_per_hour)
+
+    def plan(
+        self,
+        timeseries: list[TimeseriesModel],
+        start_time: datetime,
+        end_time: datetime,
+    ) -> list[Chunk]:
+        """Chunks covering every series over the whole window, in series order."""
+        hours: float = max((end_time - start_time) / timedelta(hours=1), 0.0)
+        target_rows: int = self.target_rows
+        chunks: list[Chunk] = []
+        group: list[TimeseriesModel] = []
+        group_rows: float = 0.0
+
+        def flush() -> None:
+            if group:
+                chunks.append(
+                    Chunk(
+                        list(group),
+                        start_time,
+                        end_time,
+                        group_rows,
+                        f"{len(group)} series packed",
+                    )
+                )
+                group.clear()
+
+        for series in timeseries:
+            expected_rows: float = self.rows_per_hour(series["id"]) * hours
+            if expected_rows > target_rows:
+                flush()
+                group_rows = 0.0
+                slices: int = min(
+                    math.ceil(expected_rows / target_rows), MAX_TIME_SLICES_PER_SERIES
+                )
+                chunks.extend(
+                    self._time_slices(
+                        series, start_time, end_time, expected_rows, slices
+                    )
+                )
+                continue
+            if group and (
+                len(group) >= self.max_series_per_request
+                or group_rows + expected_rows > target_rows
+            ):
+                flush()
+                group_rows = 0.0
+            group.append(series)
+            group_rows += expected_rows
+        flush()
+
+        return chunks
+
+    def observe(self, chunk: Chunk, rows_by_id: dict[str, int], seconds: float) -> None:
+        """Learn the density of the chunk's series and retune target_rows."""
+        hours: float = (chunk.end_time - chunk.start_time) / timedelta(hours=1)
+        rows: int = sum(rows_by_id.values())
+        with self._lock:
+            if hours > 0:
+                for series in chunk.series:
+                    observed: float = rows_by_id.get(series["id"], 0) / hours
+                    self._rows_per_hour[series["id"]] = (
+                        1 - self.smoothing
+                    ) * self.rows_per_hour(series["id"]) + self.smoothing * observed
+
+            target_rows: int = self.target_rows
+            if seconds > self.target_seconds and rows > 0:
+                target_rows = int(target_rows * self.target_seconds / seconds)
+            elif rows >= 0.8 * target_rows and seconds < self.target_seconds / 2:
+                target_rows = int(target_rows * 1.25)
+            target_rows = min(max(target_rows, self.min_rows), self.max_rows)
+            if target_rows != self.target_rows:
+                logger.debug(
+                    f"Chunk of {rows} rows took {seconds:.3f} s, adjusting target rows "
+                    f"per request from {self.target_rows} to {target_rows}"
+                )
+                self.target_rows = target_rows
+
+    @staticmethod
+    def _time_slices(
+        series: TimeseriesModel,
+        start_time: datetime,
+        end_time: datetime,
+        expected_rows: float,
+        slices: int,
+    ) -> list[Chunk]:
+        length: timedelta = (end_time - start_time) / slices
+        return [
+            Chunk(
+                [series],
+                start_time + index * length,
+                end_time if index == slices - 1 else start_time + (index + 1) * length,
+                expected_rows / slices,
+                f"dense series split into {slices} time slices",
+            )
+            for index in range(slices)
+        ]
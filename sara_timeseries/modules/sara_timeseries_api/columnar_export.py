@@ -0,0 +1,136 @@
+import io
+from collections.abc import Iterable, Iterator
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from omnia_timeseries.models import TimeseriesModel
+
+DATAPOINT_FIELDS: list[pa.Field] = [
+    pa.field("time", pa.timestamp("ns", tz="UTC")),
+    pa.field("value", pa.float64()),
+    pa.field("status", pa.int32()),
+]
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object collecting whatever the writer emitted since the last drain."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._position: int = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:  # type: ignore[override]
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data: bytes = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def build_export_schema(timeseries: list[TimeseriesModel]) -> pa.Schema:
+    """
+    Schema of the flattened datapoints: the datapoint fields followed by every
+    series field (including metadata keys) found in the catalog. Series types are
+    inferred from the catalog values, strings are dictionary encoded as they repeat
+    for every datapoint of a series.
+    """
+    series_values: dict[str, list] = {}
+    for series in timeseries:
+        flattened: dict = {k: v for k, v in series.items() if k != "metadata"}
+        metadata = series.get("metadata")
+        if isinstance(metadata, dict):
+            flattened.update(metadata)
+        for key, value in flattened.items():
+            series_values.setdefault(key, []).append(value)
+
+    datapoint_names: set[str] = {field.name for field in DATAPOINT_FIELDS}
+    fields: list[pa.Field] = list(DATAPOINT_FIELDS)
+    for name, values in series_values.items():
+        if name in datapoint_names:
+            continue
+        try:
+            value_type: pa.DataType = pa.array(values).type
+        except pa.ArrowException:
+            value_type = pa.string()
+        if pa.types.is_null(value_type) or not (
+            pa.types.is_boolean(value_type)
+            or pa.types.is_integer(value_type)
+            or pa.types.is_floating(value_type)
+        ):
+            value_type = pa.dictionary(pa.int32(), pa.string())
+        fields.append(pa.field(name, value_type))
+
+    return pa.schema(fields)
+
+
+def rows_to_record_batch(rows: list[dict], schema: pa.Schema) -> pa.RecordBatch:
+    """Convert flattened datapoints to a record batch; keys outside the schema are dropped."""
+    columns: list[pa.Array] = []
+    for field in schema:
+        values: list = [row.get(field.name) for row in rows]
+        if field.name == "time":
+            columns.append(
+                pa.array(
+                    pd.to_datetime(values, utc=True, format="ISO8601"), type=field.type
+                )
+            )
+        elif pa.types.is_dictionary(field.type):
+            columns.append(
+                pa.array(
+                    [None if v is None else str(v) for v in values], pa.string()
+                ).dictionary_encode()
+            )
+        else:
+            columns.append(pa.array(values, type=field.type))
+
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def write_arrow_stream(
+    schema: pa.Schema, batches: Iterable[pa.RecordBatch]
+) -> Iterator[bytes]:
+    """Encode the batches as an Arrow IPC stream, yielding bytes after every batch."""
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        yield sink.drain()
+        for batch in batches:
+            if batch.num_rows:
+                writer.write_batch(batch)
+                yield sink.drain()
+    yield sink.drain()
+
+
+def write_parquet(
+    schema: pa.Schema, batches: Iterable[pa.RecordBatch]
+) -> Iterator[bytes]:
+    """
+    Encode the batches as a Parquet file with one row group per batch, yielding
+    bytes as row groups are flushed. The footer is written last.
+    """
+    sink = _ChunkSink()
+    dictionary_columns: list[str] = [
+        field.name for field in schema if pa.types.is_dictionary(field.type)
+    ]
+    with pq.ParquetWriter(
+        sink,
+        schema,
+        use_dictionary=dictionary_columns,
+        compression="zstd",
+        store_schema=True,
+    ) as writer:
+        for batch in batches:
+            if batch.num_rows:
+                writer.write_batch(batch)
+                yield sink.drain()
+    yield sink.drain()
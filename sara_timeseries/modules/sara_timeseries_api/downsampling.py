@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+from sara_timeseries.modules.sara_timeseries_api.models import DownsamplingMethod
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: keep the first and last point and, from each
+    of max_points - 2 equally sized buckets in between, the point spanning the
+    largest triangle with the previously kept point and the next bucket's mean.
+    Returns the sorted indices of the kept points.
+    """
+    n: int = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    edges: np.ndarray = np.linspace(1, n - 1, max_points - 1).astype(np.intp)
+    # Mean point of every bucket, plus the last point as the final "next bucket"
+    counts: np.ndarray = np.diff(edges)
+    mean_x: np.ndarray = np.append(
+        np.add.reduceat(x[1:-1], edges[:-1] - 1) / counts, x[-1]
+    )
+    mean_y: np.ndarray = np.append(
+        np.add.reduceat(y[1:-1], edges[:-1] - 1) / counts, y[-1]
+    )
+
+    selected: np.ndarray = np.empty(max_points, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    previous: int = 0
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        areas: np.ndarray = np.abs(
+            (x[previous] - mean_x[bucket + 1]) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (mean_y[bucket + 1] - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return selected
+
+
+def min_max_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Split the interior of the series into max_points // 2 - 1 equally sized
+    buckets and keep the minimum and maximum of each, plus the first and last
+    point. Returns the sorted indices of the kept points.
+    """
+    n: int = len(y)
+    if max_points >= n:
+        return np.arange(n)
+    buckets: int = max_points // 2 - 1
+    if buckets < 1:
+        return np.array([0, n - 1])
+
+    size: int = -(-(n - 2) // buckets)
+    padded: np.ndarray = np.full(buckets * size, np.nan)
+    padded[: n - 2] = y[1:-1].astype(np.float64)
+    grid: np.ndarray = padded.reshape(buckets, size)
+    valid: np.ndarray = ~np.all(np.isnan(grid), axis=1)
+    offsets: np.ndarray = np.arange(buckets)[valid] * size + 1
+    minima: np.ndarray = offsets + np.nanargmin(grid[valid], axis=1)
+    maxima: np.ndarray = offsets + np.nanargmax(grid[valid], axis=1)
+
+    return np.unique(np.concatenate(([0, n - 1], minima, maxima)))
+
+
+def downsample_indices(
+    times: list[str], values: list[float], max_points: int, method: DownsamplingMethod
+) -> np.ndarray:
+    """Indices of the datapoints of one time-ordered series to keep."""
+    y: np.ndarray = np.asarray(values, dtype=np.float64)
+    if method == DownsamplingMethod.MIN_MAX:
+        return min_max_indices(y, max_points)
+    x: np.ndarray = pd.to_datetime(times, utc=True, format="ISO8601").asi8
+    return lttb_indices(x, y, max_points)
+
+
+def downsample_rows(
+    rows: list[dict], max_points: int, method: DownsamplingMethod
+) -> list[dict]:
+    """
+    Downsample flattened datapoints to at most max_points per series (grouped by
+    id), keeping the original row order.
+    """
+    positions_by_series: dict[str, list[int]] = {}
+    for position, row in enumerate(rows):
+        positions_by_series.setdefault(row["id"], []).append(position)
+
+    kept: list[int] = []
+    for positions in positions_by_series.values():
+        keep: np.ndarray = downsample_indices(
+            [rows[p]["time"] for p in positions],
+            [rows[p]["value"] for p in positions],
+            max_points,
+            method,
+        )
+        kept.extend(positions[i] for i in keep)
+
+    return [rows[p] for p in sorted(kept)]
+
+
+def downsample_series(
+    series: dict, max_points: int, method: DownsamplingMethod
+) -> dict:
+    """Downsample the parallel time, value and status arrays of one series."""
+    keep: np.ndarray = downsample_indices(
+        series["time"], series["value"], max_points, method
+    )
+    return {
+        **series,
+        **{
+            column: [series[column][i] for i in keep]
+            for column in ("time", "value", "status")
+        },
+    }
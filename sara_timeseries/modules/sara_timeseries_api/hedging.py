@@ -0,0 +1,184 @@
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from typing import TypeVar
+
+from opentelemetry import metrics
+
+from sara_timeseries.core.deadline import check_deadline, remaining_seconds
+from sara_timeseries.core.settings import settings
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+T = TypeVar("T")
+
+_hedges = meter.create_counter(
+    "sara_timeseries.omnia.hedged_requests",
+    description="Duplicate Omnia reads issued after the hedge delay",
+)
+_hedge_wins = meter.create_counter(
+    "sara_timeseries.omnia.hedge_wins",
+    description="Hedged Omnia reads where the duplicate answered first",
+)
+
+
+class LatencyTracker:
+    """Sliding window of recent latencies per operation."""
+
+    def __init__(self, window: int = 500) -> None:
+        self.window: int = window
+        self._samples: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, operation: str, seconds: float) -> None:
+        with self._lock:
+            samples: deque[float] | None = self._samples.get(operation)
+            if samples is None:
+                samples = self._samples[operation] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def count(self, operation: str) -> int:
+        return len(self._samples.get(operation, ()))
+
+    def percentile(self, operation: str, percentile: float) -> float | None:
+        with self._lock:
+            samples: list[float] = sorted(self._samples.get(operation, ()))
+        if not samples:
+            return None
+        return samples[min(int(len(samples) * percentile), len(samples) - 1)]
+
+
+class HedgeBudget:
+    """
+    Token bucket capping hedges to a fraction of all requests: every request
+    earns ratio tokens, up to burst, and every hedge spends one.
+    """
+
+    def __init__(self, ratio: float = 0.1, burst: float = 10.0) -> None:
+        self.ratio: float = ratio
+        self.burst: float = burst
+        self._tokens: float = burst
+        self._lock = threading.Lock()
+
+    def earn(self) -> None:
+        with self._lock:
+            self._tokens = min(self._tokens + self.ratio, self.burst)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class Hedger:
+    """
+    Runs idempotent reads with hedging: if the first attempt has not answered
+    after the hedge delay, a duplicate is issued (budget permitting) and the
+    first successful response wins. The delay is fixed when delay_seconds is
+    given, otherwise the observed latency percentile of the operation, bounded
+    below by min_delay_seconds. The losing attempt is left to finish in the
+    background; its result is discarded.
+    """
+
+    def __init__(
+        self,
+        budget: HedgeBudget | None = None,
+        delay_seconds: float | None = None,
+        min_delay_seconds: float = 0.05,
+        percentile: float = 0.95,
+        min_samples: int = 20,
+        max_workers: int = 32,
+    ) -> None:
+        self.budget: HedgeBudget = budget or HedgeBudget()
+        self.delay_seconds: float | None = delay_seconds
+        self.min_delay_seconds: float = min_delay_seconds
+        self.percentile: float = percentile
+        self.min_samples: int = min_samples
+        self.latencies: LatencyTracker = LatencyTracker()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="omnia-hedge"
+        )
+
+    def hedge_delay(self, operation: str) -> float | None:
+        if self.delay_seconds is not None:
+            return self.delay_seconds
+        if self.latencies.count(operation) < self.min_samples:
+            return None
+        observed: float | None = self.latencies.percentile(operation, self.percentile)
+        if observed is None:
+            return None
+        return max(observed, self.min_delay_seconds)
+
+    def call(self, operation: str, fn: Callable[[], T]) -> T:
+        self.budget.earn()
+        delay: float | None = self.hedge_delay(operation)
+        if delay is None:
+            return self._timed(operation, fn)
+
+        primary: Future[T] = self._submit(operation, fn)
+        try:
+            return primary.result(timeout=remaining_seconds(delay))
+        except TimeoutError:
+            check_deadline(operation)
+        if not self.budget.try_spend():
+            return self._result(operation, primary)
+
+        _hedges.add(1, {"operation": operation})
+        logger.debug(f"Hedging {operation} after {delay:.3f} s")
+        hedge: Future[T] = self._submit(operation, fn)
+        pending: set[Future[T]] = {primary, hedge}
+        error: BaseException | None = None
+        while pending:
+            done, pending = wait(
+                pending, timeout=remaining_seconds(), return_when=FIRST_COMPLETED
+            )
+            if not done:
+                check_deadline(operation)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        _hedge_wins.add(1, {"operation": operation})
+                    return future.result()
+                error = error or future.exception()
+        assert error is not None
+        raise error
+
+    def _submit(self, operation: str, fn: Callable[[], T]) -> Future[T]:
+        # Attempts run with the caller's context (trace and request deadline)
+        return self._executor.submit(copy_context().run, self._timed, operation, fn)
+
+    @staticmethod
+    def _result(operation: str, future: Future[T]) -> T:
+        """Wait for an attempt no longer than the request's remaining budget."""
+        while True:
+            try:
+                return future.result(timeout=remaining_seconds())
+            except TimeoutError:
+                check_deadline(operation)
+
+    def _timed(self, operation: str, fn: Callable[[], T]) -> T:
+        started: float = time.perf_counter()
+        result: T = fn()
+        self.latencies.record(operation, time.perf_counter() - started)
+        return result
+
+
+def build_hedger() -> Hedger | None:
+    if not settings.OMNIA_HEDGING_ENABLED:
+        return None
+    return Hedger(
+        budget=HedgeBudget(ratio=settings.OMNIA_HEDGE_BUDGET_RATIO),
+        delay_seconds=(
+            settings.OMNIA_HEDGE_DELAY_MS / 1000
+            if settings.OMNIA_HEDGE_DELAY_MS is not None
+            else None
+        ),
+        min_delay_seconds=settings.OMNIA_HEDGE_MIN_DELAY_MS / 1000,
+    )
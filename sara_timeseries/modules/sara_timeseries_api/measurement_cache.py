@@ -0,0 +1,94 @@
+import logging
+from datetime import UTC, datetime, timedelta
+
+from sara_timeseries.core.cache import MemoryCache
+from sara_timeseries.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize_time(timestamp: datetime) -> str:
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=UTC)
+    return timestamp.astimezone(UTC).isoformat()
+
+
+class MeasurementCache:
+    """
+    Cache for flattened measurement reads of closed windows, keyed by facility,
+    normalized time window and read variant (raw, or the aggregate functions and
+    processing interval). Windows that may still receive datapoints are never
+    cached, and neither are reads of more than max_entry_rows rows.
+    """
+
+    def __init__(
+        self,
+        cache: MemoryCache,
+        closed_window_grace: timedelta = timedelta(hours=1),
+        max_entry_rows: int | None = None,
+    ) -> None:
+        self.cache: MemoryCache = cache
+        self.closed_window_grace: timedelta = closed_window_grace
+        self.max_entry_rows: int | None = max_entry_rows
+
+    def is_closed_window(self, end_time: datetime) -> bool:
+        if end_time.tzinfo is None:
+            end_time = end_time.replace(tzinfo=UTC)
+        return end_time <= datetime.now(UTC) - self.closed_window_grace
+
+    def get(
+        self,
+        facility: str,
+        start_time: datetime,
+        end_time: datetime,
+        variant: str = "raw",
+    ) -> list[dict] | None:
+        if not self.is_closed_window(end_time):
+            return None
+        return self.cache.get(self._key(facility, start_time, end_time, variant))
+
+    def put(
+        self,
+        facility: str,
+        start_time: datetime,
+        end_time: datetime,
+        rows: list[dict],
+        variant: str = "raw",
+    ) -> None:
+        if not self.is_closed_window(end_time):
+            return
+        if self.max_entry_rows is not None and len(rows) > self.max_entry_rows:
+            logger.debug(
+                f"Not caching {len(rows)} rows for {facility}, above the limit of "
+                f"{self.max_entry_rows}"
+            )
+            return
+        self.cache.set(self._key(facility, start_time, end_time, variant), rows)
+
+    @staticmethod
+    def _key(
+        facility: str, start_time: datetime, end_time: datetime, variant: str
+    ) -> str:
+        return "|".join(
+            (
+                "co2-measurements",
+                facility.lower(),
+                _normalize_time(start_time),
+                _normalize_time(end_time),
+                variant,
+            )
+        )
+
+
+def build_measurement_cache() -> MeasurementCache:
+    return MeasurementCache(
+        cache=MemoryCache(
+            max_entries=settings.MEASUREMENT_CACHE_ENTRIES,
+            max_weight=settings.MEASUREMENT_CACHE_MAX_ROWS,
+            weigh=len,
+        ),
+        closed_window_grace=timedelta(
+            seconds=settings.MEASUREMENT_CACHE_CLOSED_WINDOW_GRACE_SECONDS
+        ),
+        max_entry_rows=settings.MEASUREMENT_CACHE_MAX_ENTRY_ROWS,
+    )
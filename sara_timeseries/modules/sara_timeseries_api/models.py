@@ -1,6 +1,9 @@
+import base64
 from datetime import datetime
+from enum import StrEnum
+from typing import Self
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class RequestModel(BaseModel):
@@ -35,5 +38,142 @@ class CO2ConcentrationRequestModel(BaseModel):
     inspection_name: str
 
 
+class CO2ConcentrationTaskModel(BaseModel):
+    inspection_name: str
+    task_start_time: datetime
+    task_end_time: datetime
+
+
+class CO2ConcentrationBatchRequestModel(BaseModel):
+    facility: str
+    tasks: list[CO2ConcentrationTaskModel] = Field(min_length=1, max_length=1000)
+
+
+class CO2ConcentrationResultModel(CO2ConcentrationTaskModel):
+    status_code: int
+    value: float | None = None
+    detail: str | None = None
+
+
+class CO2ConcentrationBatchResponseModel(BaseModel):
+    results: list[CO2ConcentrationResultModel]
+
+
+class DownsamplingMethod(StrEnum):
+    LTTB = "lttb"
+    MIN_MAX = "min_max"
+
+
+class DownsamplingMetadataModel(BaseModel):
+    method: DownsamplingMethod
+    max_points: int
+    original_points: int
+    returned_points: int
+    reduction_ratio: float
+
+
 class DatapointsResponseModel(BaseModel):
     data: list[dict]
+    downsampling: DownsamplingMetadataModel | None = None
+
+
+class MeasurementsFormat(StrEnum):
+    FLAT = "flat"
+    NORMALIZED = "normalized"
+
+
+NORMALIZED_MEASUREMENTS_MEDIA_TYPE: str = "application/vnd.sara.normalized+json"
+
+
+class SeriesDatapointsModel(BaseModel):
+    metadata: dict
+    time: list[str]
+    value: list[float]
+    status: list[int]
+
+
+class NormalizedDatapointsResponseModel(BaseModel):
+    series: list[SeriesDatapointsModel]
+    downsampling: DownsamplingMetadataModel | None = None
+
+
+class ExportFormat(StrEnum):
+    ARROW = "arrow"
+    PARQUET = "parquet"
+
+    @property
+    def media_type(self) -> str:
+        return {
+            ExportFormat.ARROW: "application/vnd.apache.arrow.stream",
+            ExportFormat.PARQUET: "application/vnd.apache.parquet",
+        }[self]
+
+
+class PlanSource(StrEnum):
+    CACHE = "cache"
+    LIVE = "live"
+
+
+class ReadMode(StrEnum):
+    RAW = "raw"
+    AGGREGATE = "aggregate"
+
+
+class SplitStrategy(StrEnum):
+    SERIES = "series"
+    TIME = "time"
+
+
+class ReadPlanModel(BaseModel):
+    source: PlanSource
+    mode: ReadMode
+    split: SplitStrategy
+    series_count: int
+    window_hours: float
+    series_per_request: int
+    time_slices: int
+    parallelism: int
+    requests: int
+    estimated_rows: float
+    estimated_seconds: float
+    actual_rows: int | None = None
+    actual_seconds: float | None = None
+    reasons: list[str] = Field(default_factory=list)
+
+
+class DatapointsPageRequestModel(DatapointsRequestModel):
+    page_size: int = Field(default=1000, gt=0, le=10000)
+    cursor: str | None = None
+
+
+class DatapointsPageResponseModel(BaseModel):
+    data: list[dict]
+    next_cursor: str | None = None
+
+
+class MeasurementsCursor(BaseModel):
+    """
+    Position in a paginated measurements read: the index of the series (in id
+    order) to resume from, the time of the last datapoint already returned from
+    it and how many datapoints at that time were returned. Bound to the query it
+    was issued for.
+    """
+
+    query: str
+    series_index: int = Field(ge=0)
+    watermark: str | None = None
+    offset: int = Field(default=0, ge=0)
+
+    @staticmethod
+    def query_of(request: DatapointsRequestModel) -> str:
+        return (
+            f"{request.facility}|{request.start_time.isoformat()}"
+            f"|{request.end_time.isoformat()}"
+        )
+
+    def encode(self) -> str:
+        return base64.urlsafe_b64encode(self.model_dump_json().encode()).decode()
+
+    @classmethod
+    def decode(cls, cursor: str) -> Self:
+        return cls.model_validate_json(base64.urlsafe_b64decode(cursor.encode()))
@@ -1,6 +1,13 @@
 import logging
-from datetime import datetime
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+from datetime import datetime, timedelta
+from typing import Literal, NamedTuple, TypeVar
 
+import orjson
+from azure.core.credentials import TokenCredential
 from azure.identity import ClientSecretCredential
 from omnia_timeseries.api import (
     DatapointModel,
@@ -8,26 +15,82 @@ from omnia_timeseries.api import (
     GetTimeseriesResponseModel,
     MessageModel,
     TimeseriesAPI,
+    TimeseriesApiEnvironment,
     TimeseriesEnvironment,
     TimeseriesRequestItem,
 )
 from omnia_timeseries.models import (
-    AggregateItemModel,
+    AggregateModel,
     GetAggregatesResponseModel,
     GetMultipleDatapointsRequestItem,
     TimeseriesModel,
 )
+from opentelemetry import trace
 
+from sara_timeseries.core.cache import SharedCache, build_shared_cache
+from sara_timeseries.core.credentials import CachingTokenCredential
 from sara_timeseries.core.settings import settings
+from sara_timeseries.modules.sara_timeseries_api.adaptive_chunking import (
+    AdaptiveChunker,
+    Chunk,
+)
+from sara_timeseries.modules.sara_timeseries_api.hedging import Hedger, build_hedger
+from sara_timeseries.modules.sara_timeseries_api.resilience import (
+    OmniaGuard,
+    build_omnia_guard,
+)
 
 logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
+
+T = TypeVar("T")
+
+AggregateFunction = Literal[
+    "avg", "min", "max", "sum", "stddev", "count", "first", "last"
+]
 
 TIMESERIES_STATUS_GOOD = 192
+TIMESERIES_API_REQUEST_LIMIT = 100
 _TIMESERIES_ENVIRONMENT = (
     TimeseriesEnvironment.Test()
     if settings.USE_OMNIA_TIMESERIES_TEST_ENVIRONMENT
     else TimeseriesEnvironment.Prod()
 )
+OMNIA_TOKEN_SCOPE: str = (
+    f"{TimeseriesApiEnvironment(_TIMESERIES_ENVIRONMENT).resource_id}/.default"
+)
+
+
+def format_processing_interval(interval: timedelta) -> str:
+    if interval % timedelta(days=1) == timedelta(0):
+        return f"{interval // timedelta(days=1)}d"
+    return f"{interval // timedelta(hours=1)}h"
+
+
+def build_omnia_credential(
+    client_id: str, client_secret: str, tenant_id: str
+) -> CachingTokenCredential:
+    return CachingTokenCredential(
+        ClientSecretCredential(
+            client_id=client_id,
+            client_secret=client_secret,
+            tenant_id=tenant_id,
+        ),
+        name="omnia",
+        refresh_before_seconds=settings.TOKEN_REFRESH_BEFORE_SECONDS,
+    )
+
+
+class PagePosition(NamedTuple):
+    """
+    Where a paginated read resumes: the series index (in id order), the time of
+    the last datapoint returned from it, and how many datapoints at exactly that
+    time were returned, so datapoints sharing a timestamp are not lost.
+    """
+
+    series_index: int
+    watermark: str | None = None
+    offset: int = 0
 
 
 class OmniaService:
@@ -37,16 +100,48 @@ class OmniaService:
         client_secret: str,
         tenant_id: str,
         environment: TimeseriesEnvironment = _TIMESERIES_ENVIRONMENT,
+        credential: TokenCredential | None = None,
+        chunker: AdaptiveChunker | None = None,
+        hedger: Hedger | None = None,
+        ingest_guard: OmniaGuard | None = None,
+        read_guard: OmniaGuard | None = None,
+        catalog_cache: SharedCache | None = None,
     ) -> None:
         """
-        Initializes the OmniaService with Azure credentials.
+        Initializes the OmniaService with Azure credentials. Unless a credential
+        is given, tokens for the client secret are cached and refreshed in the
+        background.
         """
-        credentials = ClientSecretCredential(
-            client_id=client_id,
-            client_secret=client_secret,
-            tenant_id=tenant_id,
+        self.credential: TokenCredential = credential or build_omnia_credential(
+            client_id, client_secret, tenant_id
+        )
+        self.api = TimeseriesAPI(
+            azure_credential=self.credential, environment=environment
+        )
+        self.chunker: AdaptiveChunker = chunker or AdaptiveChunker(
+            target_rows=settings.QUERY_CHUNK_TARGET_ROWS,
+            min_rows=settings.QUERY_CHUNK_MIN_ROWS,
+            max_rows=settings.QUERY_MAX_ROWS_PER_REQUEST,
+            target_seconds=settings.QUERY_CHUNK_TARGET_SECONDS,
+            max_series_per_request=TIMESERIES_API_REQUEST_LIMIT,
+        )
+        self.hedger: Hedger | None = hedger or build_hedger()
+        self.ingest_guard: OmniaGuard = ingest_guard or build_omnia_guard(
+            "ingest",
+            settings.OMNIA_INGEST_CONCURRENCY,
+            settings.OMNIA_INGEST_MAX_CONCURRENCY,
         )
-        self.api = TimeseriesAPI(azure_credential=credentials, environment=environment)
+        self.read_guard: OmniaGuard = read_guard or build_omnia_guard(
+            "read", settings.OMNIA_READ_CONCURRENCY, settings.OMNIA_READ_MAX_CONCURRENCY
+        )
+        self.catalog_cache: SharedCache = catalog_cache or build_shared_cache(
+            "catalog",
+            memory_entries=16,
+            max_bytes=settings.CATALOG_CACHE_MAX_BYTES,
+        )
+        # Ids in the cached catalog per (cache epoch, description), so ingest can
+        # check for new series without parsing the catalog
+        self.catalog_ids: dict[tuple[str, str], frozenset[str]] = {}
 
     def get_or_add_timeseries(
         self,
@@ -74,11 +169,13 @@ class OmniaService:
             metadata=metadata if metadata is not None else {},
         )
         try:
-            response: GetTimeseriesResponseModel = self.api.get_or_add_timeseries(
-                [time_series_request_item]
+            response: GetTimeseriesResponseModel = self.ingest_guard.call(
+                lambda: self.api.get_or_add_timeseries([time_series_request_item])
             )
             if response["data"]["items"]:
-                return response["data"]["items"][0]["id"]
+                timeseries_id: str = response["data"]["items"][0]["id"]
+                self._invalidate_catalog_if_unknown(description, timeseries_id)
+                return timeseries_id
             else:
                 raise ValueError("No items returned in response")
         except Exception as e:
@@ -101,7 +198,7 @@ class OmniaService:
         data = DatapointsPostRequestModel(datapoints=[datapoint])
 
         try:
-            x = self.api.write_data(timeseries_id, data)
+            x = self.ingest_guard.call(lambda: self.api.write_data(timeseries_id, data))
             return x
         except Exception as e:
             logger.error(f"Error writing to timeseries: {e}")
@@ -114,8 +211,11 @@ class OmniaService:
         """
         # TODO: Remove when we use PROD environment
         try:
-            response = self.api.delete_timeseries_by_id(timeseries_id)
+            response = self.ingest_guard.call(
+                lambda: self.api.delete_timeseries_by_id(timeseries_id)
+            )
             logger.info(f"Successfully deleted timeseries {timeseries_id}: {response}")
+            self.catalog_cache.invalidate()
         except Exception as e:
             logger.error(f"Error deleting timeseries {timeseries_id}: {e}")
             raise
@@ -125,10 +225,23 @@ class OmniaService:
     ) -> list[TimeseriesModel]:
         """
         Reads all timeseries from the API which match the given description.
+        Results are cached for CATALOG_CACHE_TTL_SECONDS, shared across workers.
         """
-        timeseries: GetTimeseriesResponseModel = self.api.search_timeseries(
-            description=description
+        cached: bytes | None = self.catalog_cache.get(description)
+        if cached is not None:
+            items: list[TimeseriesModel] = orjson.loads(cached)
+            self._remember_catalog_ids(description, items)
+            return items
+        timeseries: GetTimeseriesResponseModel = self._read(
+            "search_timeseries",
+            lambda: self.api.search_timeseries(description=description),
+        )
+        self.catalog_cache.set(
+            description,
+            orjson.dumps(timeseries["data"]["items"]),
+            ttl_seconds=settings.CATALOG_CACHE_TTL_SECONDS,
         )
+        self._remember_catalog_ids(description, timeseries["data"]["items"])
         return timeseries["data"]["items"]
 
     def read_timeseries_by_description_and_facility(
@@ -150,8 +263,11 @@ class OmniaService:
         """
         Reads all timeseries from the API which match the given description, facility, and name.
         """
-        timeseries: GetTimeseriesResponseModel = self.api.search_timeseries(
-            description=description, facility=facility, name=name
+        timeseries: GetTimeseriesResponseModel = self._read(
+            "search_timeseries",
+            lambda: self.api.search_timeseries(
+                description=description, facility=facility, name=name
+            ),
         )
         return timeseries["data"]["items"]
 
@@ -164,13 +280,299 @@ class OmniaService:
         """
         Reads all datapoints in the given timeseries within the given time range.
         """
+        flattened_data: list[dict] = [
+            row
+            for chunk in self.iter_data_from_multiple_timeseries(
+                timeseries=timeseries, start_time=start_time, end_time=end_time
+            )
+            for row in chunk
+        ]
+
+        return flattened_data
+
+    def iter_data_from_multiple_timeseries(
+        self,
+        timeseries: list[TimeseriesModel],
+        start_time: datetime,
+        end_time: datetime,
+    ) -> Iterator[list[dict]]:
+        """
+        Reads all datapoints in the given timeseries within the given time range,
+        yielding the flattened datapoints of each multi-datapoint request as soon
+        as it arrives. Requests are chunked adaptively by series and time. Rows are
+        flattened with the series metadata from the given catalog.
+        """
+        catalog: dict[str, TimeseriesModel] = {s["id"]: s for s in timeseries}
+        metadata_by_id: dict[str, dict] = {}
+        for chunk in self.chunker.plan(timeseries, start_time, end_time):
+            yield self._flatten_response(
+                self._read_chunk(chunk), catalog, metadata_by_id
+            )
+
+    def read_datapoints_from_multiple_timeseries(
+        self,
+        timeseries: list[TimeseriesModel],
+        start_time: datetime,
+        end_time: datetime,
+        limit_per_series: int | None = None,
+    ) -> list[AggregateModel]:
+        """
+        Reads the raw datapoints (time, value, status) in the given timeseries
+        within the given time range, without attaching series metadata. With
+        limit_per_series, Omnia stops after that many datapoints of each series, so
+        the cost is independent of the window size.
+        """
         requests: list[list[GetMultipleDatapointsRequestItem]] = (
-            self._build_api_requests(end_time, start_time, timeseries)
+            self._build_api_requests(
+                end_time, start_time, timeseries, limit_per_series=limit_per_series
+            )
         )
-        data: list[GetAggregatesResponseModel] = self._request_data_from_api(requests)
-        flattened_data: list[dict] = self._flatten_data(data)
+        datapoints: list[AggregateModel] = []
+        for request in requests:
+            response: GetAggregatesResponseModel = self._read_datapoints(request)
+            for item in response["data"]["items"]:
+                datapoints.extend(item.get("datapoints", [])[:limit_per_series])
 
-        return flattened_data
+        return datapoints
+
+    def plan_chunks(
+        self,
+        timeseries: list[TimeseriesModel],
+        start_time: datetime,
+        end_time: datetime,
+    ) -> list[Chunk]:
+        """
+        The multi-datapoint requests a raw read of the given timeseries within the
+        given time range is split into, with their expected rows.
+        """
+        return self.chunker.plan(timeseries, start_time, end_time)
+
+    def read_with_plan(
+        self,
+        timeseries: list[TimeseriesModel],
+        start_time: datetime,
+        end_time: datetime,
+        series_per_request: int,
+        time_slices: int = 1,
+        parallelism: int = 1,
+        aggregate_functions: list[AggregateFunction] | None = None,
+        processing_interval: timedelta | None = None,
+        chunks: list[Chunk] | None = None,
+    ) -> list[dict]:
+        """
+        Reads the given timeseries as laid out by a read plan, with up to
+        parallelism requests in flight. Raw reads are given the chunks planned by
+        plan_chunks; otherwise series_per_request series are read per
+        multi-datapoint request, with the window cut into time_slices contiguous
+        slices. With aggregate_functions, server-side aggregates per processing
+        interval are read instead of raw datapoints. Rows are flattened with the
+        series metadata from the given catalog, in request order.
+        """
+        catalog: dict[str, TimeseriesModel] = {s["id"]: s for s in timeseries}
+        if chunks is None:
+            chunks = self._uniform_chunks(
+                timeseries, start_time, end_time, series_per_request, time_slices
+            )
+
+        def read(chunk: Chunk) -> GetAggregatesResponseModel:
+            return self._read_chunk(chunk, aggregate_functions, processing_interval)
+
+        responses: list[GetAggregatesResponseModel]
+        if parallelism > 1 and len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=parallelism) as executor:
+                # Each read runs with the caller's context (trace and deadline)
+                futures: list[Future[GetAggregatesResponseModel]] = [
+                    executor.submit(copy_context().run, read, chunk) for chunk in chunks
+                ]
+                responses = [future.result() for future in futures]
+        else:
+            responses = [read(chunk) for chunk in chunks]
+
+        metadata_by_id: dict[str, dict] = {}
+        return [
+            row
+            for response in responses
+            for row in self._flatten_response(response, catalog, metadata_by_id)
+        ]
+
+    def _uniform_chunks(
+        self,
+        timeseries: list[TimeseriesModel],
+        start_time: datetime,
+        end_time: datetime,
+        series_per_request: int,
+        time_slices: int,
+    ) -> list[Chunk]:
+        slice_length: timedelta = (end_time - start_time) / max(time_slices, 1)
+        chunks: list[Chunk] = []
+        for index in range(max(time_slices, 1)):
+            slice_start: datetime = start_time + index * slice_length
+            slice_end: datetime = (
+                end_time if index == time_slices - 1 else slice_start + slice_length
+            )
+            slice_hours: float = (slice_end - slice_start) / timedelta(hours=1)
+            chunks.extend(
+                Chunk(
+                    series_chunk,
+                    slice_start,
+                    slice_end,
+                    slice_hours
+                    * sum(self.chunker.rows_per_hour(s["id"]) for s in series_chunk),
+                    "read plan",
+                )
+                for series_chunk in self._split_list(timeseries, series_per_request)
+            )
+
+        return chunks
+
+    def read_series_from_multiple_timeseries(
+        self,
+        timeseries: list[TimeseriesModel],
+        start_time: datetime,
+        end_time: datetime,
+    ) -> list[dict]:
+        """
+        Reads all datapoints in the given timeseries within the given time range,
+        grouped per series: each entry holds the series metadata once, flattened as
+        in read_data_from_multiple_timeseries, next to parallel time, value and
+        status arrays.
+        """
+        catalog: dict[str, TimeseriesModel] = {s["id"]: s for s in timeseries}
+        grouped: dict[str, dict] = {}
+        for chunk in self.chunker.plan(timeseries, start_time, end_time):
+            response: GetAggregatesResponseModel = self._read_chunk(chunk)
+            for item in response["data"]["items"]:
+                series: dict | None = grouped.get(item["id"])
+                if series is None:
+                    series = grouped[item["id"]] = {
+                        "metadata": self._series_metadata(item["id"], catalog),
+                        "time": [],
+                        "value": [],
+                        "status": [],
+                    }
+                for dp in item.get("datapoints", []):
+                    series["time"].append(dp.get("time"))
+                    series["value"].append(dp.get("value"))
+                    series["status"].append(dp.get("status"))
+
+        return list(grouped.values())
+
+    def read_datapoints_for_windows(
+        self,
+        windows: list[tuple[str, datetime, datetime]],
+        limit_per_window: int | None = None,
+    ) -> list[list[AggregateModel]]:
+        """
+        Reads the datapoints of each (timeseries id, start, end) window, packing the
+        windows into as few multi-datapoint requests as possible. A request never
+        holds the same timeseries twice, so response items can be matched by id.
+        Returns the datapoints of each window in the order of the windows, at most
+        limit_per_window of them when given.
+        """
+        chunks: list[tuple[list[int], set[str]]] = []
+        for index, (timeseries_id, _, _) in enumerate(windows):
+            for chunk_indices, chunk_ids in chunks:
+                if (
+                    len(chunk_indices) < TIMESERIES_API_REQUEST_LIMIT
+                    and timeseries_id not in chunk_ids
+                ):
+                    break
+            else:
+                chunk_indices, chunk_ids = [], set()
+                chunks.append((chunk_indices, chunk_ids))
+            chunk_indices.append(index)
+            chunk_ids.add(timeseries_id)
+
+        datapoints: list[list[AggregateModel]] = [[] for _ in windows]
+        for chunk_indices, _ in chunks:
+            request: list[GetMultipleDatapointsRequestItem] = [
+                {
+                    "id": windows[i][0],
+                    "startTime": windows[i][1].isoformat(),
+                    "endTime": windows[i][2].isoformat(),
+                    "statusFilter": [TIMESERIES_STATUS_GOOD],
+                }
+                for i in chunk_indices
+            ]
+            if limit_per_window is not None:
+                for item in request:
+                    item["limit"] = limit_per_window
+            response: GetAggregatesResponseModel = self._read_datapoints(request)
+            window_by_id: dict[str, int] = {windows[i][0]: i for i in chunk_indices}
+            for item in response["data"]["items"]:
+                if item["id"] in window_by_id:
+                    datapoints[window_by_id[item["id"]]].extend(
+                        item.get("datapoints", [])[:limit_per_window]
+                    )
+
+        return datapoints
+
+    def read_page_from_multiple_timeseries(
+        self,
+        timeseries: list[TimeseriesModel],
+        start_time: datetime,
+        end_time: datetime,
+        page_size: int,
+        position: PagePosition | None = None,
+    ) -> tuple[list[dict], PagePosition | None]:
+        """
+        Reads at most page_size datapoints, walking the timeseries in id order from
+        the given position. Up to TIMESERIES_API_REQUEST_LIMIT series are read per
+        multi-datapoint request, each limited to what is left of the page. Returns
+        the flattened datapoints and the position to resume from, or None when all
+        series are exhausted.
+        """
+        catalog: dict[str, TimeseriesModel] = {s["id"]: s for s in timeseries}
+        ordered: list[TimeseriesModel] = [catalog[key] for key in sorted(catalog)]
+        series_index, watermark, offset = position or PagePosition(0)
+        page: list[dict] = []
+        while series_index < len(ordered):
+            remaining: int = page_size - len(page)
+            batch: list[TimeseriesModel] = ordered[
+                series_index : series_index + TIMESERIES_API_REQUEST_LIMIT
+            ]
+            request: list[GetMultipleDatapointsRequestItem] = [
+                {
+                    "id": series["id"],
+                    "startTime": start_time.isoformat(),
+                    "endTime": end_time.isoformat(),
+                    "statusFilter": [TIMESERIES_STATUS_GOOD],
+                    "limit": remaining,
+                }
+                for series in batch
+            ]
+            if watermark is not None:
+                # The first `offset` datapoints at the watermark were already
+                # returned, and are read again and skipped below
+                request[0]["startTime"] = watermark
+                request[0]["limit"] = remaining + offset
+            response: GetAggregatesResponseModel = self._read_datapoints(request)
+            datapoints_by_id: dict[str, list[AggregateModel]] = {
+                item["id"]: item.get("datapoints", [])
+                for item in response["data"]["items"]
+            }
+
+            for index, series in enumerate(batch, start=series_index):
+                resumed: bool = index == series_index and watermark is not None
+                datapoints: list[AggregateModel] = datapoints_by_id.get(
+                    series["id"], []
+                )[offset if resumed else 0 :]
+                taken: list[AggregateModel] = datapoints[:remaining]
+                page.extend(self._flatten_datapoints(series, taken))
+                remaining -= len(taken)
+                if remaining > 0:
+                    # Fewer datapoints than the item's limit: the series is exhausted
+                    continue
+                last_time: str = taken[-1]["time"]
+                at_last_time: int = sum(1 for dp in taken if dp["time"] == last_time)
+                if resumed and last_time == watermark:
+                    at_last_time += offset
+                return page, PagePosition(index, last_time, at_last_time)
+
+            series_index += len(batch)
+            watermark, offset = None, 0
+
+        return page, None
 
     @staticmethod
     def _filter_timeseries_by_facility(
@@ -198,39 +600,154 @@ class OmniaService:
 
         return flattened
 
-    def _flatten_data(self, data: list[GetAggregatesResponseModel]) -> list[dict]:
-        squashed_data: list[AggregateItemModel] = [
-            item for d in data for item in d["data"]["items"]
-        ]
-        flattened_data: list[dict] = [
-            {"id": d["id"], **dp}
-            for d in squashed_data
-            for dp in d.get("datapoints", [])
-        ]
-        for d in flattened_data:
-            series: GetTimeseriesResponseModel = self.api.get_timeseries_by_id(d["id"])
-            flattened_series: dict = self._flatten_timeseries_response(
-                series["data"]["items"][0]
+    def _series_metadata(
+        self, timeseries_id: str, catalog: dict[str, TimeseriesModel]
+    ) -> dict:
+        series: TimeseriesModel | None = catalog.get(timeseries_id)
+        if series is None:
+            response: GetTimeseriesResponseModel = self._read_timeseries_by_id(
+                timeseries_id
             )
-            d.update(flattened_series)
+            series = response["data"]["items"][0]
+        return self._flatten_timeseries_response(series)
 
-        return flattened_data
+    @classmethod
+    def _flatten_datapoints(
+        cls, series: TimeseriesModel, datapoints: list[AggregateModel]
+    ) -> list[dict]:
+        flattened_series: dict = cls._flatten_timeseries_response(series)
+        return [{"id": series["id"], **dp, **flattened_series} for dp in datapoints]
 
-    def _request_data_from_api(
-        self, requests: list[list[GetMultipleDatapointsRequestItem]]
-    ) -> list[GetAggregatesResponseModel]:
-        data: list[GetAggregatesResponseModel] = [
-            self.api.get_multi_datapoints(req) for req in requests
-        ]
-        return data
+    def _flatten_response(
+        self,
+        response: GetAggregatesResponseModel,
+        catalog: dict[str, TimeseriesModel],
+        metadata_by_id: dict[str, dict],
+    ) -> list[dict]:
+        """
+        Flattens the datapoints of a multi-datapoint response with their series
+        metadata, looked up once per series in metadata_by_id and the catalog.
+        """
+        rows: list[dict] = []
+        for item in response["data"]["items"]:
+            metadata: dict | None = metadata_by_id.get(item["id"])
+            if metadata is None:
+                metadata = metadata_by_id[item["id"]] = self._series_metadata(
+                    item["id"], catalog
+                )
+            rows.extend(
+                {"id": item["id"], **dp, **metadata}
+                for dp in item.get("datapoints", [])
+            )
+        return rows
+
+    def _remember_catalog_ids(
+        self, description: str, items: list[TimeseriesModel]
+    ) -> frozenset[str]:
+        epoch: str = self.catalog_cache.epoch()
+        ids: frozenset[str] = frozenset(series["id"] for series in items)
+        # Ids from earlier epochs belong to invalidated catalogs
+        self.catalog_ids = {
+            key: known for key, known in self.catalog_ids.items() if key[0] == epoch
+        }
+        self.catalog_ids[(epoch, description)] = ids
+        return ids
+
+    def _invalidate_catalog_if_unknown(
+        self, description: str, timeseries_id: str
+    ) -> None:
+        """A series missing from the cached catalog was just created."""
+        ids: frozenset[str] | None = self.catalog_ids.get(
+            (self.catalog_cache.epoch(), description)
+        )
+        if ids is None:
+            # Catalog cached by another worker or before this epoch was seen;
+            # parsed once, then checked against the remembered ids
+            cached: bytes | None = self.catalog_cache.get(description)
+            if cached is None:
+                return
+            ids = self._remember_catalog_ids(description, orjson.loads(cached))
+        if timeseries_id not in ids:
+            logger.info(
+                f"Invalidating timeseries catalog after timeseries {timeseries_id} was added"
+            )
+            self.catalog_cache.invalidate()
+
+    def _read(self, operation: str, fn: Callable[[], T]) -> T:
+        """
+        Run an idempotent Omnia read behind the read guard, hedged when hedging is
+        enabled. Every attempt, hedges included, takes its own concurrency slot.
+        """
+        if self.hedger is None:
+            return self.read_guard.call(fn)
+        return self.hedger.call(operation, lambda: self.read_guard.call(fn))
+
+    def _read_datapoints(
+        self, request: list[GetMultipleDatapointsRequestItem]
+    ) -> GetAggregatesResponseModel:
+        return self._read(
+            "get_multi_datapoints", lambda: self.api.get_multi_datapoints(request)
+        )
+
+    def _read_timeseries_by_id(self, timeseries_id: str) -> GetTimeseriesResponseModel:
+        return self._read(
+            "get_timeseries_by_id", lambda: self.api.get_timeseries_by_id(timeseries_id)
+        )
+
+    def _read_chunk(
+        self,
+        chunk: Chunk,
+        aggregate_functions: list[AggregateFunction] | None = None,
+        processing_interval: timedelta | None = None,
+    ) -> GetAggregatesResponseModel:
+        """
+        Reads one chunk in a single multi-datapoint request, traced with the
+        chunking decision and its outcome. Raw reads feed the adaptive chunker.
+        """
+        request: list[GetMultipleDatapointsRequestItem] = self._build_api_requests(
+            chunk.end_time, chunk.start_time, chunk.series
+        )[0]
+        if aggregate_functions is not None:
+            for item in request:
+                item["aggregateFunctions"] = aggregate_functions
+                item["processingInterval"] = format_processing_interval(
+                    processing_interval or (chunk.end_time - chunk.start_time)
+                )
+
+        with tracer.start_as_current_span(
+            "omnia.get_multi_datapoints",
+            attributes={
+                "chunk.series_count": len(chunk.series),
+                "chunk.start_time": chunk.start_time.isoformat(),
+                "chunk.end_time": chunk.end_time.isoformat(),
+                "chunk.expected_rows": chunk.expected_rows,
+                "chunk.target_rows": self.chunker.target_rows,
+                "chunk.reason": chunk.reason,
+                "chunk.aggregate": aggregate_functions is not None,
+            },
+        ) as span:
+            started: float = time.perf_counter()
+            response: GetAggregatesResponseModel = self._read_datapoints(request)
+            seconds: float = time.perf_counter() - started
+            rows_by_id: dict[str, int] = {}
+            for item in response["data"]["items"]:
+                rows_by_id[item["id"]] = rows_by_id.get(item["id"], 0) + len(
+                    item.get("datapoints", [])
+                )
+            span.set_attribute("chunk.rows", sum(rows_by_id.values()))
+            span.set_attribute("chunk.seconds", seconds)
+
+        if aggregate_functions is None:
+            self.chunker.observe(chunk, rows_by_id, seconds)
+        return response
 
     def _build_api_requests(
         self,
         end_time: datetime,
         start_time: datetime,
         timeseries: list[TimeseriesModel],
+        limit_per_series: int | None = None,
     ) -> list[list[GetMultipleDatapointsRequestItem]]:
-        timeseries_api_request_limit: int = 100
         request: list[GetMultipleDatapointsRequestItem] = [
             {
                 "id": item["id"],
@@ -240,9 +757,12 @@ class OmniaService:
             }
             for item in timeseries
         ]
+        if limit_per_series is not None:
+            for item in request:
+                item["limit"] = limit_per_series
 
         requests: list[list[GetMultipleDatapointsRequestItem]] = [request]
-        if self._data_request_must_be_split(timeseries, timeseries_api_request_limit):
-            requests = self._split_list(request, timeseries_api_request_limit)
+        if self._data_request_must_be_split(timeseries, TIMESERIES_API_REQUEST_LIMIT):
+            requests = self._split_list(request, TIMESERIES_API_REQUEST_LIMIT)
 
         return requests
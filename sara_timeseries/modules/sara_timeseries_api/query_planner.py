@@ -0,0 +1,240 @@
+import logging
+import math
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sara_timeseries.core.settings import settings
+from sara_timeseries.modules.sara_timeseries_api.adaptive_chunking import Chunk
+from sara_timeseries.modules.sara_timeseries_api.models import (
+    PlanSource,
+    ReadMode,
+    ReadPlanModel,
+    SplitStrategy,
+)
+from sara_timeseries.modules.sara_timeseries_api.omnia_service import (
+    TIMESERIES_API_REQUEST_LIMIT,
+)
+
+logger = logging.getLogger(__name__)
+
+SERIES_PER_REQUEST_CANDIDATES: tuple[int, ...] = (100, 50, 25, 10, 5, 1)
+# Smaller requests must be estimated this much faster to be worth issuing
+MIN_IMPROVEMENT: float = 0.1
+
+
+class ReadStatistics:
+    """
+    Exponentially weighted averages of observed read costs: fixed overhead per
+    request and marginal time per returned row. Datapoint density is learned per
+    series by the AdaptiveChunker.
+    """
+
+    def __init__(
+        self,
+        request_overhead_seconds: float = 0.5,
+        seconds_per_row: float = 2e-5,
+        smoothing: float = 0.2,
+    ) -> None:
+        self.request_overhead_seconds: float = request_overhead_seconds
+        self.seconds_per_row: float = seconds_per_row
+        self.smoothing: float = smoothing
+        self.observations: int = 0
+        self._lock = threading.Lock()
+
+    def observe(self, plan: ReadPlanModel, rows: int, seconds: float) -> None:
+        if plan.source != PlanSource.LIVE or plan.requests == 0:
+            return
+        waves: int = math.ceil(plan.requests / plan.parallelism)
+        request_seconds: float = seconds / waves
+        rows_per_request: float = rows / plan.requests
+        with self._lock:
+            self.observations += 1
+            # Small responses are dominated by the round trip, large ones by rows
+            if rows_per_request < 1000:
+                self.request_overhead_seconds = self._blend(
+                    self.request_overhead_seconds, request_seconds
+                )
+            else:
+                self.seconds_per_row = self._blend(
+                    self.seconds_per_row,
+                    max(request_seconds - self.request_overhead_seconds, 0.0)
+                    / rows_per_request,
+                )
+
+    def _blend(self, current: float, observed: float) -> float:
+        return (1 - self.smoothing) * current + self.smoothing * observed
+
+
+class QueryPlanner:
+    """
+    Chooses how a measurement read is executed: served from cache or fetched
+    live, and for live reads how the series and window are split into
+    multi-datapoint requests and how many run in parallel. Raw reads are laid out
+    by the chunks of the AdaptiveChunker and their expected rows; aggregate reads
+    are split by series, with candidates ranked by estimated latency using the
+    recorded ReadStatistics.
+    """
+
+    def __init__(
+        self,
+        statistics: ReadStatistics | None = None,
+        max_rows_per_request: int = 50_000,
+        max_parallelism: int = 4,
+    ) -> None:
+        self.statistics: ReadStatistics = statistics or ReadStatistics()
+        self.max_rows_per_request: int = max_rows_per_request
+        self.max_parallelism: int = max_parallelism
+
+    def plan(
+        self,
+        series_count: int,
+        start_time: datetime,
+        end_time: datetime,
+        mode: ReadMode = ReadMode.RAW,
+        processing_interval: timedelta | None = None,
+        cached: bool = False,
+        chunks: list[Chunk] | None = None,
+    ) -> ReadPlanModel:
+        """
+        The plan for reading series_count series over the window. Live raw reads
+        require the chunks they will be read in, as planned by the AdaptiveChunker.
+        """
+        window_hours: float = max((end_time - start_time) / timedelta(hours=1), 0.0)
+        if cached:
+            return ReadPlanModel(
+                source=PlanSource.CACHE,
+                mode=mode,
+                split=SplitStrategy.SERIES,
+                series_count=series_count,
+                window_hours=window_hours,
+                series_per_request=0,
+                time_slices=0,
+                parallelism=0,
+                requests=0,
+                estimated_rows=0,
+                estimated_seconds=0,
+                reasons=["closed window is cached"],
+            )
+
+        if mode == ReadMode.RAW:
+            if chunks is None:
+                raise ValueError("Live raw reads are planned from their chunks")
+            return self._plan_chunks(series_count, window_hours, chunks)
+
+        rows_per_series: float = (
+            window_hours / (processing_interval / timedelta(hours=1))
+            if processing_interval
+            else 1.0
+        )
+        # Time slices would have to align with the processing intervals
+        reasons: list[str] = ["aggregate reads are split by series only"]
+        # Candidates are ordered from fewest to most requests
+        best: ReadPlanModel | None = None
+        best_over_budget: bool = False
+        for candidate in SERIES_PER_REQUEST_CANDIDATES:
+            series_per_request: int = max(
+                min(candidate, TIMESERIES_API_REQUEST_LIMIT, series_count), 1
+            )
+            requests: int = math.ceil(series_count / series_per_request)
+            parallelism: int = max(min(self.max_parallelism, requests), 1)
+            estimated_rows: float = series_count * rows_per_series
+            estimated_seconds: float = self._estimate_seconds(
+                requests, parallelism, estimated_rows
+            )
+            # Plans that keep every request within the row budget are preferred
+            over_budget: bool = (
+                series_per_request * rows_per_series > self.max_rows_per_request
+            )
+            if best is not None and (over_budget, estimated_seconds) >= (
+                best_over_budget,
+                best.estimated_seconds * (1 - MIN_IMPROVEMENT),
+            ):
+                continue
+            best_over_budget = over_budget
+            best = ReadPlanModel(
+                source=PlanSource.LIVE,
+                mode=mode,
+                split=SplitStrategy.SERIES,
+                series_count=series_count,
+                window_hours=window_hours,
+                series_per_request=series_per_request,
+                time_slices=1,
+                parallelism=parallelism,
+                requests=requests,
+                estimated_rows=estimated_rows,
+                estimated_seconds=estimated_seconds,
+            )
+
+        assert best is not None
+        if best_over_budget:
+            reasons.append(
+                f"requests exceed {self.max_rows_per_request} rows "
+                "with one series per request"
+            )
+        best.reasons = [*reasons, self._describe_costs()]
+        return best
+
+    def _plan_chunks(
+        self, series_count: int, window_hours: float, chunks: list[Chunk]
+    ) -> ReadPlanModel:
+        requests: int = len(chunks)
+        parallelism: int = max(min(self.max_parallelism, requests), 1)
+        estimated_rows: float = sum(chunk.expected_rows for chunk in chunks)
+        chunks_per_series: Counter[str] = Counter(
+            series["id"] for chunk in chunks for series in chunk.series
+        )
+        time_slices: int = max(chunks_per_series.values(), default=1)
+        chunks_per_reason: Counter[str] = Counter(chunk.reason for chunk in chunks)
+        return ReadPlanModel(
+            source=PlanSource.LIVE,
+            mode=ReadMode.RAW,
+            split=SplitStrategy.TIME if time_slices > 1 else SplitStrategy.SERIES,
+            series_count=series_count,
+            window_hours=window_hours,
+            series_per_request=max((len(chunk.series) for chunk in chunks), default=0),
+            time_slices=time_slices,
+            parallelism=parallelism,
+            requests=requests,
+            estimated_rows=estimated_rows,
+            estimated_seconds=self._estimate_seconds(
+                requests, parallelism, estimated_rows
+            ),
+            reasons=[
+                *(f"{count} x {reason}" for reason, count in chunks_per_reason.items()),
+                self._describe_costs(),
+            ],
+        )
+
+    def _describe_costs(self) -> str:
+        return (
+            f"{self.statistics.request_overhead_seconds:.3g} s per request, "
+            f"{self.statistics.seconds_per_row:.3g} s per row "
+            f"({self.statistics.observations} observations)"
+        )
+
+    def record(self, plan: ReadPlanModel, rows: int, seconds: float) -> ReadPlanModel:
+        """Store the actual cost of an executed plan and learn from it."""
+        self.statistics.observe(plan, rows, seconds)
+        executed: ReadPlanModel = plan.model_copy(
+            update={"actual_rows": rows, "actual_seconds": seconds}
+        )
+        logger.debug(f"Executed read plan: {executed.model_dump_json()}")
+        return executed
+
+    def _estimate_seconds(
+        self, requests: int, parallelism: int, estimated_rows: float
+    ) -> float:
+        waves: int = math.ceil(requests / parallelism)
+        rows_per_request: float = estimated_rows / requests if requests else 0.0
+        return waves * (
+            self.statistics.request_overhead_seconds
+            + rows_per_request * self.statistics.seconds_per_row
+        )
+
+
+def build_query_planner() -> QueryPlanner:
+    return QueryPlanner(
+        max_rows_per_request=settings.QUERY_MAX_ROWS_PER_REQUEST,
+        max_parallelism=settings.QUERY_MAX_PARALLELISM,
+    )
@@ -0,0 +1,274 @@
+import logging
+import threading
+import time
+import weakref
+from collections import deque
+from collections.abc import Callable, Iterable
+from enum import StrEnum
+from typing import TypeVar
+
+import requests
+from omnia_timeseries.models import TimeseriesRequestFailedException
+from opentelemetry import metrics
+from opentelemetry.metrics import CallbackOptions, Observation
+
+from sara_timeseries.core.deadline import check_deadline, remaining_seconds
+from sara_timeseries.core.settings import settings
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+T = TypeVar("T")
+
+
+class OmniaUnavailableError(Exception):
+    """Raised instead of calling Omnia when the circuit is open or no slot frees up."""
+
+    def __init__(self, message: str, retry_after_seconds: float) -> None:
+        super().__init__(message)
+        self.retry_after_seconds: float = retry_after_seconds
+
+
+def is_overload(error: BaseException) -> bool:
+    """Throttling, server errors and transport failures signal an overloaded Omnia."""
+    if isinstance(error, TimeseriesRequestFailedException):
+        return error.status_code == 429 or error.status_code >= 500
+    return isinstance(error, requests.ConnectionError | requests.Timeout)
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit: every call that completes within latency_threshold
+    without overload grows the limit by 1 / limit (about one per round of
+    calls); an overloaded or slower call multiplies it by backoff. Callers
+    beyond the limit wait up to acquire_timeout_seconds for a slot.
+    """
+
+    def __init__(
+        self,
+        initial_limit: float = 8,
+        min_limit: float = 1,
+        max_limit: float = 64,
+        latency_threshold_seconds: float = 5.0,
+        backoff: float = 0.7,
+        acquire_timeout_seconds: float = 10.0,
+    ) -> None:
+        self.limit: float = initial_limit
+        self.min_limit: float = min_limit
+        self.max_limit: float = max_limit
+        self.latency_threshold_seconds: float = latency_threshold_seconds
+        self.backoff: float = backoff
+        self.acquire_timeout_seconds: float = acquire_timeout_seconds
+        self.in_flight: int = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, timeout_seconds: float | None = None) -> bool:
+        deadline: float = time.monotonic() + (
+            self.acquire_timeout_seconds if timeout_seconds is None else timeout_seconds
+        )
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                remaining: float = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            self.in_flight += 1
+            return True
+
+    def release(self, seconds: float, overloaded: bool) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            if overloaded or seconds > self.latency_threshold_seconds:
+                self.limit = max(self.limit * self.backoff, self.min_limit)
+            else:
+                self.limit = min(self.limit + 1 / self.limit, self.max_limit)
+            self._condition.notify_all()
+
+
+class BreakerState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+_transitions = meter.create_counter(
+    "sara_timeseries.omnia.circuit_transitions",
+    description="Circuit breaker state transitions around Omnia calls",
+)
+
+
+class CircuitBreaker:
+    """
+    Opens once at least failure_rate_threshold of the last window calls (and at
+    least min_calls of them) were overloaded, rejecting calls for open_seconds.
+    Afterwards a single probe is let through: success closes the circuit again,
+    failure reopens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        min_calls: int = 20,
+        window: int = 50,
+        open_seconds: float = 30.0,
+    ) -> None:
+        self.name: str = name
+        self.failure_rate_threshold: float = failure_rate_threshold
+        self.min_calls: int = min_calls
+        self.open_seconds: float = open_seconds
+        self.state: BreakerState = BreakerState.CLOSED
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._opened_at: float = 0.0
+        self._probing: bool = False
+        self._lock = threading.Lock()
+
+    def retry_after(self) -> float:
+        return max(self._opened_at + self.open_seconds - time.monotonic(), 0.0)
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == BreakerState.OPEN:
+                if self.retry_after() > 0:
+                    return False
+                self._transition(BreakerState.HALF_OPEN)
+            if self.state == BreakerState.HALF_OPEN:
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def record(self, failed: bool) -> None:
+        with self._lock:
+            if self.state == BreakerState.HALF_OPEN:
+                self._probing = False
+                if failed:
+                    self._open()
+                else:
+                    self._outcomes.clear()
+                    self._transition(BreakerState.CLOSED)
+                return
+            self._outcomes.append(failed)
+            failures: int = sum(self._outcomes)
+            if (
+                self.state == BreakerState.CLOSED
+                and len(self._outcomes) >= self.min_calls
+                and failures / len(self._outcomes) >= self.failure_rate_threshold
+            ):
+                self._open()
+
+    def cancel(self) -> None:
+        """Give back an allowed call that never reached Omnia."""
+        with self._lock:
+            self._probing = False
+
+    def _open(self) -> None:
+        self._opened_at = time.monotonic()
+        self._transition(BreakerState.OPEN)
+
+    def _transition(self, state: BreakerState) -> None:
+        logger.warning(f"Omnia {self.name} circuit {self.state} -> {state}")
+        _transitions.add(
+            1, {"traffic": self.name, "from": str(self.state), "to": str(state)}
+        )
+        self.state = state
+
+
+class OmniaGuard:
+    """
+    Runs Omnia calls of one traffic class (ingest or read) behind its own
+    circuit breaker and adaptive concurrency limit, so one class degrading or
+    saturating cannot starve the other.
+    """
+
+    def __init__(
+        self, name: str, limiter: AdaptiveLimiter, breaker: CircuitBreaker
+    ) -> None:
+        self.name: str = name
+        self.limiter: AdaptiveLimiter = limiter
+        self.breaker: CircuitBreaker = breaker
+        _guards.add(self)
+
+    def call(self, fn: Callable[[], T]) -> T:
+        check_deadline(f"omnia {self.name}")
+        if not self.breaker.allow():
+            raise OmniaUnavailableError(
+                f"Omnia {self.name} circuit is open",
+                retry_after_seconds=max(self.breaker.retry_after(), 1.0),
+            )
+        if not self.limiter.acquire(
+            remaining_seconds(self.limiter.acquire_timeout_seconds)
+        ):
+            # Local saturation says nothing about Omnia's health
+            self.breaker.cancel()
+            check_deadline(f"omnia {self.name} queue")
+            raise OmniaUnavailableError(
+                f"Omnia {self.name} concurrency limit {int(self.limiter.limit)} reached",
+                retry_after_seconds=1.0,
+            )
+
+        started: float = time.perf_counter()
+        overloaded: bool = False
+        try:
+            return fn()
+        except Exception as e:
+            overloaded = is_overload(e)
+            raise
+        finally:
+            self.limiter.release(time.perf_counter() - started, overloaded)
+            self.breaker.record(failed=overloaded)
+
+
+_guards: weakref.WeakSet[OmniaGuard] = weakref.WeakSet()
+
+
+def _observe_limits(options: CallbackOptions) -> Iterable[Observation]:
+    for guard in list(_guards):
+        yield Observation(guard.limiter.limit, {"traffic": guard.name})
+
+
+def _observe_in_flight(options: CallbackOptions) -> Iterable[Observation]:
+    for guard in list(_guards):
+        yield Observation(guard.limiter.in_flight, {"traffic": guard.name})
+
+
+def _observe_breaker_open(options: CallbackOptions) -> Iterable[Observation]:
+    for guard in list(_guards):
+        yield Observation(
+            int(guard.breaker.state != BreakerState.CLOSED), {"traffic": guard.name}
+        )
+
+
+meter.create_observable_gauge(
+    "sara_timeseries.omnia.concurrency_limit",
+    callbacks=[_observe_limits],
+    description="Current adaptive concurrency limit for Omnia calls",
+)
+meter.create_observable_gauge(
+    "sara_timeseries.omnia.in_flight",
+    callbacks=[_observe_in_flight],
+    description="Omnia calls currently in flight",
+)
+meter.create_observable_gauge(
+    "sara_timeseries.omnia.circuit_open",
+    callbacks=[_observe_breaker_open],
+    description="1 while the Omnia circuit breaker is open or half-open",
+)
+
+
+def build_omnia_guard(name: str, initial_limit: int, max_limit: int) -> OmniaGuard:
+    return OmniaGuard(
+        name,
+        AdaptiveLimiter(
+            initial_limit=initial_limit,
+            max_limit=max_limit,
+            latency_threshold_seconds=settings.OMNIA_LATENCY_THRESHOLD_SECONDS,
+            acquire_timeout_seconds=settings.OMNIA_ACQUIRE_TIMEOUT_SECONDS,
+        ),
+        CircuitBreaker(
+            name,
+            failure_rate_threshold=settings.OMNIA_CIRCUIT_FAILURE_RATE,
+            min_calls=settings.OMNIA_CIRCUIT_MIN_CALLS,
+            open_seconds=settings.OMNIA_CIRCUIT_OPEN_SECONDS,
+        ),
+    )
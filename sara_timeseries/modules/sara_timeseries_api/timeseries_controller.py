@@ -1,15 +1,38 @@
 import logging
+import math
+from collections.abc import Iterator
 from http import HTTPStatus
 
-from fastapi import APIRouter, Body, HTTPException
+from fastapi import APIRouter, Body, Header, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
 
+from sara_timeseries.core.bulkhead import Bulkheads, build_bulkheads
+from sara_timeseries.core.deadline import DeadlineExceededError
+from sara_timeseries.core.json_response import FastJSONResponse, dumps
+from sara_timeseries.modules.sara_timeseries_api.columnar_export import (
+    write_arrow_stream,
+    write_parquet,
+)
 from sara_timeseries.modules.sara_timeseries_api.models import (
+    NORMALIZED_MEASUREMENTS_MEDIA_TYPE,
+    CO2ConcentrationBatchRequestModel,
+    CO2ConcentrationBatchResponseModel,
     CO2ConcentrationRequestModel,
+    DatapointsPageRequestModel,
+    DatapointsPageResponseModel,
     DatapointsRequestModel,
     DatapointsResponseModel,
+    DownsamplingMethod,
+    ExportFormat,
+    MeasurementsFormat,
+    NormalizedDatapointsResponseModel,
+    ReadPlanModel,
     RequestModel,
     ResponseModel,
 )
+from sara_timeseries.modules.sara_timeseries_api.resilience import (
+    OmniaUnavailableError,
+)
 from sara_timeseries.modules.sara_timeseries_api.timeseries_service import (
     TimeseriesService,
 )
@@ -17,9 +40,24 @@ from sara_timeseries.modules.sara_timeseries_api.timeseries_service import (
 logger = logging.getLogger(__name__)
 
 
+def _service_unavailable(error: OmniaUnavailableError) -> HTTPException:
+    return HTTPException(
+        status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+        detail=str(error),
+        headers={"Retry-After": str(math.ceil(error.retry_after_seconds))},
+    )
+
+
 class TimeseriesController:
-    def __init__(self, timeseries_service: TimeseriesService) -> None:
+    def __init__(
+        self,
+        timeseries_service: TimeseriesService,
+        bulkheads: Bulkheads | None = None,
+    ) -> None:
         self.timeseries_service: TimeseriesService = timeseries_service
+        self.bulkheads: Bulkheads = (
+            bulkheads if bulkheads is not None else build_bulkheads()
+        )
 
     def ingest_data(
         self,
@@ -36,6 +74,10 @@ class TimeseriesController:
         )
         try:
             return self.timeseries_service.ingest_datapoint(datapoint=data)
+        except OmniaUnavailableError as e:
+            raise _service_unavailable(e)
+        except DeadlineExceededError:
+            raise
         except Exception:  # noqa: BLE001
             raise HTTPException(status_code=500, detail="Failed to ingest data")
 
@@ -47,13 +89,185 @@ class TimeseriesController:
             title="SARA Timeseries Co2 Measurements",
             description="Retrieve all CO2 measurements for the given facility and time window",
         ),
-    ) -> DatapointsResponseModel:
+        format: MeasurementsFormat | None = Query(
+            default=None,
+            description="'flat' (one object per datapoint) or 'normalized' (one entry per series with "
+            f"parallel arrays). Defaults to normalized when Accept is {NORMALIZED_MEASUREMENTS_MEDIA_TYPE}",
+        ),
+        accept: str | None = Header(default=None),
+        max_points: int | None = Query(
+            default=None,
+            ge=4,
+            le=100_000,
+            description="Downsample each series to at most this many points",
+        ),
+        downsampling: DownsamplingMethod = Query(
+            default=DownsamplingMethod.LTTB,
+            description="'lttb' (Largest-Triangle-Three-Buckets) or 'min_max' (per-bucket extremes)",
+        ),
+    ) -> Response:
         logger.info(
             f"Received request to retrieve CO2 measurements for facility {request.facility} and time window "
             f"{request.start_time.isoformat()} to {request.end_time.isoformat()}",
         )
+        if format is None:
+            format = (
+                MeasurementsFormat.NORMALIZED
+                if accept and NORMALIZED_MEASUREMENTS_MEDIA_TYPE in accept
+                else MeasurementsFormat.FLAT
+            )
+        try:
+            if format == MeasurementsFormat.NORMALIZED:
+                normalized: NormalizedDatapointsResponseModel = (
+                    self.timeseries_service.get_co2_measurements_normalized(
+                        request, max_points=max_points, downsampling=downsampling
+                    )
+                )
+                return Response(
+                    content=normalized.model_dump_json(),
+                    media_type="application/json",
+                )
+            measurements: DatapointsResponseModel = (
+                self.timeseries_service.get_co2_measurements(
+                    request, max_points=max_points, downsampling=downsampling
+                )
+            )
+            return FastJSONResponse(
+                {
+                    "data": measurements.data,
+                    "downsampling": (
+                        measurements.downsampling.model_dump(mode="json")
+                        if measurements.downsampling is not None
+                        else None
+                    ),
+                }
+            )
+        except OmniaUnavailableError as e:
+            raise _service_unavailable(e)
+        except DeadlineExceededError:
+            raise
+        except Exception:  # noqa: BLE001
+            raise HTTPException(
+                status_code=500, detail="Failed to retrieve CO2 measurements"
+            )
+
+    def stream_co2_measurements(
+        self,
+        request: DatapointsRequestModel = Body(
+            default=None,
+            embed=False,
+            title="SARA Timeseries Co2 Measurements Stream",
+            description="Stream all CO2 measurements for the given facility and time window as NDJSON",
+        ),
+    ) -> StreamingResponse:
+        logger.info(
+            f"Received request to stream CO2 measurements for facility {request.facility} and time window "
+            f"{request.start_time.isoformat()} to {request.end_time.isoformat()}",
+        )
+        try:
+            chunks: Iterator[list[dict]] = (
+                self.timeseries_service.stream_co2_measurements(request)
+            )
+        except OmniaUnavailableError as e:
+            raise _service_unavailable(e)
+        except DeadlineExceededError:
+            raise
+        except Exception:  # noqa: BLE001
+            raise HTTPException(
+                status_code=500, detail="Failed to retrieve CO2 measurements"
+            )
+
+        def ndjson_lines() -> Iterator[bytes]:
+            for chunk in chunks:
+                if chunk:
+                    yield b"".join(dumps(row) + b"\n" for row in chunk)
+
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+    def export_co2_measurements(
+        self,
+        request: DatapointsRequestModel = Body(
+            default=None,
+            embed=False,
+            title="SARA Timeseries Co2 Measurements Export",
+            description="Export all CO2 measurements for the given facility and time window in a columnar format",
+        ),
+        format: ExportFormat = Query(
+            default=ExportFormat.ARROW,
+            description="'arrow' (Arrow IPC stream) or 'parquet'",
+        ),
+    ) -> StreamingResponse:
+        logger.info(
+            f"Received request to export CO2 measurements as {format} for facility {request.facility} "
+            f"and time window {request.start_time.isoformat()} to {request.end_time.isoformat()}",
+        )
+        try:
+            schema, batches = self.timeseries_service.export_co2_measurements(request)
+        except OmniaUnavailableError as e:
+            raise _service_unavailable(e)
+        except DeadlineExceededError:
+            raise
+        except Exception:  # noqa: BLE001
+            raise HTTPException(
+                status_code=500, detail="Failed to retrieve CO2 measurements"
+            )
+
+        body: Iterator[bytes] = (
+            write_parquet(schema, batches)
+            if format == ExportFormat.PARQUET
+            else write_arrow_stream(schema, batches)
+        )
+        return StreamingResponse(
+            (chunk for chunk in body if chunk),
+            media_type=format.media_type,
+            headers={
+                "Content-Disposition": f'attachment; filename="co2_measurements.{format}"'
+            },
+        )
+
+    def explain_co2_measurements(
+        self,
+        request: DatapointsRequestModel = Body(
+            default=None,
+            embed=False,
+            title="SARA Timeseries Co2 Measurements Read Plan",
+            description="Explain how CO2 measurements for the given facility and time window would be read",
+        ),
+        analyze: bool = Query(
+            default=False,
+            description="Execute the read and include its actual row count and duration",
+        ),
+    ) -> ReadPlanModel:
+        try:
+            return self.timeseries_service.explain_co2_measurements(
+                request, analyze=analyze
+            )
+        except OmniaUnavailableError as e:
+            raise _service_unavailable(e)
+        except DeadlineExceededError:
+            raise
+        except Exception:  # noqa: BLE001
+            raise HTTPException(
+                status_code=500, detail="Failed to plan CO2 measurements read"
+            )
+
+    def get_co2_measurements_page(
+        self,
+        request: DatapointsPageRequestModel = Body(
+            default=None,
+            embed=False,
+            title="SARA Timeseries Co2 Measurements Page",
+            description="Retrieve one page of CO2 measurements for the given facility and time window",
+        ),
+    ) -> DatapointsPageResponseModel:
         try:
-            return self.timeseries_service.get_co2_measurements(request)
+            return self.timeseries_service.get_co2_measurements_page(request)
+        except HTTPException:
+            raise
+        except OmniaUnavailableError as e:
+            raise _service_unavailable(e)
+        except DeadlineExceededError:
+            raise
         except Exception:  # noqa: BLE001
             raise HTTPException(
                 status_code=500, detail="Failed to retrieve CO2 measurements"
@@ -72,17 +286,45 @@ class TimeseriesController:
             return self.timeseries_service.get_co2_concentration(request)
         except HTTPException:
             raise
+        except OmniaUnavailableError as e:
+            raise _service_unavailable(e)
+        except DeadlineExceededError:
+            raise
         except Exception:  # noqa: BLE001
             raise HTTPException(
                 status_code=500, detail="Failed to retrieve CO2 concentration"
             )
 
+    def get_co2_concentrations(
+        self,
+        request: CO2ConcentrationBatchRequestModel = Body(
+            default=None,
+            embed=False,
+            title="SARA Timeseries Co2 Concentrations",
+            description="Retrieve CO2 concentrations for many tasks on one facility",
+        ),
+    ) -> CO2ConcentrationBatchResponseModel:
+        logger.info(
+            f"Received request to retrieve CO2 concentrations for {len(request.tasks)} tasks "
+            f"on facility {request.facility}"
+        )
+        try:
+            return self.timeseries_service.get_co2_concentrations(request)
+        except OmniaUnavailableError as e:
+            raise _service_unavailable(e)
+        except DeadlineExceededError:
+            raise
+        except Exception:  # noqa: BLE001
+            raise HTTPException(
+                status_code=500, detail="Failed to retrieve CO2 concentrations"
+            )
+
     def create_timeseries_router(self) -> APIRouter:
         router: APIRouter = APIRouter(tags=["timeseries"])
 
         router.add_api_route(
             path="/timeseries/datapoint",
-            endpoint=self.ingest_data,
+            endpoint=self.bulkheads.ingest.wrap(self.ingest_data),
             methods=["POST"],
             summary="Forward a single datapoint to be inserted into the Timeseries API",
             responses={
@@ -90,6 +332,9 @@ class TimeseriesController:
                     "description": "Successfully added datapoint to Timeseries API",
                     "model": ResponseModel,
                 },
+                HTTPStatus.TOO_MANY_REQUESTS.value: {
+                    "description": "Too many datapoints in flight, retry after the Retry-After header"
+                },
                 HTTPStatus.INTERNAL_SERVER_ERROR.value: {
                     "description": "API request failed du to an internal server error"
                 },
@@ -98,13 +343,87 @@ class TimeseriesController:
 
         router.add_api_route(
             path="/timeseries/get-co2-measurements",
-            endpoint=self.get_co2_measurements,
+            endpoint=self.bulkheads.read.wrap(self.get_co2_measurements),
             methods=["POST"],
+            response_model=DatapointsResponseModel | NormalizedDatapointsResponseModel,
             summary="Retrieve all CO2 measurements for the given facility and time period",
             responses={
                 HTTPStatus.OK.value: {
                     "description": "Successfully retrieved datapoints from Timeseries API",
-                    "model": DatapointsResponseModel,
+                    "model": DatapointsResponseModel
+                    | NormalizedDatapointsResponseModel,
+                },
+                HTTPStatus.INTERNAL_SERVER_ERROR.value: {
+                    "description": "API request failed due to an internal server error"
+                },
+            },
+        )
+
+        router.add_api_route(
+            path="/timeseries/get-co2-measurements/stream",
+            endpoint=self.bulkheads.read.wrap(self.stream_co2_measurements),
+            methods=["POST"],
+            summary="Stream all CO2 measurements for the given facility and time period as NDJSON",
+            response_class=StreamingResponse,
+            responses={
+                HTTPStatus.OK.value: {
+                    "description": "One JSON datapoint per line, emitted as each chunk is read from Timeseries API",
+                    "content": {"application/x-ndjson": {}},
+                },
+                HTTPStatus.INTERNAL_SERVER_ERROR.value: {
+                    "description": "API request failed due to an internal server error"
+                },
+            },
+        )
+
+        router.add_api_route(
+            path="/timeseries/get-co2-measurements/export",
+            endpoint=self.bulkheads.read.wrap(self.export_co2_measurements),
+            methods=["POST"],
+            summary="Export all CO2 measurements for the given facility and time period as Arrow IPC or Parquet",
+            response_class=StreamingResponse,
+            responses={
+                HTTPStatus.OK.value: {
+                    "description": "Columnar datapoints, written batch by batch as chunks are read from Timeseries API",
+                    "content": {
+                        ExportFormat.ARROW.media_type: {},
+                        ExportFormat.PARQUET.media_type: {},
+                    },
+                },
+                HTTPStatus.INTERNAL_SERVER_ERROR.value: {
+                    "description": "API request failed due to an internal server error"
+                },
+            },
+        )
+
+        router.add_api_route(
+            path="/timeseries/get-co2-measurements/explain",
+            endpoint=self.bulkheads.read.wrap(self.explain_co2_measurements),
+            methods=["POST"],
+            summary="Explain the read plan for CO2 measurements, with estimated and optionally actual cost",
+            responses={
+                HTTPStatus.OK.value: {
+                    "description": "Successfully planned the read",
+                    "model": ReadPlanModel,
+                },
+                HTTPStatus.INTERNAL_SERVER_ERROR.value: {
+                    "description": "API request failed due to an internal server error"
+                },
+            },
+        )
+
+        router.add_api_route(
+            path="/timeseries/get-co2-measurements/page",
+            endpoint=self.bulkheads.read.wrap(self.get_co2_measurements_page),
+            methods=["POST"],
+            summary="Retrieve one page of CO2 measurements, continued with the returned cursor",
+            responses={
+                HTTPStatus.OK.value: {
+                    "description": "Successfully retrieved a page of datapoints from Timeseries API",
+                    "model": DatapointsPageResponseModel,
+                },
+                HTTPStatus.BAD_REQUEST.value: {
+                    "description": "The cursor is invalid or was issued for another query"
                 },
                 HTTPStatus.INTERNAL_SERVER_ERROR.value: {
                     "description": "API request failed due to an internal server error"
@@ -114,7 +433,7 @@ class TimeseriesController:
 
         router.add_api_route(
             path="/timeseries/get-co2-concentration",
-            endpoint=self.get_co2_concentration,
+            endpoint=self.bulkheads.read.wrap(self.get_co2_concentration),
             methods=["POST"],
             summary="Retrieve CO2 concentration for a single task using inspection name, task time range and facility",
             responses={
@@ -134,4 +453,21 @@ class TimeseriesController:
             },
         )
 
+        router.add_api_route(
+            path="/timeseries/get-co2-concentrations",
+            endpoint=self.bulkheads.read.wrap(self.get_co2_concentrations),
+            methods=["POST"],
+            summary="Retrieve CO2 concentrations for many tasks on one facility in a single call",
+            responses={
+                HTTPStatus.OK.value: {
+                    "description": "Per-task CO2 concentration, or the NOT_FOUND/BAD_REQUEST status "
+                    "the single-task endpoint would have returned",
+                    "model": CO2ConcentrationBatchResponseModel,
+                },
+                HTTPStatus.INTERNAL_SERVER_ERROR.value: {
+                    "description": "API request failed due to an internal server error"
+                },
+            },
+        )
+
         return router
@@ -1,24 +1,100 @@
 import logging
+import time
+from collections.abc import Iterator
+from datetime import datetime, timedelta
 from http import HTTPStatus
 
+import pyarrow as pa
 from fastapi import HTTPException
-from omnia_timeseries.models import MessageModel, TimeseriesModel
+from omnia_timeseries.models import AggregateModel, MessageModel, TimeseriesModel
 
+from sara_timeseries.core.single_flight import SingleFlight
+from sara_timeseries.modules.sara_timeseries_api.adaptive_chunking import Chunk
+from sara_timeseries.modules.sara_timeseries_api.columnar_export import (
+    build_export_schema,
+    rows_to_record_batch,
+)
+from sara_timeseries.modules.sara_timeseries_api.downsampling import (
+    downsample_rows,
+    downsample_series,
+)
+from sara_timeseries.modules.sara_timeseries_api.measurement_cache import (
+    MeasurementCache,
+    build_measurement_cache,
+)
 from sara_timeseries.modules.sara_timeseries_api.models import (
+    CO2ConcentrationBatchRequestModel,
+    CO2ConcentrationBatchResponseModel,
     CO2ConcentrationRequestModel,
+    CO2ConcentrationResultModel,
+    DatapointsPageRequestModel,
+    DatapointsPageResponseModel,
     DatapointsRequestModel,
     DatapointsResponseModel,
+    DownsamplingMetadataModel,
+    DownsamplingMethod,
+    MeasurementsCursor,
+    NormalizedDatapointsResponseModel,
+    ReadMode,
+    ReadPlanModel,
     RequestModel,
     ResponseModel,
+    SeriesDatapointsModel,
+)
+from sara_timeseries.modules.sara_timeseries_api.omnia_service import (
+    AggregateFunction,
+    OmniaService,
+    PagePosition,
+    format_processing_interval,
+)
+from sara_timeseries.modules.sara_timeseries_api.query_planner import (
+    QueryPlanner,
+    build_query_planner,
 )
-from sara_timeseries.modules.sara_timeseries_api.omnia_service import OmniaService
 
 logger = logging.getLogger(__name__)
 
+CO2_MEASUREMENTS_DESCRIPTION: str = "CO2Measurement"
+
+
+def _exclude_test_robots(data: list[dict]) -> list[dict]:
+    return [
+        d for d in data if d.get("robot_name") != "NLSBot"
+    ]  # TODO: Remove when going to prod
+
+
+def _downsampling_metadata(
+    method: DownsamplingMethod,
+    max_points: int,
+    original_points: int,
+    returned_points: int,
+) -> DownsamplingMetadataModel:
+    return DownsamplingMetadataModel(
+        method=method,
+        max_points=max_points,
+        original_points=original_points,
+        returned_points=returned_points,
+        reduction_ratio=(original_points / returned_points if returned_points else 1.0),
+    )
+
 
 class TimeseriesService:
-    def __init__(self, omnia_service: OmniaService) -> None:
+    def __init__(
+        self,
+        omnia_service: OmniaService,
+        query_planner: QueryPlanner | None = None,
+        measurement_cache: MeasurementCache | None = None,
+    ) -> None:
         self.omnia_service = omnia_service
+        self.query_planner: QueryPlanner = (
+            query_planner if query_planner is not None else build_query_planner()
+        )
+        self.measurement_cache: MeasurementCache = (
+            measurement_cache
+            if measurement_cache is not None
+            else build_measurement_cache()
+        )
+        self.measurements_flight: SingleFlight = SingleFlight("co2_measurements")
 
     def ingest_datapoint(self, datapoint: RequestModel) -> ResponseModel:
         try:
@@ -61,38 +137,297 @@ class TimeseriesService:
         )
 
     def get_co2_measurements(
-        self, request: DatapointsRequestModel
+        self,
+        request: DatapointsRequestModel,
+        max_points: int | None = None,
+        downsampling: DownsamplingMethod = DownsamplingMethod.LTTB,
     ) -> DatapointsResponseModel:
-        co2_measurements_description: str = "CO2Measurement"
+        """
+        All CO2 measurements for the facility and window. With max_points, each
+        series is downsampled to at most that many points. Identical concurrent
+        requests share one read.
+        """
+        return self.measurements_flight.do(
+            (
+                request.facility,
+                request.start_time,
+                request.end_time,
+                max_points,
+                downsampling,
+            ),
+            lambda: self._get_co2_measurements(request, max_points, downsampling),
+        )
+
+    def _get_co2_measurements(
+        self,
+        request: DatapointsRequestModel,
+        max_points: int | None,
+        downsampling: DownsamplingMethod,
+    ) -> DatapointsResponseModel:
+        timeseries: list[TimeseriesModel] = self._read_co2_timeseries(request.facility)
+
         try:
-            timeseries: list[TimeseriesModel] = (
-                self.omnia_service.read_timeseries_by_description_and_facility(
-                    description=co2_measurements_description,
-                    facility=request.facility,
+            data: list[dict] = self._read_with_plan(timeseries, request)[0]
+            data = _exclude_test_robots(data)
+            metadata: DownsamplingMetadataModel | None = None
+            if max_points is not None:
+                original_points: int = len(data)
+                data = downsample_rows(data, max_points, downsampling)
+                metadata = _downsampling_metadata(
+                    downsampling, max_points, original_points, len(data)
                 )
+            # Rows are built here from Omnia responses; skip re-validating every dict
+            return DatapointsResponseModel.model_construct(
+                data=data, downsampling=metadata
             )
+
+        except Exception:
+            logger.error("Failed to retrieve data from CO2 measurement timeseries")
+            raise
+
+    def get_co2_measurement_aggregates(
+        self,
+        request: DatapointsRequestModel,
+        aggregate_functions: list[AggregateFunction],
+        processing_interval: timedelta,
+    ) -> list[dict]:
+        """
+        Server-side aggregates of the CO2 measurements, one row per series and
+        processing interval, flattened with the series metadata.
+        """
+        timeseries: list[TimeseriesModel] = self._read_co2_timeseries(request.facility)
+
+        try:
+            rows: list[dict] = self._read_with_plan(
+                timeseries, request, aggregate_functions, processing_interval
+            )[0]
+            return _exclude_test_robots(rows)
+
         except Exception:
             logger.error(
-                f"Failed to retrieve timeseries for description {co2_measurements_description} "
-                f"and facility {request.facility}"
+                "Failed to retrieve aggregates from CO2 measurement timeseries"
             )
             raise
 
-        try:
-            data: list[dict] = self.omnia_service.read_data_from_multiple_timeseries(
+    def explain_co2_measurements(
+        self, request: DatapointsRequestModel, analyze: bool = False
+    ) -> ReadPlanModel:
+        """
+        The plan get_co2_measurements would execute for the request, with its
+        estimated cost. With analyze, the read is executed and the actual row count
+        and duration are included.
+        """
+        timeseries: list[TimeseriesModel] = self._read_co2_timeseries(request.facility)
+        if analyze:
+            return self._read_with_plan(timeseries, request)[1]
+        return self._plan_read(timeseries, request)[0]
+
+    def _plan_read(
+        self,
+        timeseries: list[TimeseriesModel],
+        request: DatapointsRequestModel,
+        aggregate_functions: list[AggregateFunction] | None = None,
+        processing_interval: timedelta | None = None,
+    ) -> tuple[ReadPlanModel, str, list[dict] | None, list[Chunk] | None]:
+        variant: str = "raw"
+        if aggregate_functions is not None:
+            variant = f"{','.join(aggregate_functions)}@" + format_processing_interval(
+                processing_interval or (request.end_time - request.start_time)
+            )
+        cached_rows: list[dict] | None = self.measurement_cache.get(
+            request.facility, request.start_time, request.end_time, variant
+        )
+        # Live raw reads are laid out by the chunker's per-series density
+        chunks: list[Chunk] | None = None
+        if cached_rows is None and aggregate_functions is None:
+            chunks = self.omnia_service.plan_chunks(
+                timeseries, request.start_time, request.end_time
+            )
+        plan: ReadPlanModel = self.query_planner.plan(
+            series_count=len(timeseries),
+            start_time=request.start_time,
+            end_time=request.end_time,
+            mode=ReadMode.RAW if aggregate_functions is None else ReadMode.AGGREGATE,
+            processing_interval=processing_interval,
+            cached=cached_rows is not None,
+            chunks=chunks,
+        )
+        return plan, variant, cached_rows, chunks
+
+    def _read_with_plan(
+        self,
+        timeseries: list[TimeseriesModel],
+        request: DatapointsRequestModel,
+        aggregate_functions: list[AggregateFunction] | None = None,
+        processing_interval: timedelta | None = None,
+    ) -> tuple[list[dict], ReadPlanModel]:
+        """
+        Plan the read, serve it from the measurement cache or execute it against
+        Omnia, and record the actual cost with the planner.
+        """
+        plan, variant, rows, chunks = self._plan_read(
+            timeseries, request, aggregate_functions, processing_interval
+        )
+        started: float = time.perf_counter()
+        if rows is None:
+            rows = self.omnia_service.read_with_plan(
                 timeseries=timeseries,
                 start_time=request.start_time,
                 end_time=request.end_time,
+                series_per_request=plan.series_per_request,
+                time_slices=plan.time_slices,
+                parallelism=plan.parallelism,
+                aggregate_functions=aggregate_functions,
+                processing_interval=processing_interval,
+                chunks=chunks,
+            )
+            self.measurement_cache.put(
+                request.facility, request.start_time, request.end_time, rows, variant
+            )
+        executed: ReadPlanModel = self.query_planner.record(
+            plan, len(rows), time.perf_counter() - started
+        )
+        logger.info(
+            f"Read {executed.actual_rows} rows for facility {request.facility} from "
+            f"{executed.source} in {executed.actual_seconds:.3f} s with "
+            f"{executed.requests} requests (estimated {executed.estimated_seconds:.3f} s)"
+        )
+        return rows, executed
+
+    def get_co2_measurements_normalized(
+        self,
+        request: DatapointsRequestModel,
+        max_points: int | None = None,
+        downsampling: DownsamplingMethod = DownsamplingMethod.LTTB,
+    ) -> NormalizedDatapointsResponseModel:
+        timeseries: list[TimeseriesModel] = self._read_co2_timeseries(request.facility)
+
+        try:
+            series: list[dict] = (
+                self.omnia_service.read_series_from_multiple_timeseries(
+                    timeseries=timeseries,
+                    start_time=request.start_time,
+                    end_time=request.end_time,
+                )
+            )
+            series = [
+                s for s in series if s["metadata"].get("robot_name") != "NLSBot"
+            ]  # TODO: Remove robot filter when going to prod
+            metadata: DownsamplingMetadataModel | None = None
+            if max_points is not None:
+                original_points: int = sum(len(s["time"]) for s in series)
+                series = [
+                    downsample_series(s, max_points, downsampling) for s in series
+                ]
+                metadata = _downsampling_metadata(
+                    downsampling,
+                    max_points,
+                    original_points,
+                    sum(len(s["time"]) for s in series),
+                )
+            return NormalizedDatapointsResponseModel(
+                series=[SeriesDatapointsModel.model_validate(s) for s in series],
+                downsampling=metadata,
             )
-            filtered_data = [
-                d for d in data if d.get("robot_name") != "NLSBot"
-            ]  # TODO: Remove when going to prod
-            return DatapointsResponseModel(data=filtered_data)
 
         except Exception:
             logger.error("Failed to retrieve data from CO2 measurement timeseries")
             raise
 
+    def stream_co2_measurements(
+        self, request: DatapointsRequestModel
+    ) -> Iterator[list[dict]]:
+        """
+        Resolve the CO2 timeseries eagerly, so that lookup failures surface before
+        a response is started, and return an iterator over datapoint chunks.
+        """
+        timeseries: list[TimeseriesModel] = self._read_co2_timeseries(request.facility)
+        return self._iter_co2_measurements(timeseries, request)
+
+    def export_co2_measurements(
+        self, request: DatapointsRequestModel
+    ) -> tuple[pa.Schema, Iterator[pa.RecordBatch]]:
+        """
+        Schema and record batches for a columnar export. The schema is derived from
+        the catalog up front; one batch is built per multi-datapoint request.
+        """
+        timeseries: list[TimeseriesModel] = self._read_co2_timeseries(request.facility)
+        schema: pa.Schema = build_export_schema(timeseries)
+        chunks: Iterator[list[dict]] = self._iter_co2_measurements(timeseries, request)
+        return schema, (rows_to_record_batch(chunk, schema) for chunk in chunks)
+
+    def get_co2_measurements_page(
+        self, request: DatapointsPageRequestModel
+    ) -> DatapointsPageResponseModel:
+        query: str = MeasurementsCursor.query_of(request)
+        cursor = MeasurementsCursor(query=query, series_index=0)
+        if request.cursor is not None:
+            try:
+                cursor = MeasurementsCursor.decode(request.cursor)
+            except ValueError:  # includes base64 and pydantic validation errors
+                raise HTTPException(
+                    status_code=HTTPStatus.BAD_REQUEST, detail="Invalid cursor"
+                )
+            if cursor.query != query:
+                raise HTTPException(
+                    status_code=HTTPStatus.BAD_REQUEST,
+                    detail="Cursor does not belong to the given facility and time window",
+                )
+
+        timeseries: list[TimeseriesModel] = self._read_co2_timeseries(request.facility)
+        try:
+            data, position = self.omnia_service.read_page_from_multiple_timeseries(
+                timeseries=timeseries,
+                start_time=request.start_time,
+                end_time=request.end_time,
+                page_size=request.page_size,
+                position=PagePosition(
+                    cursor.series_index, cursor.watermark, cursor.offset
+                ),
+            )
+        except Exception:
+            logger.error("Failed to retrieve data from CO2 measurement timeseries")
+            raise
+
+        next_cursor: str | None = None
+        if position is not None:
+            next_cursor = MeasurementsCursor(
+                query=query,
+                series_index=position.series_index,
+                watermark=position.watermark,
+                offset=position.offset,
+            ).encode()
+        return DatapointsPageResponseModel(
+            data=_exclude_test_robots(data), next_cursor=next_cursor
+        )
+
+    def _iter_co2_measurements(
+        self, timeseries: list[TimeseriesModel], request: DatapointsRequestModel
+    ) -> Iterator[list[dict]]:
+        try:
+            for chunk in self.omnia_service.iter_data_from_multiple_timeseries(
+                timeseries=timeseries,
+                start_time=request.start_time,
+                end_time=request.end_time,
+            ):
+                yield _exclude_test_robots(chunk)
+        except Exception:
+            logger.exception("Failed to stream data from CO2 measurement timeseries")
+            raise
+
+    def _read_co2_timeseries(self, facility: str) -> list[TimeseriesModel]:
+        try:
+            return self.omnia_service.read_timeseries_by_description_and_facility(
+                description=CO2_MEASUREMENTS_DESCRIPTION,
+                facility=facility,
+            )
+        except Exception:
+            logger.error(
+                f"Failed to retrieve timeseries for description {CO2_MEASUREMENTS_DESCRIPTION} "
+                f"and facility {facility}"
+            )
+            raise
+
     def get_co2_concentration(self, request: CO2ConcentrationRequestModel) -> float:
         co2_measurements_description: str = "CO2Measurement"
         try:
@@ -120,10 +455,14 @@ class TimeseriesService:
             raise
 
         try:
-            data: list[dict] = self.omnia_service.read_data_from_multiple_timeseries(
-                timeseries=timeseries,
-                start_time=request.task_start_time,
-                end_time=request.task_end_time,
+            # Only zero, one or more datapoints matter, so stop reading after two
+            data: list[AggregateModel] = (
+                self.omnia_service.read_datapoints_from_multiple_timeseries(
+                    timeseries=timeseries,
+                    start_time=request.task_start_time,
+                    end_time=request.task_end_time,
+                    limit_per_series=2,
+                )
             )
             if len(data) == 1:
                 return data[0]["value"]
@@ -149,3 +488,68 @@ class TimeseriesService:
         except Exception:
             logger.error("Failed to retrieve data from CO2 measurement timeseries")
             raise
+
+    def get_co2_concentrations(
+        self, request: CO2ConcentrationBatchRequestModel
+    ) -> CO2ConcentrationBatchResponseModel:
+        """
+        Batch counterpart of get_co2_concentration: all inspection names are resolved
+        with one catalog lookup for the facility and all task windows are read in
+        as few multi-datapoint requests as possible. Each task gets the status the
+        single-task endpoint would have answered with.
+        """
+        timeseries: list[TimeseriesModel] = self._read_co2_timeseries(request.facility)
+        series_ids_by_name: dict[str, list[str]] = {}
+        for series in timeseries:
+            ids: list[str] = series_ids_by_name.setdefault(series["name"], [])
+            if series["id"] not in ids:
+                ids.append(series["id"])
+
+        windows: list[tuple[str, datetime, datetime]] = []
+        window_indices: list[list[int]] = []
+        for task in request.tasks:
+            indices: list[int] = []
+            for series_id in series_ids_by_name.get(task.inspection_name, []):
+                indices.append(len(windows))
+                windows.append((series_id, task.task_start_time, task.task_end_time))
+            window_indices.append(indices)
+
+        try:
+            datapoints: list[list[AggregateModel]] = (
+                self.omnia_service.read_datapoints_for_windows(
+                    windows, limit_per_window=2
+                )
+            )
+        except Exception:
+            logger.error("Failed to retrieve data from CO2 measurement timeseries")
+            raise
+
+        results: list[CO2ConcentrationResultModel] = []
+        for task, indices in zip(request.tasks, window_indices, strict=True):
+            task_fields: dict = task.model_dump()
+            values: list[float] = [dp["value"] for i in indices for dp in datapoints[i]]
+            if not indices:
+                result = CO2ConcentrationResultModel(
+                    **task_fields,
+                    status_code=HTTPStatus.NOT_FOUND,
+                    detail="No CO2 concentration timeseries found for the given inspection name and facility",
+                )
+            elif len(values) == 1:
+                result = CO2ConcentrationResultModel(
+                    **task_fields, status_code=HTTPStatus.OK, value=values[0]
+                )
+            elif not values:
+                result = CO2ConcentrationResultModel(
+                    **task_fields,
+                    status_code=HTTPStatus.NOT_FOUND,
+                    detail="No CO2 concentration found",
+                )
+            else:
+                result = CO2ConcentrationResultModel(
+                    **task_fields,
+                    status_code=HTTPStatus.BAD_REQUEST,
+                    detail="Multiple CO2 concentrations found",
+                )
+            results.append(result)
+
+        return CO2ConcentrationBatchResponseModel(results=results)
@@ -1,37 +1,92 @@
+import functools
 import json
 
 from azure.storage.blob import BlobClient, BlobServiceClient, ContainerClient
 
-from sara_timeseries.core.credentials import build_credential
+from sara_timeseries.core.cache import SharedCache, build_shared_cache
+from sara_timeseries.core.credentials import CachingTokenCredential, build_credential
 from sara_timeseries.core.settings import settings
 from sara_timeseries.modules.sara_timeseries_insights.visualize_gas_concentration import (
     MapCorners,
 )
 
+BLOB_TOKEN_SCOPE: str = "https://storage.azure.com/.default"
 
-def get_map_and_corners(facility: str) -> tuple[bytes, MapCorners]:
+
+@functools.cache
+def blob_credential() -> CachingTokenCredential:
+    """Credential shared by all blob clients, with tokens refreshed in the background."""
     # In AKS, WorkloadIdentityCredential reads the federated token mounted by
     # the workload-identity webhook (the pod's service account is annotated
     # with the sara app registration client ID). Locally, AzureCliCredential
     # is used (`az login`). The chain is configurable via
     # SARA_TIMESERIES_AZURE_AUTH_METHODS; "ClientSecret" can be added when a
     # secret-based fallback is needed.
-    credentials = build_credential(
-        settings.AZURE_AUTH_METHODS,
-        tenant_id=settings.TENANT_ID,
-        client_id=settings.AZURE_CLIENT_ID,
-        client_secret=settings.AZURE_CLIENT_SECRET,
+    return CachingTokenCredential(
+        build_credential(
+            settings.AZURE_AUTH_METHODS,
+            tenant_id=settings.TENANT_ID,
+            client_id=settings.AZURE_CLIENT_ID,
+            client_secret=settings.AZURE_CLIENT_SECRET,
+        ),
+        name="blob",
+        refresh_before_seconds=settings.TOKEN_REFRESH_BEFORE_SECONDS,
+    )
+
+
+@functools.cache
+def _blob_service_client() -> BlobServiceClient:
+    return BlobServiceClient(
+        account_url=settings.BLOB_STORAGE_ACCOUNT_URL, credential=blob_credential()
     )
 
-    blob_service_client = BlobServiceClient(
-        account_url=settings.BLOB_STORAGE_ACCOUNT_URL, credential=credentials
+
+@functools.cache
+def _map_cache() -> SharedCache:
+    return build_shared_cache(
+        "maps", memory_entries=8, max_bytes=settings.MAP_CACHE_MAX_BYTES
     )
-    container_client: ContainerClient = blob_service_client.get_container_client(
+
+
+def get_map_and_corners(facility: str) -> tuple[bytes, MapCorners, str]:
+    """
+    Floorplan and corner positions for the given facility, downloaded at most
+    once per MAP_CACHE_TTL_SECONDS across workers.
+    Returns (map_jpg, corners, map_etag).
+    """
+    cache: SharedCache = _map_cache()
+    key: str = facility.lower()
+    # The map is stored under its ETag, so map and metadata always match
+    metadata: bytes | None = cache.get(f"{key}|metadata")
+    if metadata is not None:
+        cached: dict = json.loads(metadata)
+        map_jpg: bytes | None = cache.get(f"{key}|{cached['etag']}")
+        if map_jpg is not None:
+            return (
+                map_jpg,
+                MapCorners.model_validate(cached["corners"]),
+                cached["etag"],
+            )
+
+    map_jpg, corners, map_etag = _download_map_and_corners(facility)
+    cache.set(f"{key}|{map_etag}", map_jpg, ttl_seconds=settings.MAP_CACHE_TTL_SECONDS)
+    cache.set(
+        f"{key}|metadata",
+        json.dumps({"etag": map_etag, "corners": corners.model_dump()}).encode(),
+        ttl_seconds=settings.MAP_CACHE_TTL_SECONDS,
+    )
+    return map_jpg, corners, map_etag
+
+
+def _download_map_and_corners(facility: str) -> tuple[bytes, MapCorners, str]:
+    container_client: ContainerClient = _blob_service_client().get_container_client(
         facility.lower()
     )
 
     map_blob_client: BlobClient = container_client.get_blob_client("map.jpeg")
-    map_jpg: bytes = map_blob_client.download_blob().readall()
+    map_download = map_blob_client.download_blob()
+    map_etag: str = map_download.properties.etag
+    map_jpg: bytes = map_download.readall()
 
     corners_blob_client: BlobClient = container_client.get_blob_client(
         "map_corners.json"
@@ -41,4 +96,4 @@ def get_map_and_corners(facility: str) -> tuple[bytes, MapCorners]:
     corners_dict: dict = json.loads(corners_string)
     corners = MapCorners.model_validate(corners_dict)
 
-    return map_jpg, corners
+    return map_jpg, corners, map_etag
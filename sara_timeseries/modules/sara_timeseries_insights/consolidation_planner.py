@@ -0,0 +1,84 @@
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+from enum import StrEnum
+from typing import NamedTuple
+
+from sara_timeseries.modules.sara_timeseries_api.omnia_service import (
+    AggregateFunction,
+)
+from sara_timeseries.modules.sara_timeseries_insights.models import (
+    ConsolidationStatistic,
+)
+
+# Order statistics cannot be derived from per-interval aggregates
+RAW_ONLY_STATISTICS: frozenset[ConsolidationStatistic] = frozenset(
+    {
+        ConsolidationStatistic.MEDIAN,
+        ConsolidationStatistic.P95,
+        ConsolidationStatistic.P75,
+        ConsolidationStatistic.MEAN_TOP10,
+    }
+)
+
+
+class ReadPath(StrEnum):
+    RAW = "raw"
+    AGGREGATE = "aggregate"
+
+
+class ConsolidationPlan(NamedTuple):
+    path: ReadPath
+    reason: str
+    aggregate_functions: tuple[AggregateFunction, ...] = ()
+    processing_interval: timedelta | None = None
+
+
+def processing_interval_for_window(window: timedelta) -> timedelta:
+    """
+    Hourly intervals up to a week, daily beyond. The interval bounds the
+    resolution of time_min/time_max on the aggregate path.
+    """
+    return timedelta(hours=1) if window <= timedelta(days=7) else timedelta(days=1)
+
+
+def plan_consolidation_read(
+    start_time: datetime,
+    end_time: datetime,
+    statistics: Iterable[ConsolidationStatistic],
+    min_aggregate_window: timedelta,
+) -> ConsolidationPlan:
+    """
+    Choose between reading raw datapoints and Omnia server-side aggregates.
+    Aggregates are only used for windows of at least min_aggregate_window and
+    when every requested statistic can be combined across intervals.
+    """
+    requested: set[ConsolidationStatistic] = set(statistics)
+    raw_only: set[ConsolidationStatistic] = requested & RAW_ONLY_STATISTICS
+    if raw_only:
+        return ConsolidationPlan(
+            path=ReadPath.RAW,
+            reason=f"exact order statistics requested: {', '.join(sorted(raw_only))}",
+        )
+
+    window: timedelta = end_time - start_time
+    if window < min_aggregate_window:
+        return ConsolidationPlan(
+            path=ReadPath.RAW,
+            reason=f"window {window} is shorter than {min_aggregate_window}",
+        )
+
+    # Count and mean are always needed to weight intervals when combining them
+    functions: list[AggregateFunction] = ["count", "avg"]
+    if ConsolidationStatistic.MIN in requested:
+        functions.append("min")
+    if ConsolidationStatistic.MAX in requested:
+        functions.append("max")
+    if ConsolidationStatistic.STD in requested:
+        functions.append("stddev")
+
+    return ConsolidationPlan(
+        path=ReadPath.AGGREGATE,
+        reason=f"window {window} only needs combinable statistics",
+        aggregate_functions=tuple(functions),
+        processing_interval=processing_interval_for_window(window),
+    )
@@ -1,33 +1,61 @@
 import logging
 from http import HTTPStatus
 
-from fastapi import APIRouter, Body, Depends, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
 from fastapi_azure_auth.user import User
 from pandas import DataFrame
 
 from sara_timeseries.authentication import authentication_dependency, azure_scheme
+from sara_timeseries.core.bulkhead import Bulkheads, build_bulkheads
+from sara_timeseries.core.deadline import DeadlineExceededError
+from sara_timeseries.core.etag import conditional_response, tag_response
+from sara_timeseries.core.json_response import FastJSONResponse
 from sara_timeseries.modules.sara_timeseries_insights.insights_service import (
     InsightsService,
 )
-from sara_timeseries.modules.sara_timeseries_insights.models import InsightsRequest
+from sara_timeseries.modules.sara_timeseries_insights.models import (
+    CO2ReportRequest,
+    ConsolidationRequest,
+    InsightsRequest,
+    ResampleRequest,
+)
 
 logger = logging.getLogger(__name__)
 
 
 class InsightsController:
-    def __init__(self, insights_service: InsightsService) -> None:
+    def __init__(
+        self,
+        insights_service: InsightsService,
+        bulkheads: Bulkheads | None = None,
+    ) -> None:
         self.insights_service: InsightsService = insights_service
+        self.bulkheads: Bulkheads = (
+            bulkheads if bulkheads is not None else build_bulkheads()
+        )
 
     def get_consolidated_co2_insights(
         self,
-        request: InsightsRequest = Body(
+        request: ConsolidationRequest = Body(
             default=None,
             embed=False,
             title="SARA Timeseries Co2 Measurements",
             description="Retrieve a consolidated overview of CO2 measurements for the given facility and time window",
         ),
-    ) -> list[dict]:
+    ) -> Response:
+        return self._consolidate(request)
+
+    def get_cacheable_consolidated_co2_insights(
+        self,
+        http_request: Request,
+        request: ConsolidationRequest = Query(
+            title="SARA Timeseries Co2 Measurements",
+            description="Retrieve a consolidated overview of CO2 measurements for the given facility and time window",
+        ),
+    ) -> Response:
+        return conditional_response(http_request, self._consolidate(request))
+
+    def _consolidate(self, request: ConsolidationRequest) -> Response:
         logger.info(
             f"Received request to consolidate CO2 measurements for facility {request.facility} and time window "
             f"{request.start_time.isoformat()} to {request.end_time.isoformat()}",
@@ -37,11 +65,14 @@ class InsightsController:
                 facility=request.facility,
                 start_time=request.start_time,
                 end_time=request.end_time,
+                statistics=request.statistics,
             )
             data = data[
                 data["robot_name"] != "NLSBot"
             ]  # TODO: Remove when going to prod
-            return data.to_dict("records")
+            return tag_response(FastJSONResponse(data))
+        except DeadlineExceededError:
+            raise
         except Exception:
             logger.exception("Failed to retrieve consolidated CO2 measurements")
             raise HTTPException(
@@ -49,29 +80,68 @@ class InsightsController:
                 detail="Failed to retrieve consolidated CO2 measurements",
             )
 
+    def get_resampled_co2_insights(
+        self,
+        request: ResampleRequest = Body(
+            default=None,
+            embed=False,
+            title="SARA Timeseries Co2 Trends",
+            description="Retrieve CO2 measurement statistics per inspection and time bucket for the given facility and time window",
+        ),
+    ) -> Response:
+        logger.info(
+            f"Received request to resample CO2 measurements per {request.interval} for facility {request.facility} "
+            f"and time window {request.start_time.isoformat()} to {request.end_time.isoformat()}",
+        )
+        try:
+            data: DataFrame = self.insights_service.resample_co2_measurements(
+                facility=request.facility,
+                start_time=request.start_time,
+                end_time=request.end_time,
+                interval=request.interval,
+            )
+            data = data[
+                data["robot_name"] != "NLSBot"
+            ]  # TODO: Remove when going to prod
+            return tag_response(FastJSONResponse(data))
+        except DeadlineExceededError:
+            raise
+        except Exception:
+            logger.exception("Failed to retrieve resampled CO2 measurements")
+            raise HTTPException(
+                status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+                detail="Failed to retrieve resampled CO2 measurements",
+            )
+
     def create_and_publish_CO2_report(
         self,
-        request: InsightsRequest = Body(
+        request: CO2ReportRequest = Body(
             default=None,
             embed=False,
             title="Create and publish CO2 report",
             description="Create and publish a CO2 report for the given facility and time window",
         ),
         user: User = Depends(azure_scheme),
-    ) -> StreamingResponse:
+    ) -> Response:
         logger.info(
             f"Received request to create and publish CO2 report for facility {request.facility} and time window "
             f"{request.start_time.isoformat()} to {request.end_time.isoformat()}",
         )
         try:
-            html = self.insights_service.create_CO2_report(
+            report = self.insights_service.create_CO2_report(
                 facility=request.facility,
                 start_time=request.start_time,
                 end_time=request.end_time,
+                options=request.report_options,
             )
+            report_format = request.report_options.report_format
             token = user.access_token
-            self.insights_service.publish_CO2_report(html=html, token=token)
-            return StreamingResponse(iter([html]), media_type="text/html")
+            self.insights_service.publish_CO2_report(
+                report=report, token=token, report_format=report_format
+            )
+            return Response(content=report, media_type=report_format.media_type)
+        except DeadlineExceededError:
+            raise
         except Exception:
             logger.exception("Failed to create and publish CO2 report.")
             raise HTTPException(
@@ -84,8 +154,9 @@ class InsightsController:
 
         router.add_api_route(
             path="/insights/consolidate-co2-measurements",
-            endpoint=self.get_consolidated_co2_insights,
+            endpoint=self.bulkheads.read.wrap(self.get_consolidated_co2_insights),
             methods=["POST"],
+            response_model=list[dict],
             summary="Retrieve consolidated CO2 measurements where the values are averaged",
             responses={
                 HTTPStatus.OK.value: {
@@ -98,9 +169,46 @@ class InsightsController:
             },
         )
 
+        router.add_api_route(
+            path="/insights/consolidate-co2-measurements",
+            endpoint=self.bulkheads.read.wrap(
+                self.get_cacheable_consolidated_co2_insights
+            ),
+            methods=["GET", "HEAD"],
+            response_model=list[dict],
+            summary="Retrieve consolidated CO2 measurements, answering 304 Not Modified when If-None-Match matches",
+            responses={
+                HTTPStatus.OK.value: {
+                    "description": "Successfully consolidated CO2 measurements",
+                },
+                HTTPStatus.NOT_MODIFIED.value: {
+                    "description": "The consolidation matches the given ETag",
+                },
+                HTTPStatus.INTERNAL_SERVER_ERROR.value: {
+                    "description": "API request failed du to an internal server error"
+                },
+            },
+        )
+
+        router.add_api_route(
+            path="/insights/resample-co2-measurements",
+            endpoint=self.bulkheads.read.wrap(self.get_resampled_co2_insights),
+            methods=["POST"],
+            response_model=list[dict],
+            summary="Retrieve consolidated CO2 statistics per inspection and hour, day or week",
+            responses={
+                HTTPStatus.OK.value: {
+                    "description": "Successfully resampled CO2 measurements",
+                },
+                HTTPStatus.INTERNAL_SERVER_ERROR.value: {
+                    "description": "API request failed du to an internal server error"
+                },
+            },
+        )
+
         router.add_api_route(
             path="/insights/create-and-publish-co2-report",
-            endpoint=self.create_and_publish_CO2_report,
+            endpoint=self.bulkheads.report.wrap(self.create_and_publish_CO2_report),
             methods=["POST"],
             dependencies=[authentication_dependency],
             summary="Create and publish a CO2 report for the given facility and time window",
@@ -1,9 +1,14 @@
-from datetime import datetime
+import logging
+from datetime import datetime, timedelta
 
 import numpy as np
 import pandas as pd
 from pandas import DataFrame, Series
 
+from sara_timeseries.core.cache import MemoryCache
+from sara_timeseries.core.deadline import check_deadline
+from sara_timeseries.core.settings import settings
+from sara_timeseries.core.single_flight import SingleFlight
 from sara_timeseries.modules.sara_timeseries_api.models import (
     DatapointsRequestModel,
 )
@@ -13,65 +18,271 @@ from sara_timeseries.modules.sara_timeseries_api.timeseries_service import (
 from sara_timeseries.modules.sara_timeseries_insights.blob_store import (
     get_map_and_corners,
 )
+from sara_timeseries.modules.sara_timeseries_insights.consolidation_planner import (
+    ConsolidationPlan,
+    ReadPath,
+    plan_consolidation_read,
+)
+from sara_timeseries.modules.sara_timeseries_insights.models import (
+    ConsolidationStatistic,
+    ReportFormat,
+    ReportOptions,
+    ResampleInterval,
+)
+from sara_timeseries.modules.sara_timeseries_insights.rasterize_gas_concentration import (
+    generate_gas_visualization_image,
+)
+from sara_timeseries.modules.sara_timeseries_insights.report_cache import (
+    ReportCache,
+    build_report_cache,
+    fingerprint_dataframe,
+)
 from sara_timeseries.modules.sara_timeseries_insights.sara_sap_api import (
     SaraSapApi,
     UploadedFile,
 )
 from sara_timeseries.modules.sara_timeseries_insights.visualize_gas_concentration import (
+    REPORT_METRIC_COLUMNS,
+    InterpolatedSurface,
+    MapCorners,
+    compute_interpolated_surfaces,
     generate_gas_visualization_html,
 )
 
+logger = logging.getLogger(__name__)
+
+
+_METADATA_COLUMNS: list[str] = [
+    "description",
+    "externalId",
+    "name",
+    "id",
+    "facility",
+    "robot_name",
+    "source",
+    "standardUnit",
+    "status",
+    "step",
+    "tag_id",
+    "unit",
+]
+
+
+def _bucket_start(times: Series, interval: ResampleInterval) -> Series:
+    if interval == ResampleInterval.HOUR:
+        return times.dt.floor("h")
+    day: Series = times.dt.floor("D")
+    if interval == ResampleInterval.DAY:
+        return day
+    # Weeks start on Monday
+    return day - pd.to_timedelta(times.dt.dayofweek, unit="D")
+
+
+def _compute_indicators(
+    measurements: DataFrame, by: list[str] | None = None
+) -> DataFrame:
+    """
+    Statistics per group of measurements (per inspection by default). Every
+    statistic, including the percentiles and the mean of the top 10 %, is computed
+    with grouped vectorized operations rather than per-group Python callbacks.
+    """
+    keys: list[str] = by or ["inspection_description"]
+    grouped = measurements.groupby(keys)
+    df: DataFrame = grouped.agg(
+        time_min=("time", "min"),
+        time_max=("time", "max"),
+        **{column: (column, "first") for column in _METADATA_COLUMNS},
+        # Core statistics
+        value_mean=("value", "mean"),
+        value_median=("value", "median"),
+        value_max=("value", "max"),
+        value_min=("value", "min"),
+        value_std=("value", "std"),
+        value_count=("value", "count"),
+    )
+    df["value_p95"] = grouped["value"].quantile(0.95)
+    df["value_p75"] = grouped["value"].quantile(0.75)
+    df["value_mean_top10"] = _mean_top_fraction(measurements, keys, 0.10)
+    return df.reset_index()
+
 
-def _percentile(x: Series, percentile: float) -> float:
-    return np.percentile(x, percentile) if len(x) else np.nan
-
-
-def _mean_top_percentile(x: Series, frac: float = 0.10) -> float:
-    """Return the mean of the top frac proportion of values in the series."""
-    n: int = max(1, int(len(x) * frac))
-    return float(x.nlargest(n).mean()) if len(x) else float("nan")
-
-
-def _compute_indicators(measurements: DataFrame) -> DataFrame:
-    df: DataFrame = (
-        measurements.groupby("inspection_description")
-        .agg(
-            time_min=("time", "min"),
-            time_max=("time", "max"),
-            description=("description", "first"),
-            externalId=("externalId", "first"),
-            name=("name", "first"),
-            id=("id", "first"),
-            facility=("facility", "first"),
-            robot_name=("robot_name", "first"),
-            source=("source", "first"),
-            standardUnit=("standardUnit", "first"),
-            status=("status", "first"),
-            step=("step", "first"),
-            tag_id=("tag_id", "first"),
-            unit=("unit", "first"),
-            # Core statistics
-            value_mean=("value", "mean"),
-            value_median=("value", "median"),
-            value_max=("value", "max"),
-            value_min=("value", "min"),
-            value_std=("value", "std"),
-            value_count=("value", "count"),
-            value_p95=("value", lambda x: _percentile(x, 95)),
-            value_p75=("value", lambda x: _percentile(x, 75)),
-            value_mean_top10=("value", lambda x: _mean_top_percentile(x, 0.10)),
-        )
-        .reset_index()
+def _mean_top_fraction(measurements: DataFrame, keys: list[str], frac: float) -> Series:
+    """Mean of the largest frac proportion (at least one) of the values per group."""
+    ordered: DataFrame = measurements[[*keys, "value"]].sort_values(
+        "value", ascending=False, kind="stable"
     )
+    grouped = ordered.groupby(keys)
+    rank: Series = grouped.cumcount()
+    top_n: Series = (
+        (grouped["value"].transform("count") * frac).astype(int).clip(lower=1)
+    )
+    top: DataFrame = ordered[rank < top_n]
+    return top.groupby(keys)["value"].mean()
+
+
+def _compute_indicators_from_aggregates(
+    aggregates: DataFrame,
+    statistics: list[ConsolidationStatistic],
+    processing_interval: timedelta,
+    end_time: datetime,
+) -> DataFrame:
+    """
+    Combine per-interval Omnia aggregates into per-inspection statistics. Means are
+    count-weighted and the standard deviation is pooled from the interval means
+    and (sample) standard deviations. time_min/time_max have the resolution of the
+    processing interval.
+    """
+    aggregates = aggregates.reindex(
+        columns=list(dict.fromkeys([*aggregates.columns, *_METADATA_COLUMNS]))
+    )
+    aggregates = aggregates[aggregates["count"] > 0].copy()
+    aggregates["time"] = pd.to_datetime(aggregates["time"], utc=True)
+    aggregates["weighted_sum"] = aggregates["avg"] * aggregates["count"]
+    aggregations: dict[str, tuple[str, str]] = {
+        "time_min": ("time", "min"),
+        "time_max": ("time", "max"),
+        **{column: (column, "first") for column in _METADATA_COLUMNS},
+        "value_count": ("count", "sum"),
+        "weighted_sum": ("weighted_sum", "sum"),
+    }
+    if ConsolidationStatistic.MAX in statistics:
+        aggregations["value_max"] = ("max", "max")
+    if ConsolidationStatistic.MIN in statistics:
+        aggregations["value_min"] = ("min", "min")
+    if ConsolidationStatistic.STD in statistics:
+        aggregates["sum_of_squares"] = (aggregates["count"] - 1) * aggregates[
+            "stddev"
+        ].fillna(0) ** 2 + aggregates["count"] * aggregates["avg"] ** 2
+        aggregations["sum_of_squares"] = ("sum_of_squares", "sum")
+
+    df: DataFrame = aggregates.groupby("inspection_description").agg(**aggregations)
+    end: pd.Timestamp = pd.Timestamp(end_time)
+    end = end.tz_localize("UTC") if end.tzinfo is None else end.tz_convert("UTC")
+    df["time_max"] = (df["time_max"] + processing_interval).clip(upper=end)
+    df["value_mean"] = df["weighted_sum"] / df["value_count"]
+    if ConsolidationStatistic.STD in statistics:
+        variance: Series = (
+            df["sum_of_squares"] - df["value_count"] * df["value_mean"] ** 2
+        ) / (df["value_count"] - 1)
+        df["value_std"] = np.sqrt(variance.clip(lower=0)).where(df["value_count"] > 1)
 
-    return df
+    columns: list[str] = [
+        "time_min",
+        "time_max",
+        *_METADATA_COLUMNS,
+        *(s.column for s in ConsolidationStatistic if s in statistics),
+    ]
+    return df[columns].reset_index()
 
 
 class InsightsService:
-    def __init__(self, timeseries_service: TimeseriesService) -> None:
+    def __init__(
+        self,
+        timeseries_service: TimeseriesService,
+        report_cache: ReportCache | None = None,
+    ) -> None:
         self.timeseries_service: TimeseriesService = timeseries_service
+        self.report_cache: ReportCache = (
+            report_cache if report_cache is not None else build_report_cache()
+        )
+        self.surface_cache: MemoryCache = MemoryCache(
+            max_entries=settings.INTERPOLATION_CACHE_ENTRIES
+        )
+        self.consolidation_flight: SingleFlight = SingleFlight("co2_consolidation")
 
     def consolidate_co2_measurements(
+        self,
+        facility: str,
+        start_time: datetime,
+        end_time: datetime,
+        statistics: list[ConsolidationStatistic] | None = None,
+    ) -> DataFrame:
+        """
+        Statistics per inspection over the window, all of them unless a subset is
+        requested. Long windows that need no order statistics are consolidated
+        from Omnia server-side aggregates instead of raw datapoints. Identical
+        concurrent requests share one computation; each caller gets its own copy.
+        """
+        shared: DataFrame = self.consolidation_flight.do(
+            (
+                facility,
+                start_time,
+                end_time,
+                tuple(sorted(statistics)) if statistics else None,
+            ),
+            lambda: self._consolidate_co2_measurements(
+                facility, start_time, end_time, statistics
+            ),
+        )
+        return shared.copy()
+
+    def _consolidate_co2_measurements(
+        self,
+        facility: str,
+        start_time: datetime,
+        end_time: datetime,
+        statistics: list[ConsolidationStatistic] | None,
+    ) -> DataFrame:
+        requested: list[ConsolidationStatistic] = (
+            list(statistics) if statistics else list(ConsolidationStatistic)
+        )
+        plan: ConsolidationPlan = plan_consolidation_read(
+            start_time,
+            end_time,
+            requested,
+            min_aggregate_window=timedelta(
+                hours=settings.AGGREGATE_READ_MIN_WINDOW_HOURS
+            ),
+        )
+        logger.info(
+            f"Consolidating CO2 measurements for facility {facility} from {plan.path} data: {plan.reason}"
+        )
+        if plan.path == ReadPath.AGGREGATE and plan.processing_interval is not None:
+            aggregates: DataFrame = pd.DataFrame(
+                self.timeseries_service.get_co2_measurement_aggregates(
+                    DatapointsRequestModel(
+                        facility=facility,
+                        start_time=start_time,
+                        end_time=end_time,
+                    ),
+                    aggregate_functions=list(plan.aggregate_functions),
+                    processing_interval=plan.processing_interval,
+                )
+            )
+            return _compute_indicators_from_aggregates(
+                aggregates, requested, plan.processing_interval, end_time
+            )
+
+        measurements: DataFrame = self._read_co2_measurements(
+            facility, start_time, end_time
+        )
+        computed_indicators: DataFrame = _compute_indicators(measurements)
+        if statistics:
+            computed_indicators = computed_indicators.drop(
+                columns=[s.column for s in ConsolidationStatistic if s not in requested]
+            )
+        return computed_indicators
+
+    def resample_co2_measurements(
+        self,
+        facility: str,
+        start_time: datetime,
+        end_time: datetime,
+        interval: ResampleInterval,
+    ) -> DataFrame:
+        """
+        The consolidation statistics per inspection and time bucket, from a single
+        fetch of the window and one groupby over (inspection, bucket_start).
+        """
+        measurements: DataFrame = self._read_co2_measurements(
+            facility, start_time, end_time
+        )
+        measurements["bucket_start"] = _bucket_start(measurements["time"], interval)
+        return _compute_indicators(
+            measurements, by=["inspection_description", "bucket_start"]
+        )
+
+    def _read_co2_measurements(
         self, facility: str, start_time: datetime, end_time: datetime
     ) -> DataFrame:
         measurements: DataFrame = pd.DataFrame(
@@ -85,26 +296,113 @@ class InsightsService:
         )
 
         measurements["time"] = pd.to_datetime(measurements["time"])
-        computed_indicators: DataFrame = _compute_indicators(measurements)
-        return computed_indicators
+        return measurements
 
     def create_CO2_report(
-        self, facility: str, start_time: datetime, end_time: datetime
+        self,
+        facility: str,
+        start_time: datetime,
+        end_time: datetime,
+        options: ReportOptions | None = None,
     ) -> bytes:
-        map_bytes_jpg, corners = get_map_and_corners(facility)
+        options = options if options is not None else ReportOptions()
+        variant: str = options.model_dump_json()
+        map_bytes_jpg, corners, map_etag = get_map_and_corners(facility)
+
+        cached_report: bytes | None = self.report_cache.get_closed_window_report(
+            facility, start_time, end_time, map_etag, variant
+        )
+        if cached_report is not None:
+            logger.info(f"Serving cached CO2 report for closed window on {facility}")
+            return cached_report
+
         consolidated_data: DataFrame = self.consolidate_co2_measurements(
             facility, start_time, end_time
         )
+        data_fingerprint: str = fingerprint_dataframe(consolidated_data)
+        cached_report = self.report_cache.get(
+            facility, start_time, end_time, map_etag, data_fingerprint, variant
+        )
+        if cached_report is not None:
+            logger.info(f"Serving cached CO2 report for {facility}")
+            return cached_report
 
-        html: bytes = generate_gas_visualization_html(
-            consolidated_data, image_bytes_jpg=map_bytes_jpg, corners=corners
+        interpolated_surfaces: dict[str, InterpolatedSurface] | None = None
+        if options.interpolation:
+            check_deadline("report interpolation")
+            interpolated_surfaces = self._get_interpolated_surfaces(
+                facility,
+                consolidated_data,
+                data_fingerprint,
+                corners,
+                options.interpolation_resolution,
+            )
+
+        check_deadline("report rendering")
+        report: bytes
+        if options.report_format == ReportFormat.HTML:
+            report = generate_gas_visualization_html(
+                consolidated_data,
+                image_bytes_jpg=map_bytes_jpg,
+                corners=corners,
+                spatial_grid=options.spatial_grid,
+                grid_cell_size=options.grid_cell_size,
+                interpolated_surfaces=interpolated_surfaces,
+            )
+        else:
+            report = generate_gas_visualization_image(
+                consolidated_data,
+                image_bytes_jpg=map_bytes_jpg,
+                corners=corners,
+                image_format=options.report_format,
+                spatial_grid=options.spatial_grid,
+                grid_cell_size=options.grid_cell_size,
+                interpolated_surfaces=interpolated_surfaces,
+            )
+        self.report_cache.put(
+            facility, start_time, end_time, map_etag, data_fingerprint, report, variant
         )
 
-        return html
+        return report
+
+    def _get_interpolated_surfaces(
+        self,
+        facility: str,
+        consolidated_data: DataFrame,
+        data_fingerprint: str,
+        corners: MapCorners,
+        resolution: float | None,
+    ) -> dict[str, InterpolatedSurface]:
+        key: str = "|".join(
+            (
+                facility,
+                data_fingerprint,
+                corners.model_dump_json(),
+                str(resolution),
+            )
+        )
+        surfaces: dict[str, InterpolatedSurface] | None = self.surface_cache.get(key)
+        if surfaces is None:
+            surfaces = compute_interpolated_surfaces(
+                consolidated_data,
+                REPORT_METRIC_COLUMNS,
+                corners,
+                resolution=resolution,
+            )
+            self.surface_cache.set(key, surfaces)
+        return surfaces
 
-    def publish_CO2_report(self, html: bytes, token: str) -> list[UploadedFile]:
+    def publish_CO2_report(
+        self,
+        report: bytes,
+        token: str,
+        report_format: ReportFormat = ReportFormat.HTML,
+    ) -> list[UploadedFile]:
+        check_deadline("report publishing")
         sara_sap_api = SaraSapApi(base_url="http://localhost:3017", token=token)
         uploaded_files: list[UploadedFile] = sara_sap_api.post_upload_co2_report(
-            html=html
+            report=report,
+            file_name=f"co2_report.{report_format.value}",
+            media_type=report_format.media_type,
         )
         return uploaded_files
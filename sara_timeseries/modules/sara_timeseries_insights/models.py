@@ -1,9 +1,69 @@
 from datetime import datetime
+from enum import StrEnum
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class InsightsRequest(BaseModel):
     facility: str
     start_time: datetime
     end_time: datetime
+
+
+class ConsolidationStatistic(StrEnum):
+    MEAN = "mean"
+    MEDIAN = "median"
+    MAX = "max"
+    MIN = "min"
+    STD = "std"
+    COUNT = "count"
+    P95 = "p95"
+    P75 = "p75"
+    MEAN_TOP10 = "mean_top10"
+
+    @property
+    def column(self) -> str:
+        return f"value_{self.value}"
+
+
+class ConsolidationRequest(InsightsRequest):
+    statistics: list[ConsolidationStatistic] | None = Field(
+        default=None,
+        description="Statistics to compute per inspection; all when omitted",
+    )
+
+
+class ResampleInterval(StrEnum):
+    HOUR = "hour"
+    DAY = "day"
+    WEEK = "week"
+
+
+class ResampleRequest(InsightsRequest):
+    interval: ResampleInterval = ResampleInterval.DAY
+
+
+class ReportFormat(StrEnum):
+    HTML = "html"
+    PNG = "png"
+    WEBP = "webp"
+
+    @property
+    def media_type(self) -> str:
+        return {
+            ReportFormat.HTML: "text/html",
+            ReportFormat.PNG: "image/png",
+            ReportFormat.WEBP: "image/webp",
+        }[self]
+
+
+class ReportOptions(BaseModel):
+    report_format: ReportFormat = ReportFormat.HTML
+    spatial_grid: bool = False
+    grid_cell_size: float | None = Field(default=None, gt=0)
+    interpolation: bool = False
+    interpolation_resolution: float | None = Field(default=None, gt=0)
+
+
+class CO2ReportRequest(InsightsRequest):
+    report_options: ReportOptions = Field(default_factory=ReportOptions)
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import io
+from collections.abc import Mapping, Sequence
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from PIL import Image, ImageDraw, ImageFont
+from plotly.colors import get_colorscale, unlabel_rgb
+
+from sara_timeseries.modules.sara_timeseries_insights.models import ReportFormat
+from sara_timeseries.modules.sara_timeseries_insights.visualize_gas_concentration import (
+    DEFAULT_METRIC_LABELS,
+    REPORT_METRIC_COLUMNS,
+    InterpolatedSurface,
+    MapCorners,
+    compute_color_bars,
+    prepare_points_for_plotting,
+)
+
+COLOR_LOOKUP_TABLE_SIZE: int = 256
+HEADER_HEIGHT: int = 48
+LEGEND_WIDTH: int = 110
+INTERPOLATION_ALPHA: int = 150
+# Floorplans are often several thousand pixels wide; the archived image does
+# not need that resolution and render time and size scale with the area.
+MAX_MAP_WIDTH: int = 1600
+
+_PIL_FORMATS: dict[ReportFormat, str] = {
+    ReportFormat.PNG: "PNG",
+    ReportFormat.WEBP: "WEBP",
+}
+
+
+@lru_cache(maxsize=8)
+def build_color_lookup_table(colorscale_name: str) -> np.ndarray:
+    """Sample a named Plotly colorscale into a (COLOR_LOOKUP_TABLE_SIZE, 3) uint8 table."""
+    colorscale: list[list] = get_colorscale(colorscale_name)
+    positions = np.array([float(position) for position, _ in colorscale])
+    colors = np.array([unlabel_rgb(color) for _, color in colorscale], dtype=float)
+    samples = np.linspace(0.0, 1.0, COLOR_LOOKUP_TABLE_SIZE)
+    table = np.stack(
+        [np.interp(samples, positions, colors[:, channel]) for channel in range(3)],
+        axis=1,
+    )
+    table = np.round(table).astype(np.uint8)
+    table.setflags(write=False)
+    return table
+
+
+def map_values_to_colors(
+    values: np.ndarray, limits: tuple[float, float], lookup_table: np.ndarray
+) -> np.ndarray:
+    """Map values onto lookup-table rows, clipping to limits. NaNs map to row 0."""
+    cmin, cmax = limits
+    span: float = cmax - cmin if cmax > cmin else 1.0
+    scaled = np.nan_to_num((values - cmin) / span, nan=0.0)
+    indices = np.clip(
+        (scaled * (len(lookup_table) - 1)).round(), 0, len(lookup_table) - 1
+    ).astype(np.intp)
+    return lookup_table[indices]
+
+
+def _to_pixels(
+    east: np.ndarray,
+    north: np.ndarray,
+    corners: MapCorners,
+    size: tuple[int, int],
+) -> tuple[np.ndarray, np.ndarray]:
+    east_min, east_max = corners.bottom_left.east, corners.bottom_right.east
+    north_min, north_max = corners.bottom_left.north, corners.top_left.north
+    width, height = size
+    x = (east - east_min) / (east_max - east_min) * width
+    y = (north_max - north) / (north_max - north_min) * height
+    return x, y
+
+
+def _draw_surface(
+    panel: Image.Image,
+    surface: InterpolatedSurface,
+    corners: MapCorners,
+    limits: tuple[float, float],
+    lookup_table: np.ndarray,
+) -> None:
+    rgba = np.zeros((*surface.values.shape, 4), dtype=np.uint8)
+    rgba[..., :3] = map_values_to_colors(surface.values, limits, lookup_table)
+    rgba[..., 3] = np.where(np.isnan(surface.values), 0, INTERPOLATION_ALPHA)
+    # Grid rows run south to north; image rows run top to bottom.
+    overlay = Image.fromarray(rgba[::-1], mode="RGBA")
+
+    east_step: float = surface.east[1] - surface.east[0] if len(surface.east) > 1 else 1
+    north_step: float = (
+        surface.north[1] - surface.north[0] if len(surface.north) > 1 else 1
+    )
+    x, y = _to_pixels(
+        np.array([surface.east[0] - east_step / 2, surface.east[-1] + east_step / 2]),
+        np.array(
+            [surface.north[-1] + north_step / 2, surface.north[0] - north_step / 2]
+        ),
+        corners,
+        panel.size,
+    )
+    left, top = max(int(x[0]), 0), max(int(y[0]), 0)
+    width, height = max(int(x[1]) - left, 1), max(int(y[1]) - top, 1)
+    overlay = overlay.resize((width, height), Image.Resampling.BILINEAR)
+    panel.alpha_composite(overlay, dest=(left, top))
+
+
+def _draw_legend(
+    draw: ImageDraw.ImageDraw,
+    origin: tuple[int, int],
+    height: int,
+    limits: tuple[float, float],
+    lookup_table: np.ndarray,
+    label: str,
+    font: ImageFont.ImageFont | ImageFont.FreeTypeFont,
+) -> None:
+    left, top = origin
+    bar_width: int = 18
+    bar_height: int = max(height - 40, 10)
+    draw.text((left, top), label, fill="black", font=font)
+    top += 20
+    rows = np.linspace(len(lookup_table) - 1, 0, bar_height).round().astype(np.intp)
+    for offset, row in enumerate(rows):
+        color = tuple(int(c) for c in lookup_table[row])
+        draw.line([(left, top + offset), (left + bar_width, top + offset)], fill=color)
+    draw.rectangle([left, top, left + bar_width, top + bar_height], outline="black")
+    cmin, cmax = limits
+    for fraction in (0.0, 0.25, 0.5, 0.75, 1.0):
+        y = top + (1 - fraction) * bar_height
+        draw.text(
+            (left + bar_width + 6, y - 6),
+            f"{cmin + fraction * (cmax - cmin):.3g}",
+            fill="black",
+            font=font,
+        )
+
+
+def render_metric_panel(
+    base_map: Image.Image,
+    dataframe: pd.DataFrame,
+    metric: str,
+    *,
+    corners: MapCorners,
+    limits: tuple[float, float],
+    lookup_table: np.ndarray,
+    title: str,
+    position_offset: float,
+    square_markers: bool,
+    surface: InterpolatedSurface | None = None,
+) -> Image.Image:
+    """Draw one metric's markers, color bar and title onto a copy of the floorplan."""
+    map_width, map_height = base_map.size
+    panel = Image.new(
+        "RGBA", (map_width + LEGEND_WIDTH, map_height + HEADER_HEIGHT), "white"
+    )
+    floorplan = base_map.copy()
+    if surface is not None:
+        _draw_surface(floorplan, surface, corners, limits, lookup_table)
+    panel.paste(floorplan, (0, HEADER_HEIGHT))
+
+    draw = ImageDraw.Draw(panel)
+    font = ImageFont.load_default()
+    draw.text((10, 14), title, fill="black", font=font)
+
+    x, y = _to_pixels(
+        dataframe["E"].to_numpy(dtype=float) + position_offset,
+        dataframe["N"].to_numpy(dtype=float) + position_offset,
+        corners,
+        (map_width, map_height),
+    )
+    colors = map_values_to_colors(
+        dataframe[metric].to_numpy(dtype=float), limits, lookup_table
+    )
+    radius: float = max(3.0, map_width / 200)
+    visible = np.isfinite(x) & np.isfinite(y)
+    for px, py, color in zip(x[visible], y[visible], colors[visible], strict=True):
+        box = [
+            px - radius,
+            py - radius + HEADER_HEIGHT,
+            px + radius,
+            py + radius + HEADER_HEIGHT,
+        ]
+        fill = tuple(int(c) for c in color)
+        if square_markers:
+            draw.rectangle(box, fill=fill, outline="black")
+        else:
+            draw.ellipse(box, fill=fill, outline="black")
+
+    _draw_legend(
+        draw,
+        (map_width + 12, HEADER_HEIGHT),
+        map_height,
+        limits,
+        lookup_table,
+        DEFAULT_METRIC_LABELS.get(metric, metric),
+        font,
+    )
+    return panel
+
+
+def generate_gas_visualization_image(
+    dataframe_in: pd.DataFrame,
+    image_bytes_jpg: bytes,
+    corners: MapCorners,
+    *,
+    image_format: ReportFormat = ReportFormat.PNG,
+    metric_columns: Sequence[str] = REPORT_METRIC_COLUMNS,
+    spatial_grid: bool = False,
+    grid_cell_size: float | None = None,
+    interpolated_surfaces: Mapping[str, InterpolatedSurface] | None = None,
+    colorscale_name: str = "OrRd",
+    title: str = "CO₂ Measurement Aggregates (E-N view)",
+    max_map_width: int = MAX_MAP_WIDTH,
+) -> bytes:
+    """
+    Static counterpart of generate_gas_visualization_html: one panel per metric,
+    stacked vertically, drawn directly onto the floorplan with Pillow.
+    """
+    if image_format not in _PIL_FORMATS:
+        raise ValueError(f"Unsupported raster format: {image_format}")
+
+    selected_metrics: list[str] = [
+        m for m in metric_columns if m in dataframe_in.columns
+    ]
+    if not selected_metrics:
+        raise ValueError("None of the requested metrics exist in the DataFrame.")
+    dataframe, position_offset = prepare_points_for_plotting(
+        dataframe_in,
+        selected_metrics,
+        corners,
+        spatial_grid=spatial_grid,
+        grid_cell_size=grid_cell_size,
+    )
+    color_bars: dict[str, tuple[float, float]] = compute_color_bars(
+        dataframe, selected_metrics
+    )
+    lookup_table: np.ndarray = build_color_lookup_table(colorscale_name)
+
+    earliest_date = pd.to_datetime(dataframe["time_min"]).min()
+    latest_date = pd.to_datetime(dataframe["time_max"]).max()
+    date_range_text = f"{earliest_date.date()} → {latest_date.date()}"
+
+    with Image.open(io.BytesIO(image_bytes_jpg)) as backdrop:
+        map_size: tuple[int, int] = (
+            min(backdrop.width, max_map_width),
+            round(
+                backdrop.height * min(backdrop.width, max_map_width) / backdrop.width
+            ),
+        )
+        # Let the JPEG decoder downscale by a power of two before resampling.
+        backdrop.draft("RGB", map_size)
+        base_map: Image.Image = backdrop.convert("RGBA").resize(
+            map_size, Image.Resampling.BILINEAR, reducing_gap=2.0
+        )
+
+    panels: list[Image.Image] = [
+        render_metric_panel(
+            base_map,
+            dataframe,
+            metric,
+            corners=corners,
+            limits=color_bars[metric],
+            lookup_table=lookup_table,
+            title=(
+                f"{title} — {DEFAULT_METRIC_LABELS.get(metric, metric)}"
+                f" — {date_range_text}"
+            ),
+            position_offset=position_offset,
+            square_markers=spatial_grid,
+            surface=(
+                interpolated_surfaces.get(metric)
+                if interpolated_surfaces is not None
+                else None
+            ),
+        )
+        for metric in selected_metrics
+    ]
+
+    report = Image.new(
+        "RGB",
+        (panels[0].width, sum(panel.height for panel in panels)),
+        "white",
+    )
+    top: int = 0
+    for panel in panels:
+        report.paste(panel.convert("RGB"), (0, top))
+        top += panel.height
+
+    output = io.BytesIO()
+    if image_format == ReportFormat.WEBP:
+        report.save(output, format=_PIL_FORMATS[image_format], quality=85, method=4)
+    else:
+        report.save(output, format=_PIL_FORMATS[image_format])
+    return output.getvalue()
@@ -0,0 +1,160 @@
+import hashlib
+import logging
+from datetime import UTC, datetime, timedelta
+
+import pandas as pd
+from pandas import DataFrame
+
+from sara_timeseries.core.cache import TieredCache, build_shared_cache
+from sara_timeseries.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_time(timestamp: datetime) -> str:
+    """Render a timestamp as UTC ISO-8601; naive timestamps are assumed to be UTC."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=UTC)
+    return timestamp.astimezone(UTC).isoformat()
+
+
+def fingerprint_dataframe(dataframe: DataFrame) -> str:
+    """Stable content hash of a DataFrame, independent of its index."""
+    digest = hashlib.sha256()
+    digest.update("\x1f".join(map(str, dataframe.columns)).encode("utf-8"))
+    row_hashes = pd.util.hash_pandas_object(
+        dataframe.astype(str), index=False
+    ).to_numpy()
+    digest.update(row_hashes.tobytes())
+    return digest.hexdigest()
+
+
+class ReportCache:
+    """
+    Cache for rendered CO2 reports.
+
+    Reports are keyed by facility, normalized time window, the ETag of the map
+    blob, the render variant (format and options) and a fingerprint of the
+    consolidated data. Reports for closed windows are kept without expiry and are
+    additionally indexed by window alone, so a retry can skip fetching and
+    consolidating the measurements altogether.
+    """
+
+    def __init__(
+        self,
+        cache: TieredCache,
+        open_window_ttl_seconds: float = 300,
+        closed_window_grace: timedelta = timedelta(hours=1),
+    ) -> None:
+        self.cache: TieredCache = cache
+        self.open_window_ttl_seconds: float = open_window_ttl_seconds
+        self.closed_window_grace: timedelta = closed_window_grace
+
+    def is_closed_window(self, end_time: datetime) -> bool:
+        if end_time.tzinfo is None:
+            end_time = end_time.replace(tzinfo=UTC)
+        return end_time <= datetime.now(UTC) - self.closed_window_grace
+
+    def get_closed_window_report(
+        self,
+        facility: str,
+        start_time: datetime,
+        end_time: datetime,
+        map_etag: str,
+        variant: str = "html",
+    ) -> bytes | None:
+        if not self.is_closed_window(end_time):
+            return None
+        report_key: bytes | None = self.cache.get(
+            self._window_key(facility, start_time, end_time, map_etag, variant)
+        )
+        if report_key is None:
+            return None
+        return self.cache.get(report_key.decode("utf-8"))
+
+    def get(
+        self,
+        facility: str,
+        start_time: datetime,
+        end_time: datetime,
+        map_etag: str,
+        data_fingerprint: str,
+        variant: str = "html",
+    ) -> bytes | None:
+        return self.cache.get(
+            self._report_key(
+                facility, start_time, end_time, map_etag, data_fingerprint, variant
+            )
+        )
+
+    def put(
+        self,
+        facility: str,
+        start_time: datetime,
+        end_time: datetime,
+        map_etag: str,
+        data_fingerprint: str,
+        report: bytes,
+        variant: str = "html",
+    ) -> None:
+        report_key: str = self._report_key(
+            facility, start_time, end_time, map_etag, data_fingerprint, variant
+        )
+        if not self.is_closed_window(end_time):
+            self.cache.set(report_key, report, ttl_seconds=self.open_window_ttl_seconds)
+            return
+
+        self.cache.set(report_key, report)
+        self.cache.set(
+            self._window_key(facility, start_time, end_time, map_etag, variant),
+            report_key.encode("utf-8"),
+        )
+
+    @staticmethod
+    def _window_key(
+        facility: str,
+        start_time: datetime,
+        end_time: datetime,
+        map_etag: str,
+        variant: str,
+    ) -> str:
+        return "|".join(
+            (
+                "co2-report-window",
+                facility.lower(),
+                normalize_time(start_time),
+                normalize_time(end_time),
+                map_etag,
+                variant,
+            )
+        )
+
+    @classmethod
+    def _report_key(
+        cls,
+        facility: str,
+        start_time: datetime,
+        end_time: datetime,
+        map_etag: str,
+        data_fingerprint: str,
+        variant: str,
+    ) -> str:
+        window_key: str = cls._window_key(
+            facility, start_time, end_time, map_etag, variant
+        )
+        return f"co2-report|{window_key}|{data_fingerprint}"
+
+
+def build_report_cache() -> ReportCache:
+    return ReportCache(
+        cache=build_shared_cache(
+            "reports",
+            memory_entries=settings.REPORT_CACHE_MEMORY_ENTRIES,
+            max_bytes=settings.REPORT_CACHE_MAX_BYTES,
+            directory=settings.REPORT_CACHE_DIR,
+        ),
+        open_window_ttl_seconds=settings.REPORT_CACHE_OPEN_WINDOW_TTL_SECONDS,
+        closed_window_grace=timedelta(
+            seconds=settings.REPORT_CACHE_CLOSED_WINDOW_GRACE_SECONDS
+        ),
+    )
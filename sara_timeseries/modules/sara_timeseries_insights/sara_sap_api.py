@@ -52,8 +52,13 @@ class SaraSapApi:
         work_order = PreventiveWorkOrder.model_validate(response.json())
         return work_order
 
-    def post_upload_co2_report(self, html: bytes) -> list[UploadedFile]:
-        files = [("files", ("co2_report.html", html, "text/html"))]
+    def post_upload_co2_report(
+        self,
+        report: bytes,
+        file_name: str = "co2_report.html",
+        media_type: str = "text/html",
+    ) -> list[UploadedFile]:
+        files = [("files", (file_name, report, media_type))]
         response = requests.post(
             url=f"{self.base_url}/insights-uploader",
             headers={"Authorization": f"Bearer {self.token}"},
@@ -3,6 +3,7 @@ from __future__ import annotations
 import base64
 import re
 from collections.abc import Iterable, Mapping, Sequence
+from typing import NamedTuple
 
 import numpy as np
 import pandas as pd
@@ -77,6 +78,321 @@ def coerce_metrics_and_time(
     return output
 
 
+# =========================
+# Spatial aggregation
+# =========================
+
+GRID_TARGET_CELLS_ALONG_LONGEST_AXIS: int = 64
+GRID_MIN_CELL_SIZE: float = 1.0
+
+# How each consolidated metric is combined when several inspection positions
+# fall into the same grid cell. Upper-tail statistics keep the cell maximum so
+# that hotspots are never diluted by neighbouring low readings.
+GRID_METRIC_COMBINATIONS: dict[str, str] = {
+    "value_mean": "weighted_mean",
+    "value_median": "weighted_mean",
+    "value_max": "max",
+    "value_min": "min",
+    "value_std": "pooled_std",
+    "value_count": "sum",
+    "value_p95": "max",
+    "value_p75": "max",
+    "value_mean_top10": "max",
+}
+
+
+def compute_grid_cell_size(
+    corners: MapCorners | None,
+    dataframe: pd.DataFrame,
+    target_cells_along_longest_axis: int = GRID_TARGET_CELLS_ALONG_LONGEST_AXIS,
+) -> float:
+    """
+    Pick a cell size (in metres) that splits the longest side of the floorplan, or
+    of the point cloud when no corners are known, into roughly the target number
+    of cells. Rounded up to whole half-metres and never below GRID_MIN_CELL_SIZE.
+    """
+    if corners is not None:
+        east_extent = corners.bottom_right.east - corners.bottom_left.east
+        north_extent = corners.top_left.north - corners.bottom_left.north
+    else:
+        east_extent = float(dataframe["E"].max() - dataframe["E"].min())
+        north_extent = float(dataframe["N"].max() - dataframe["N"].min())
+
+    longest: float = max(abs(east_extent), abs(north_extent))
+    if not np.isfinite(longest) or longest <= 0:
+        return GRID_MIN_CELL_SIZE
+    cell_size: float = np.ceil(2 * longest / target_cells_along_longest_axis) / 2
+    return max(GRID_MIN_CELL_SIZE, float(cell_size))
+
+
+def aggregate_positions_on_grid(
+    dataframe: pd.DataFrame,
+    *,
+    cell_size: float,
+    origin: tuple[float, float] = (0.0, 0.0),
+) -> pd.DataFrame:
+    """
+    Bin E/N positions onto a square grid and combine the per-position metrics of
+    each occupied cell according to GRID_METRIC_COMBINATIONS. Returns one row per
+    occupied cell with E/N set to the cell centre and 'positions' holding the
+    number of inspection positions that were merged.
+    """
+    if cell_size <= 0:
+        raise ValueError("Grid cell size must be positive")
+
+    points: pd.DataFrame = dataframe[dataframe["E"].notna() & dataframe["N"].notna()]
+    east_index = np.floor((points["E"].to_numpy() - origin[0]) / cell_size).astype(
+        np.int64
+    )
+    north_index = np.floor((points["N"].to_numpy() - origin[1]) / cell_size).astype(
+        np.int64
+    )
+    cells, cell_of_point = np.unique(
+        np.stack([east_index, north_index], axis=1), axis=0, return_inverse=True
+    )
+    cell_of_point = cell_of_point.reshape(-1)
+    number_of_cells: int = len(cells)
+
+    def _sum(values: np.ndarray) -> np.ndarray:
+        return np.bincount(cell_of_point, weights=values, minlength=number_of_cells)
+
+    counts: np.ndarray = (
+        pd.to_numeric(points["value_count"], errors="coerce").fillna(0).to_numpy()
+        if "value_count" in points.columns
+        else np.ones(len(points))
+    )
+    total_counts: np.ndarray = _sum(counts)
+    # Cells whose positions carry no counts fall back to an unweighted mean.
+    weights: np.ndarray = np.where(total_counts[cell_of_point] > 0, counts, 1.0)
+    total_weights: np.ndarray = _sum(weights)
+
+    output: dict[str, object] = {
+        "E": (cells[:, 0] + 0.5) * cell_size + origin[0],
+        "N": (cells[:, 1] + 0.5) * cell_size + origin[1],
+        "positions": np.bincount(cell_of_point, minlength=number_of_cells),
+    }
+
+    for column, combination in GRID_METRIC_COMBINATIONS.items():
+        if column not in points.columns:
+            continue
+        values = pd.to_numeric(points[column], errors="coerce").to_numpy(dtype=float)
+        if combination == "sum":
+            output[column] = total_counts
+        elif combination == "weighted_mean":
+            output[column] = _sum(np.nan_to_num(values) * weights) / total_weights
+        elif combination == "max":
+            combined = np.full(number_of_cells, -np.inf)
+            np.fmax.at(combined, cell_of_point, values)
+            output[column] = np.where(np.isneginf(combined), np.nan, combined)
+        elif combination == "min":
+            combined = np.full(number_of_cells, np.inf)
+            np.fmin.at(combined, cell_of_point, values)
+            output[column] = np.where(np.isposinf(combined), np.nan, combined)
+        elif combination == "pooled_std" and "value_mean" in points.columns:
+            means = pd.to_numeric(points["value_mean"], errors="coerce").to_numpy(
+                dtype=float
+            )
+            stds = np.nan_to_num(values)
+            cell_mean = _sum(np.nan_to_num(means) * weights) / total_weights
+            sum_of_squares = (
+                _sum(
+                    np.maximum(weights - 1, 0) * stds**2
+                    + weights * np.nan_to_num(means) ** 2
+                )
+                - total_weights * cell_mean**2
+            )
+            with np.errstate(invalid="ignore", divide="ignore"):
+                output[column] = np.sqrt(
+                    np.clip(sum_of_squares, 0, None) / (total_weights - 1)
+                )
+
+    for time_column, reducer in (("time_min", "min"), ("time_max", "max")):
+        if time_column in points.columns:
+            output[time_column] = (
+                pd.to_datetime(points[time_column], errors="coerce", utc=True)
+                .groupby(cell_of_point)
+                .agg(reducer)
+                .to_numpy()
+            )
+    if "unit" in points.columns:
+        output["unit"] = points["unit"].groupby(cell_of_point).first().to_numpy()
+
+    return pd.DataFrame(output)
+
+
+# =========================
+# Spatial interpolation
+# =========================
+
+INTERPOLATION_TARGET_CELLS_ALONG_LONGEST_AXIS: int = 512
+INTERPOLATION_MAX_CHUNK_BYTES: int = 32 * 1024 * 1024
+INTERPOLATION_MAX_DISTANCE: float = 15.0
+INTERPOLATION_POWER: float = 2.0
+
+
+class InterpolatedSurface(NamedTuple):
+    east: np.ndarray
+    north: np.ndarray
+    values: np.ndarray  # shape (len(north), len(east)); NaN outside coverage
+
+
+def compute_idw_surfaces(
+    point_east: np.ndarray,
+    point_north: np.ndarray,
+    point_values: np.ndarray,
+    *,
+    grid_east: np.ndarray,
+    grid_north: np.ndarray,
+    power: float = INTERPOLATION_POWER,
+    max_distance: float | None = INTERPOLATION_MAX_DISTANCE,
+    max_chunk_bytes: int = INTERPOLATION_MAX_CHUNK_BYTES,
+) -> np.ndarray:
+    """
+    Inverse-distance-weighted interpolation of scattered points onto a regular
+    grid, for several metrics at once. point_values is a (points x metrics)
+    matrix; the result is (metrics x north x east).
+
+    Distances and weights are evaluated once per chunk of grid cells as dense
+    (cells x points) matrices, sized so that no intermediate exceeds
+    max_chunk_bytes, and applied to all metrics in one matrix product. A point
+    with a NaN value is left out of that metric only. Cells further than
+    max_distance from every point with a value are left as NaN, and cells that
+    coincide with a point take its value exactly.
+    """
+    finite = np.isfinite(point_east) & np.isfinite(point_north)
+    finite &= np.isfinite(point_values).any(axis=1)
+    px = point_east[finite].astype(np.float64)
+    py = point_north[finite].astype(np.float64)
+    pv = point_values[finite].astype(np.float64)
+    valid = np.isfinite(pv)
+    valid_weights = valid.astype(np.float64)
+    all_valid: bool = bool(valid.all())
+    pv = np.where(valid, pv, 0.0)
+
+    cell_east, cell_north = np.meshgrid(grid_east, grid_north)
+    cell_east = cell_east.ravel()
+    cell_north = cell_north.ravel()
+    n_metrics: int = point_values.shape[1]
+    surfaces = np.full((len(cell_east), n_metrics), np.nan, dtype=np.float64)
+    shape: tuple[int, int, int] = (len(grid_north), len(grid_east), n_metrics)
+    if len(pv) == 0:
+        return surfaces.reshape(shape).transpose(2, 0, 1).astype(np.float32)
+
+    # Three float64 (cells x points) temporaries are alive at once per chunk.
+    bytes_per_cell: int = 3 * 8 * len(pv)
+    chunk_size: int = max(1, max_chunk_bytes // bytes_per_cell)
+    max_squared_distance: float = np.inf if max_distance is None else max_distance**2
+
+    for start in range(0, len(cell_east), chunk_size):
+        stop: int = start + chunk_size
+        squared_distance = np.square(cell_east[start:stop, None] - px[None, :])
+        squared_distance += np.square(cell_north[start:stop, None] - py[None, :])
+
+        nearest_squared_distance = squared_distance.min(axis=1)
+        exact_rows = np.flatnonzero(nearest_squared_distance == 0)
+        exact = squared_distance[exact_rows] == 0
+        with np.errstate(divide="ignore"):
+            weights = np.power(squared_distance, -power / 2)
+        exact_weights = weights[exact_rows]
+        exact_weights[exact] = 0.0
+        weights[exact_rows] = exact_weights
+
+        if all_valid:
+            weight_sums = weights.sum(axis=1)[:, None]
+            reachable = (nearest_squared_distance <= max_squared_distance)[:, None]
+        else:
+            weight_sums = weights @ valid_weights
+            in_range = squared_distance <= max_squared_distance
+            reachable = (in_range.astype(np.float64) @ valid_weights) > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            chunk = (weights @ pv) / weight_sums
+        # Cells on a point take the value of the first coinciding point that
+        # has one for the metric
+        for row, row_exact in zip(exact_rows, exact, strict=True):
+            hits = row_exact[:, None] & valid
+            has_hit = hits.any(axis=0)
+            first = hits.argmax(axis=0)
+            chunk[row, has_hit] = pv[first[has_hit], np.flatnonzero(has_hit)]
+        chunk[~np.broadcast_to(reachable, chunk.shape)] = np.nan
+        surfaces[start:stop] = chunk
+
+    return surfaces.reshape(shape).transpose(2, 0, 1).astype(np.float32)
+
+
+def compute_idw_surface(
+    point_east: np.ndarray,
+    point_north: np.ndarray,
+    point_values: np.ndarray,
+    *,
+    grid_east: np.ndarray,
+    grid_north: np.ndarray,
+    power: float = INTERPOLATION_POWER,
+    max_distance: float | None = INTERPOLATION_MAX_DISTANCE,
+    max_chunk_bytes: int = INTERPOLATION_MAX_CHUNK_BYTES,
+) -> np.ndarray:
+    """Single-metric compute_idw_surfaces, returning a (north x east) surface."""
+    return compute_idw_surfaces(
+        point_east,
+        point_north,
+        point_values[:, None],
+        grid_east=grid_east,
+        grid_north=grid_north,
+        power=power,
+        max_distance=max_distance,
+        max_chunk_bytes=max_chunk_bytes,
+    )[0]
+
+
+def compute_interpolated_surfaces(
+    dataframe_in: pd.DataFrame,
+    metric_columns: Iterable[str],
+    corners: MapCorners | None = None,
+    *,
+    resolution: float | None = None,
+) -> dict[str, InterpolatedSurface]:
+    """
+    Interpolate each metric of the consolidated data onto a regular grid covering
+    the floorplan (or the point cloud without corners). The default resolution
+    splits the longest side into INTERPOLATION_TARGET_CELLS_ALONG_LONGEST_AXIS cells.
+    """
+    selected_metrics: list[str] = [
+        m for m in metric_columns if m in dataframe_in.columns
+    ]
+    dataframe: pd.DataFrame = add_coordinate_columns_to_dataframe(
+        coerce_metrics_and_time(dataframe_in, selected_metrics)
+    )
+    # Markers are drawn at the centre of each 1 m position cell.
+    point_east: np.ndarray = dataframe["E"].to_numpy(dtype=float) + 0.5
+    point_north: np.ndarray = dataframe["N"].to_numpy(dtype=float) + 0.5
+
+    if corners is not None:
+        east_min, east_max = corners.bottom_left.east, corners.bottom_right.east
+        north_min, north_max = corners.bottom_left.north, corners.top_left.north
+    else:
+        east_min, east_max = np.nanmin(point_east), np.nanmax(point_east)
+        north_min, north_max = np.nanmin(point_north), np.nanmax(point_north)
+
+    if resolution is None:
+        longest: float = max(east_max - east_min, north_max - north_min)
+        resolution = max(longest, 1.0) / INTERPOLATION_TARGET_CELLS_ALONG_LONGEST_AXIS
+    grid_east: np.ndarray = np.arange(east_min + resolution / 2, east_max, resolution)
+    grid_north: np.ndarray = np.arange(
+        north_min + resolution / 2, north_max, resolution
+    )
+
+    values: np.ndarray = compute_idw_surfaces(
+        point_east,
+        point_north,
+        dataframe[selected_metrics].to_numpy(dtype=float),
+        grid_east=grid_east,
+        grid_north=grid_north,
+    )
+    return {
+        metric: InterpolatedSurface(east=grid_east, north=grid_north, values=surface)
+        for metric, surface in zip(selected_metrics, values, strict=True)
+    }
+
+
 def _image_bytes_to_data_uri(image_bytes_jpg: bytes) -> str:
     encoded: str = base64.b64encode(image_bytes_jpg).decode("ascii")
     return f"data:image/jpeg;base64,{encoded}"
@@ -167,6 +483,32 @@ def compute_limits_for_color_bar(
     return 0.0, upper
 
 
+def compute_color_bars(
+    dataframe: pd.DataFrame, metric_columns: Iterable[str]
+) -> dict[str, tuple[float, float]]:
+    """
+    Fixed color ranges for consistency between runs.
+    These values set where "OrRd" becomes dark.
+    """
+    color_bars: dict[str, tuple[float, float]] = {}
+
+    for metric in metric_columns:
+        if metric == "value_mean":
+            # Light 0.07–0.09, dark > 0.1
+            color_bars[metric] = (0.07, 0.14)
+        elif metric == "value_max":
+            # Dark > 0.5
+            color_bars[metric] = (0.0, 1.0)
+        elif metric == "value_std":
+            # Dark > 0.01
+            color_bars[metric] = (0.0, 0.02)
+        else:
+            # Fallback to dynamic 95th percentile
+            color_bars[metric] = compute_limits_for_color_bar(dataframe[metric])
+
+    return color_bars
+
+
 def build_metric_traces_with_individual_color_bars(
     dataframe: pd.DataFrame,
     metric_columns: Sequence[str],
@@ -175,6 +517,8 @@ def build_metric_traces_with_individual_color_bars(
     dropdown_label_for_metric: Mapping[str, str],
     colorscale_name: str,
     color_bars: Mapping[str, tuple[float, float]],
+    position_offset: float = 0.5,
+    marker_symbol: str = "circle",
 ) -> list[go.Scattergl]:
     """
     Build one trace per metric, each with its own colorbar and dynamic cmin/cmax.
@@ -187,13 +531,14 @@ def build_metric_traces_with_individual_color_bars(
         display_name = dropdown_label_for_metric.get(metric_column, metric_column)
         traces.append(
             go.Scattergl(
-                x=dataframe["E"] + 0.5,
-                y=dataframe["N"] + 0.5,
+                x=dataframe["E"] + position_offset,
+                y=dataframe["N"] + position_offset,
                 mode="markers",
                 visible=(index == 0),
                 name=display_name,
                 marker={
                     "size": 10,
+                    "symbol": marker_symbol,
                     "color": dataframe[metric_column],
                     "colorscale": colorscale_name,
                     "cmin": cmin,
@@ -214,17 +559,57 @@ def build_metric_traces_with_individual_color_bars(
     return traces
 
 
+def build_interpolation_traces(
+    metric_columns: Sequence[str],
+    *,
+    interpolated_surfaces: Mapping[str, InterpolatedSurface],
+    colorscale_name: str,
+    color_bars: Mapping[str, tuple[float, float]],
+    opacity: float = 0.6,
+) -> list[go.Heatmap]:
+    """
+    Build one heatmap per metric, sharing the color range of the metric's markers.
+    Heatmaps are drawn underneath the markers and do not show their own color bar.
+    """
+    traces: list[go.Heatmap] = []
+    for index, metric_column in enumerate(metric_columns):
+        surface: InterpolatedSurface = interpolated_surfaces[metric_column]
+        zmin, zmax = color_bars[metric_column]
+        traces.append(
+            go.Heatmap(
+                x=surface.east,
+                y=surface.north,
+                z=surface.values,
+                visible=(index == 0),
+                colorscale=colorscale_name,
+                zmin=zmin,
+                zmax=zmax,
+                showscale=False,
+                opacity=opacity,
+                hoverinfo="skip",
+            )
+        )
+    return traces
+
+
 def build_dropdown_buttons_with_dynamic_color_bars(
     metric_columns: Sequence[str],
     *,
     title_base: str,
     dropdown_label_for_metric: Mapping[str, str],
+    traces_per_metric: int = 1,
 ) -> list[dict[str, object]]:
-    """Dropdown buttons that toggle visibility and update figure title to the active metric label."""
+    """
+    Dropdown buttons that toggle visibility and update figure title to the active metric label.
+    Traces are expected in blocks of one trace per metric, traces_per_metric blocks long.
+    """
     buttons: list[dict[str, object]] = []
     for index, metric_column in enumerate(metric_columns):
-        visibility_mask = [False] * len(metric_columns)
-        visibility_mask[index] = True
+        visibility_mask = [
+            position == index
+            for _ in range(traces_per_metric)
+            for position in range(len(metric_columns))
+        ]
         label = dropdown_label_for_metric.get(metric_column, metric_column)
         buttons.append(
             {
@@ -243,6 +628,44 @@ def build_dropdown_buttons_with_dynamic_color_bars(
 # Orchestrator
 # =========================
 
+DEFAULT_METRIC_LABELS: dict[str, str] = {
+    "value_mean": "Mean",
+    "value_max": "Max",
+    "value_std": "Std Dev",
+}
+
+
+def prepare_points_for_plotting(
+    dataframe_in: pd.DataFrame,
+    selected_metrics: Iterable[str],
+    corners: MapCorners | None,
+    *,
+    spatial_grid: bool = False,
+    grid_cell_size: float | None = None,
+) -> tuple[pd.DataFrame, float]:
+    """
+    Coerce metrics, parse E/N positions and optionally bin them onto a grid.
+    Returns the points together with the offset to add to E/N when plotting.
+    """
+    numeric_columns = set(selected_metrics) | {"value_min", "value_std", "value_count"}
+    dataframe_numeric: pd.DataFrame = coerce_metrics_and_time(
+        dataframe_in, numeric_columns
+    )
+    dataframe: pd.DataFrame = add_coordinate_columns_to_dataframe(dataframe_numeric)
+    if not spatial_grid:
+        return dataframe, 0.5
+
+    cell_size: float = grid_cell_size or compute_grid_cell_size(corners, dataframe)
+    origin: tuple[float, float] = (
+        (corners.bottom_left.east, corners.bottom_left.north)
+        if corners is not None
+        else (0.0, 0.0)
+    )
+    return (
+        aggregate_positions_on_grid(dataframe, cell_size=cell_size, origin=origin),
+        0.0,
+    )
+
 
 def make_gas_concentration_figure(
     dataframe_in: pd.DataFrame,
@@ -258,10 +681,17 @@ def make_gas_concentration_figure(
     corners: MapCorners | None = None,
     title: str = "Timeseries Aggregates on Floorplan",
     colorscale_name: str = "Reds",
+    spatial_grid: bool = False,
+    grid_cell_size: float | None = None,
+    interpolated_surfaces: Mapping[str, InterpolatedSurface] | None = None,
 ) -> go.Figure:
     """
     Build an interactive 2D EN plot with a dropdown to switch the coloring metric.
     Uses per-metric dynamic color ranges (0 → 95th percentile) with individual color bars.
+    With spatial_grid, positions are binned onto a square grid (cell size derived
+    from the floorplan extent unless grid_cell_size is given) and drawn as one
+    marker per occupied cell. Interpolated surfaces, when given for every selected
+    metric, are drawn as heatmaps underneath the markers.
     """
     # 1) choose metrics and coerce types
     selected_metrics: list[str] = [
@@ -269,11 +699,14 @@ def make_gas_concentration_figure(
     ]
     if not selected_metrics:
         raise ValueError("None of the requested metrics exist in the DataFrame.")
-    numeric_columns = set(selected_metrics) | {"value_min", "value_std", "value_count"}
-    dataframe_numeric: pd.DataFrame = coerce_metrics_and_time(
-        dataframe_in, numeric_columns
+    dataframe, position_offset = prepare_points_for_plotting(
+        dataframe_in,
+        selected_metrics,
+        corners,
+        spatial_grid=spatial_grid,
+        grid_cell_size=grid_cell_size,
     )
-    dataframe: pd.DataFrame = add_coordinate_columns_to_dataframe(dataframe_numeric)
+    marker_symbol: str = "square" if spatial_grid else "circle"
 
     earliest_date = pd.to_datetime(dataframe["time_min"]).min()
     latest_date = pd.to_datetime(dataframe["time_max"]).max()
@@ -295,31 +728,30 @@ def make_gas_concentration_figure(
 
     # 4) human-friendly dropdown labels
     dropdown_label_for_metric: dict[str, str] = {
-        "value_mean": "Mean",
-        "value_max": "Max",
-        "value_std": "Std Dev",
+        **DEFAULT_METRIC_LABELS,
         **(metric_labels or {}),
     }
 
     # 5) Fixed color ranges for consistency between runs
-    # These values set where "OrRd" becomes dark.
-    color_bars: dict[str, tuple[float, float]] = {}
+    color_bars: dict[str, tuple[float, float]] = compute_color_bars(
+        dataframe, selected_metrics
+    )
 
-    for metric in selected_metrics:
-        if metric == "value_mean":
-            # Light 0.07–0.09, dark > 0.1
-            color_bars[metric] = (0.07, 0.14)
-        elif metric == "value_max":
-            # Dark > 0.5
-            color_bars[metric] = (0.0, 1.0)
-        elif metric == "value_std":
-            # Dark > 0.01
-            color_bars[metric] = (0.0, 0.02)
-        else:
-            # Fallback to dynamic 95th percentile
-            color_bars[metric] = compute_limits_for_color_bar(dataframe[metric])
+    # 6) traces (each owns its color bar), optionally on top of interpolated surfaces
+    traces_per_metric: int = 1
+    if interpolated_surfaces is not None and all(
+        metric in interpolated_surfaces for metric in selected_metrics
+    ):
+        figure.add_traces(
+            build_interpolation_traces(
+                selected_metrics,
+                interpolated_surfaces=interpolated_surfaces,
+                colorscale_name=colorscale_name,
+                color_bars=color_bars,
+            )
+        )
+        traces_per_metric = 2
 
-    # 6) traces (each owns its color bar)
     traces: list[go.Scattergl] = build_metric_traces_with_individual_color_bars(
         dataframe,
         selected_metrics,
@@ -327,6 +759,8 @@ def make_gas_concentration_figure(
         dropdown_label_for_metric=dropdown_label_for_metric,
         colorscale_name=colorscale_name,
         color_bars=color_bars,
+        position_offset=position_offset,
+        marker_symbol=marker_symbol,
     )
     figure.add_traces(traces)
 
@@ -335,6 +769,7 @@ def make_gas_concentration_figure(
         selected_metrics,
         title_base=title,
         dropdown_label_for_metric=dropdown_label_for_metric,
+        traces_per_metric=traces_per_metric,
     )
 
     # 8) layout
@@ -376,20 +811,28 @@ def make_gas_concentration_figure(
     return figure
 
 
+REPORT_METRIC_COLUMNS: tuple[str, ...] = ("value_mean", "value_max", "value_std")
+
+
 def generate_gas_visualization_html(
-    dataframe: pd.DataFrame, image_bytes_jpg: bytes, corners: MapCorners
+    dataframe: pd.DataFrame,
+    image_bytes_jpg: bytes,
+    corners: MapCorners,
+    *,
+    spatial_grid: bool = False,
+    grid_cell_size: float | None = None,
+    interpolated_surfaces: Mapping[str, InterpolatedSurface] | None = None,
 ) -> bytes:
     fig = make_gas_concentration_figure(
         dataframe,
-        metric_columns=(
-            "value_mean",
-            "value_max",
-            "value_std",
-        ),
+        metric_columns=REPORT_METRIC_COLUMNS,
         image_bytes_jpg=image_bytes_jpg,
         corners=corners,
         title="CO₂ Measurement Aggregates (E-N view)",
         colorscale_name="OrRd",
+        spatial_grid=spatial_grid,
+        grid_cell_size=grid_cell_size,
+        interpolated_surfaces=interpolated_surfaces,
     )
 
     fig_html_string = fig.to_html(full_html=True, include_plotlyjs="cdn")
@@ -0,0 +1,90 @@
+import threading
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from sara_timeseries.core.admission import AdmissionMiddleware, AdmissionQueue
+
+
+def test_admission_queue_limits_in_flight_and_bytes() -> None:
+    queue = AdmissionQueue("ingest", max_in_flight=2, max_bytes=100)
+
+    assert queue.try_admit(60)
+    assert not queue.try_admit(60)
+    assert queue.try_admit(40)
+    assert queue.saturated
+    assert not queue.try_admit(0)
+
+    queue.release(60, seconds=4.0)
+    assert not queue.saturated
+    assert queue.try_admit(10)
+
+
+def test_retry_after_grows_with_service_time_and_load() -> None:
+    queue = AdmissionQueue("ingest", max_in_flight=2, max_bytes=1000)
+    for _ in range(20):
+        queue.try_admit(0)
+        queue.release(0, seconds=6.0)
+    queue.try_admit(0)
+    queue.try_admit(0)
+
+    assert 5 <= queue.retry_after() <= 6
+    queue.release(0, seconds=6.0)
+    assert queue.retry_after() < 5
+
+
+def test_saturated_ingest_is_refused_with_retry_after() -> None:
+    queue = AdmissionQueue("ingest", max_in_flight=1, max_bytes=1024)
+    started = threading.Event()
+    release = threading.Event()
+
+    app = FastAPI()
+    app.add_middleware(
+        AdmissionMiddleware, queue=queue, method="POST", path="/datapoint"
+    )
+
+    @app.post("/datapoint")
+    def datapoint() -> dict:
+        started.set()
+        release.wait(timeout=5)
+        return {}
+
+    @app.get("/datapoint")
+    def other() -> dict:
+        return {}
+
+    client = TestClient(app)
+    first = threading.Thread(target=client.post, args=("/datapoint",))
+    first.start()
+    started.wait(timeout=5)
+    try:
+        refused = client.post("/datapoint", json={"value": 1})
+        unguarded = client.get("/datapoint")
+    finally:
+        release.set()
+        first.join()
+
+    assert refused.status_code == 429
+    assert int(refused.headers["retry-after"]) >= 1
+    assert unguarded.status_code == 200
+    assert queue.in_flight == 0
+    assert client.post("/datapoint").status_code == 200
+
+
+def test_invalid_content_length_is_a_bad_request() -> None:
+    queue = AdmissionQueue("ingest", max_in_flight=1, max_bytes=1024)
+    app = FastAPI()
+    app.add_middleware(
+        AdmissionMiddleware, queue=queue, method="POST", path="/datapoint"
+    )
+
+    @app.post("/datapoint")
+    def datapoint() -> dict:
+        return {}
+
+    response = TestClient(app).post(
+        "/datapoint", content=b"{}", headers={"Content-Length": "two"}
+    )
+
+    assert response.status_code == 400
+    assert queue.in_flight == 0
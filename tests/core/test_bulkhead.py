@@ -0,0 +1,48 @@
+import threading
+from contextvars import ContextVar
+
+import anyio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from sara_timeseries.core.bulkhead import Bulkhead
+
+request_id: ContextVar[str] = ContextVar("request_id", default="")
+
+
+def test_full_bulkhead_rejects_with_service_unavailable() -> None:
+    bulkhead = Bulkhead("report", max_concurrency=1, max_queue=0)
+    started = threading.Event()
+    release = threading.Event()
+
+    def report(name: str) -> dict:
+        started.set()
+        release.wait(timeout=5)
+        return {"name": name}
+
+    app = FastAPI()
+    app.add_api_route("/report", bulkhead.wrap(report), methods=["GET"])
+    client = TestClient(app)
+
+    first = threading.Thread(target=client.get, args=("/report?name=a",))
+    first.start()
+    started.wait(timeout=5)
+    try:
+        rejected = client.get("/report?name=b")
+    finally:
+        release.set()
+        first.join()
+
+    assert rejected.status_code == 503
+    assert rejected.headers["retry-after"] == "1"
+    assert client.get("/report?name=c").json() == {"name": "c"}
+
+
+def test_bulkhead_workers_inherit_context_variables() -> None:
+    bulkhead = Bulkhead("read", max_concurrency=2, max_queue=2)
+
+    async def main() -> str:
+        request_id.set("abc")
+        return await bulkhead.run(request_id.get)
+
+    assert anyio.run(main) == "abc"
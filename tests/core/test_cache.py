@@ -0,0 +1,105 @@
+import os
+import time
+from pathlib import Path
+
+from sara_timeseries.core.cache import DiskCache, MemoryCache, SharedCache, TieredCache
+
+
+def test_memory_cache_evicts_least_recently_used() -> None:
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_memory_cache_expires_entries() -> None:
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", 1, ttl_seconds=-1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_memory_cache_evicts_by_total_weight() -> None:
+    cache = MemoryCache(max_entries=8, max_weight=5, weigh=len)
+    cache.set("a", [1, 2])
+    cache.set("b", [1, 2])
+    cache.set("c", [1, 2])
+    assert cache.get("a") is None
+    assert cache.weight == 4
+
+    cache.set("d", [1] * 6)
+    assert cache.get("d") is None
+    assert cache.get("b") == [1, 2]
+    assert cache.weight == 4
+
+
+def test_disk_cache_round_trip_survives_new_instance(tmp_path: Path) -> None:
+    DiskCache(tmp_path, max_bytes=1024).set("key", b"payload")
+    assert DiskCache(tmp_path, max_bytes=1024).get("key") == b"payload"
+
+
+def test_disk_cache_expired_entry_is_removed(tmp_path: Path) -> None:
+    cache = DiskCache(tmp_path, max_bytes=1024)
+    cache.set("key", b"payload", ttl_seconds=-1)
+    assert cache.get("key") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_disk_cache_evicts_oldest_entries_beyond_max_bytes(tmp_path: Path) -> None:
+    cache = DiskCache(tmp_path, max_bytes=100)
+    cache.set("old", b"x" * 40)
+    old_time = time.time() - 60
+    os.utime(cache._path("old"), (old_time, old_time))
+    cache.set("new", b"y" * 40)
+    cache.set("newest", b"z" * 40)
+
+    assert cache.get("old") is None
+    assert cache.get("new") == b"y" * 40
+    assert cache.get("newest") == b"z" * 40
+
+
+def test_disk_cache_skips_values_larger_than_limit(tmp_path: Path) -> None:
+    cache = DiskCache(tmp_path, max_bytes=10)
+    cache.set("key", b"x" * 100)
+    assert cache.get("key") is None
+
+
+def test_tiered_cache_promotes_disk_hits_to_memory(tmp_path: Path) -> None:
+    DiskCache(tmp_path, max_bytes=1024).set("key", b"payload")
+    cache = TieredCache(
+        memory=MemoryCache(max_entries=4), disk=DiskCache(tmp_path, max_bytes=1024)
+    )
+
+    assert cache.get("key") == b"payload"
+    assert cache.memory.get("key") == b"payload"
+
+
+def test_shared_cache_invalidation_reaches_every_worker(tmp_path: Path) -> None:
+    def worker() -> SharedCache:
+        return SharedCache(
+            memory=MemoryCache(max_entries=4), disk=DiskCache(tmp_path, max_bytes=1024)
+        )
+
+    first, second = worker(), worker()
+    first.set("catalog", b"v1")
+    assert second.get("catalog") == b"v1"
+
+    second.invalidate()
+
+    assert first.memory.get("|catalog") == b"v1"
+    assert first.get("catalog") is None
+    assert second.get("catalog") is None
+    first.set("catalog", b"v2")
+    assert second.get("catalog") == b"v2"
+
+
+def test_shared_cache_without_disk_invalidates_in_process() -> None:
+    cache = SharedCache(memory=MemoryCache(max_entries=4))
+    cache.set("catalog", b"v1")
+    cache.invalidate()
+    assert cache.get("catalog") is None
@@ -0,0 +1,123 @@
+import gzip
+from collections.abc import Iterator
+
+import pytest
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from sara_timeseries.core.compression import CompressionMiddleware, select_encoding
+from sara_timeseries.core.etag import compute_etag, conditional_response
+
+large_body: bytes = b'{"robot_name":"robot","tag_id":"tag_id"}' * 200
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024, offload_min_bytes=4096)
+
+    @app.api_route("/large", methods=["GET", "POST"])
+    def large(request: Request) -> Response:
+        return conditional_response(
+            request, Response(content=large_body, media_type="application/json")
+        )
+
+    @app.get("/small")
+    def small() -> Response:
+        return Response(content=b"{}", media_type="application/json")
+
+    @app.get("/image")
+    def image() -> Response:
+        return Response(content=large_body, media_type="image/png")
+
+    @app.get("/stream")
+    def stream() -> StreamingResponse:
+        def chunks() -> Iterator[bytes]:
+            for _ in range(3):
+                yield large_body
+
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("gzip, deflate", "gzip"),
+        ("*", "zstd"),
+        ("zstd;q=0, gzip;q=0.5", "gzip"),
+        ("identity", None),
+        ("gzip;q=0", None),
+    ],
+)
+def test_select_encoding_respects_quality_values(
+    accept_encoding: str, expected: str | None
+) -> None:
+    assert select_encoding(accept_encoding, ["zstd", "gzip"]) == expected
+
+
+def test_large_bodies_are_compressed(client: TestClient) -> None:
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) < len(large_body)
+    assert response.content == large_body
+
+
+def test_small_and_incompressible_bodies_are_sent_as_is(client: TestClient) -> None:
+    for path in ("/small", "/image"):
+        response = client.get(path, headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+
+def test_uncompressed_negotiable_responses_vary_on_accept_encoding(
+    client: TestClient,
+) -> None:
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    identity = client.get("/large", headers={"Accept-Encoding": "identity"})
+    image = client.get("/image", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in identity.headers
+    assert small.headers["vary"] == "Accept-Encoding"
+    assert identity.headers["vary"] == "Accept-Encoding"
+    assert "vary" not in image.headers
+
+
+def test_streamed_bodies_are_compressed_chunk_by_chunk(client: TestClient) -> None:
+    with client.stream(
+        "GET", "/stream", headers={"Accept-Encoding": "gzip"}
+    ) as response:
+        raw: bytes = b"".join(response.iter_raw())
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert gzip.decompress(raw) == large_body * 3
+
+
+def test_etag_is_suffixed_with_coding_and_still_matches(client: TestClient) -> None:
+    etag: str = compute_etag(large_body)
+    first = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert first.headers["etag"] == f'{etag[:-1]}-gzip"'
+
+    repeat = client.get(
+        "/large",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"]},
+    )
+    assert repeat.status_code == 304
+    assert repeat.content == b""
+
+    uncompressed = client.get(
+        "/large", headers={"Accept-Encoding": "identity", "If-None-Match": etag}
+    )
+    assert uncompressed.status_code == 304
+
+
+def test_matching_etag_on_unsafe_method_fails_precondition(client: TestClient) -> None:
+    response = client.post(
+        "/large", headers={"If-None-Match": compute_etag(large_body)}
+    )
+
+    assert response.status_code == 412
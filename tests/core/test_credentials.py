@@ -1,6 +1,11 @@
+import time
+from collections.abc import Callable
 from pathlib import Path
+from typing import Any
 
 import pytest
+from azure.core.credentials import AccessToken
+from azure.core.exceptions import ClientAuthenticationError
 from azure.identity import (
     AzureCliCredential,
     ChainedTokenCredential,
@@ -11,6 +16,7 @@ from pytest import MonkeyPatch
 
 from sara_timeseries.core.credentials import (
     _WI_REQUIRED_ENV_VARS,
+    CachingTokenCredential,
     build_credential,
 )
 
@@ -128,3 +134,70 @@ def test_only_client_secret_without_secret_raises_value_error(
             client_id="client",
             client_secret=None,
         )
+
+
+class _CountingCredential:
+    def __init__(self, lifetime_seconds: float) -> None:
+        self.lifetime_seconds: float = lifetime_seconds
+        self.calls: list[tuple[str, ...]] = []
+        self.fail: bool = False
+
+    def get_token(self, *scopes: str, **kwargs: Any) -> AccessToken:
+        if self.fail:
+            raise ClientAuthenticationError("identity provider unavailable")
+        self.calls.append(scopes)
+        return AccessToken(
+            f"token-{len(self.calls)}", int(time.time() + self.lifetime_seconds)
+        )
+
+
+def _wait_for(condition: Callable[[], bool], timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_caching_credential_acquires_each_scope_once() -> None:
+    inner = _CountingCredential(lifetime_seconds=3600)
+    credential = CachingTokenCredential(inner)
+
+    first = credential.get_token("omnia/.default")
+    assert credential.get_token("omnia/.default") is first
+    credential.get_token("storage/.default")
+    credential.get_token("omnia/.default", claims='{"access_token": {}}')
+
+    assert inner.calls == [
+        ("omnia/.default",),
+        ("storage/.default",),
+        ("omnia/.default",),
+    ]
+    credential.close()
+
+
+def test_caching_credential_refreshes_in_background_before_expiry() -> None:
+    inner = _CountingCredential(lifetime_seconds=4)
+    credential = CachingTokenCredential(inner, refresh_before_seconds=3)
+
+    assert credential.get_token("omnia/.default").token == "token-1"
+    # Refreshed halfway through the short lifetime, without any caller waiting
+    _wait_for(lambda: len(inner.calls) == 2)
+
+    assert credential.get_token("omnia/.default").token == "token-2"
+    credential.close()
+
+
+def test_failed_refresh_keeps_serving_cached_token() -> None:
+    inner = _CountingCredential(lifetime_seconds=3600)
+    credential = CachingTokenCredential(inner, retry_seconds=0.05)
+    credential.get_token("omnia/.default")
+
+    inner.fail = True
+    credential.prefetch("omnia/.default")
+    time.sleep(0.2)
+    assert credential.get_token("omnia/.default").token == "token-1"
+
+    inner.fail = False
+    _wait_for(lambda: len(inner.calls) == 2)
+    assert credential.get_token("omnia/.default").token == "token-2"
+    credential.close()
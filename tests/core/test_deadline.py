@@ -0,0 +1,92 @@
+import time
+
+import anyio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.types import Message, Receive, Scope, Send
+
+from sara_timeseries.core.deadline import (
+    DeadlineExceededError,
+    DeadlineMiddleware,
+    check_deadline,
+    current_deadline,
+    deadline_exceeded_handler,
+)
+
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(
+        DeadlineMiddleware,
+        default_timeout_seconds=60,
+        route_timeouts={"/report": 300},
+    )
+    app.add_exception_handler(DeadlineExceededError, deadline_exceeded_handler)
+    return app
+
+
+def test_deadline_comes_from_route_default_or_shorter_header() -> None:
+    app = create_app()
+
+    @app.get("/report")
+    def report() -> float:
+        deadline = current_deadline()
+        assert deadline is not None
+        return deadline.remaining()
+
+    client = TestClient(app)
+
+    assert 299 < client.get("/report").json() <= 300
+    assert client.get("/report", headers={"X-Request-Timeout": "2.5"}).json() <= 2.5
+    assert 299 < client.get("/report", headers={"X-Request-Timeout": "900"}).json()
+
+
+def test_spent_deadline_abandons_work_with_gateway_timeout() -> None:
+    app = create_app()
+    completed: list[str] = []
+
+    @app.get("/slow")
+    def slow() -> None:
+        time.sleep(0.2)
+        check_deadline("render")
+        completed.append("render")
+
+    response = TestClient(app).get("/slow", headers={"X-Request-Timeout": "0.1"})
+
+    assert response.status_code == 504
+    assert "render" in response.json()["detail"]
+    assert completed == []
+
+
+def test_client_disconnect_cancels_deadline() -> None:
+    observed: list[str] = []
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        deadline = current_deadline()
+        assert deadline is not None
+        with anyio.fail_after(5):
+            while not deadline.expired:
+                await anyio.sleep(0.01)
+        observed.append(deadline.reason)
+
+    messages: list[Message] = [
+        {"type": "http.request", "body": b"", "more_body": False},
+        {"type": "http.disconnect"},
+    ]
+
+    async def receive() -> Message:
+        await anyio.sleep(0.05)
+        return messages.pop(0)
+
+    async def send(message: Message) -> None:
+        pass
+
+    middleware = DeadlineMiddleware(app, default_timeout_seconds=60)
+    anyio.run(
+        middleware,
+        {"type": "http", "path": "/report", "headers": []},
+        receive,
+        send,
+    )
+
+    assert observed == ["client_disconnected"]
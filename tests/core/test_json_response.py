@@ -0,0 +1,62 @@
+from datetime import UTC, datetime
+
+import numpy as np
+import orjson
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+
+from sara_timeseries.core.json_response import (
+    FastJSONResponse,
+    dataframe_to_records,
+    dumps,
+)
+
+
+def _consolidated_frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "inspection_description": [f"CO2-E{i}-N{i}" for i in range(rows)],
+            "time_min": pd.to_datetime(np.arange(rows) * 10**9, utc=True),
+            "robot_name": ["robot"] * rows,
+            "value_mean": np.linspace(0, 1, rows),
+            "value_std": np.where(np.arange(rows) % 2 == 0, np.nan, 0.5),
+            "value_count": np.arange(rows),
+            "step": [True] * rows,
+        }
+    )
+
+
+def test_dumps_writes_nan_as_null_and_datetimes_as_iso() -> None:
+    content = {
+        "nan": float("nan"),
+        "nat": pd.NaT,
+        "timestamp": pd.Timestamp("2025-08-28T12:31:33.718Z"),
+        "datetime": datetime(2025, 8, 28, tzinfo=UTC),
+        "count": np.int64(3),
+    }
+
+    assert orjson.loads(dumps(content)) == {
+        "nan": None,
+        "nat": None,
+        "timestamp": "2025-08-28T12:31:33.718000+00:00",
+        "datetime": "2025-08-28T00:00:00+00:00",
+        "count": 3,
+    }
+
+
+def test_dataframe_records_match_jsonable_encoder_output() -> None:
+    dataframe = _consolidated_frame(5).drop(columns="value_std")
+
+    assert orjson.loads(dumps(dataframe_to_records(dataframe))) == jsonable_encoder(
+        dataframe.to_dict("records")
+    )
+
+
+def test_fast_json_response_renders_dataframes() -> None:
+    response = FastJSONResponse(_consolidated_frame(2))
+    records = orjson.loads(response.body)
+
+    assert response.media_type == "application/json"
+    assert records[0]["value_std"] is None
+    assert records[1]["value_std"] == 0.5
+    assert records[0]["time_min"] == "1970-01-01T00:00:00+00:00"
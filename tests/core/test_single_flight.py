@@ -0,0 +1,74 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from sara_timeseries.core.deadline import DeadlineExceededError
+from sara_timeseries.core.single_flight import SingleFlight
+
+
+def test_concurrent_identical_calls_share_one_computation() -> None:
+    flight = SingleFlight("test")
+    started = threading.Event()
+    release = threading.Event()
+    calls: list[int] = []
+
+    def compute() -> list[int]:
+        calls.append(1)
+        started.set()
+        release.wait(timeout=5)
+        return [42]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        leader = executor.submit(flight.do, "key", compute)
+        started.wait(timeout=5)
+        followers = [executor.submit(flight.do, "key", compute) for _ in range(3)]
+        while flight._calls["key"].waiters < 3:
+            pass
+        release.set()
+        results = [leader.result(), *(f.result() for f in followers)]
+
+    assert calls == [1]
+    assert all(result is results[0] for result in results)
+    assert flight.in_flight() == 0
+
+
+def test_errors_are_shared_and_not_remembered() -> None:
+    flight = SingleFlight("test")
+
+    def fail() -> None:
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("key", fail)
+    assert flight.do("key", lambda: "recovered") == "recovered"
+
+
+def test_follower_recomputes_when_leader_is_abandoned() -> None:
+    flight = SingleFlight("test")
+    started = threading.Event()
+    release = threading.Event()
+    calls: list[int] = []
+
+    def abandoned() -> int:
+        calls.append(1)
+        started.set()
+        release.wait(timeout=5)
+        raise DeadlineExceededError("client_disconnected", "test")
+
+    def compute() -> int:
+        calls.append(2)
+        return 42
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flight.do, "key", abandoned)
+        started.wait(timeout=5)
+        follower = executor.submit(flight.do, "key", compute)
+        while flight._calls["key"].waiters < 1:
+            pass
+        release.set()
+
+        with pytest.raises(DeadlineExceededError):
+            leader.result()
+        assert follower.result() == 42
+    assert calls == [1, 2]
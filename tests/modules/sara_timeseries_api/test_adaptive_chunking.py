@@ -0,0 +1,57 @@
+from datetime import UTC, datetime, timedelta
+from itertools import pairwise
+
+from sara_timeseries.modules.sara_timeseries_api.adaptive_chunking import (
+    AdaptiveChunker,
+    Chunk,
+)
+
+start_time = datetime(2025, 8, 1, tzinfo=UTC)
+end_time = start_time + timedelta(days=10)
+
+
+def _series(count: int) -> list:
+    return [{"id": f"series_{i}"} for i in range(count)]
+
+
+def test_sparse_series_are_packed_up_to_series_limit() -> None:
+    chunker = AdaptiveChunker(default_rows_per_hour=0.1, max_series_per_request=100)
+
+    chunks = chunker.plan(_series(250), start_time, end_time)  # type: ignore
+
+    assert [len(chunk.series) for chunk in chunks] == [100, 100, 50]
+    assert all(chunk.start_time == start_time for chunk in chunks)
+
+
+def test_dense_series_are_split_in_time_and_cover_the_window() -> None:
+    chunker = AdaptiveChunker(target_rows=10_000, default_rows_per_hour=0.1)
+    series = _series(3)
+    chunker.observe(
+        Chunk([series[1]], start_time, end_time, 0, ""),
+        {"series_1": 240 * 3600},
+        seconds=1.0,
+    )
+
+    chunks = chunker.plan(series, start_time, end_time)  # type: ignore
+
+    dense = [chunk for chunk in chunks if chunk.series == [series[1]]]
+    assert len(dense) > 1
+    assert all(chunk.expected_rows <= 10_000 for chunk in dense)
+    assert dense[0].start_time == start_time and dense[-1].end_time == end_time
+    assert all(a.end_time == b.start_time for a, b in pairwise(dense))
+    # Series order is kept, so the sparse neighbours are not packed together
+    assert chunks[0].series == [series[0]] and chunks[-1].series == [series[2]]
+
+
+def test_target_rows_follows_observed_latency() -> None:
+    chunker = AdaptiveChunker(target_rows=20_000, min_rows=1_000, target_seconds=2.0)
+    chunk = Chunk([{"id": "series"}], start_time, end_time, 20_000, "")  # type: ignore
+
+    chunker.observe(chunk, {"series": 20_000}, seconds=8.0)
+    assert chunker.target_rows == 5_000
+
+    chunker.observe(chunk, {"series": 5_000}, seconds=0.2)
+    assert chunker.target_rows == 6_250
+
+    chunker.observe(chunk, {"series": 10}, seconds=100.0)
+    assert chunker.target_rows == 1_000
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from sara_timeseries.modules.sara_timeseries_api.downsampling import (
+    downsample_rows,
+    lttb_indices,
+    min_max_indices,
+)
+from sara_timeseries.modules.sara_timeseries_api.models import DownsamplingMethod
+
+
+@pytest.mark.parametrize("n, max_points", [(10, 10), (100, 4), (10_000, 500)])
+def test_lttb_keeps_endpoints_and_bounds_point_count(n: int, max_points: int) -> None:
+    y = np.random.default_rng(0).random(n)
+    indices = lttb_indices(np.arange(n), y, max_points)
+
+    assert len(indices) == min(n, max_points)
+    assert indices[0] == 0 and indices[-1] == n - 1
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_and_min_max_keep_isolated_spikes() -> None:
+    y = np.zeros(10_000)
+    y[1234] = 5.0
+    y[8765] = -5.0
+
+    assert {1234, 8765} <= set(lttb_indices(np.arange(len(y)), y, 100))
+    assert {1234, 8765} <= set(min_max_indices(y, 100))
+
+
+def test_min_max_returns_at_most_max_points() -> None:
+    y = np.random.default_rng(1).random(1001)
+    indices = min_max_indices(y, 50)
+
+    assert len(indices) <= 50
+    assert indices[0] == 0 and indices[-1] == 1000
+
+
+def test_downsample_rows_is_applied_per_series() -> None:
+    rows = [
+        {"id": series, "time": f"2025-08-28T12:{i // 60:02}:{i % 60:02}Z", "value": i}
+        for i in range(100)
+        for series in ("a", "b")
+    ]
+
+    result = downsample_rows(rows, 10, DownsamplingMethod.LTTB)
+
+    assert sum(row["id"] == "a" for row in result) == 10
+    assert sum(row["id"] == "b" for row in result) == 10
+    assert result == [row for row in rows if row in result]
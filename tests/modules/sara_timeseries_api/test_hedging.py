@@ -0,0 +1,58 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from sara_timeseries.modules.sara_timeseries_api.hedging import (
+    HedgeBudget,
+    Hedger,
+)
+
+
+def _slow_first_call(slow_seconds: float) -> tuple[list[int], object]:
+    calls: list[int] = []
+    lock = threading.Lock()
+
+    def read() -> int:
+        with lock:
+            attempt = len(calls)
+            calls.append(attempt)
+        if attempt == 0:
+            time.sleep(slow_seconds)
+        return attempt
+
+    return calls, read
+
+
+def test_slow_read_is_hedged_and_fastest_response_wins() -> None:
+    hedger = Hedger(delay_seconds=0.01)
+    calls, read = _slow_first_call(slow_seconds=1.0)
+
+    started = time.perf_counter()
+    result = hedger.call("read", read)  # type: ignore
+
+    assert result == 1
+    assert len(calls) == 2
+    assert time.perf_counter() - started < 0.5
+
+
+def test_hedges_stop_when_budget_is_spent() -> None:
+    hedger = Hedger(budget=HedgeBudget(ratio=0.0, burst=1.0), delay_seconds=0.01)
+    calls, read = _slow_first_call(slow_seconds=0.05)
+    hedger.call("read", read)  # type: ignore
+    assert len(calls) == 2
+
+    calls, read = _slow_first_call(slow_seconds=0.05)
+    assert hedger.call("read", read) == 0  # type: ignore
+    assert len(calls) == 1
+
+
+def test_delay_follows_observed_percentile() -> None:
+    hedger = Hedger(min_delay_seconds=0.0, min_samples=10)
+    assert hedger.hedge_delay("read") is None
+
+    for seconds in np.linspace(0.0, 1.0, 101):
+        hedger.latencies.record("read", float(seconds))
+
+    assert hedger.hedge_delay("read") == pytest.approx(0.95)
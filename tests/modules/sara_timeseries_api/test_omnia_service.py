@@ -1,10 +1,22 @@
-from datetime import UTC, datetime
-from unittest.mock import MagicMock, Mock
+from datetime import UTC, datetime, timedelta
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 from omnia_timeseries.api import MessageModel
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
 
+import sara_timeseries.modules.sara_timeseries_api.omnia_service as omnia_service_module
+from sara_timeseries.core.cache import MemoryCache, SharedCache
+from sara_timeseries.modules.sara_timeseries_api.adaptive_chunking import (
+    AdaptiveChunker,
+    Chunk,
+)
 from sara_timeseries.modules.sara_timeseries_api.omnia_service import OmniaService
+from sara_timeseries.modules.sara_timeseries_api.resilience import build_omnia_guard
 
 
 @pytest.fixture
@@ -14,6 +26,12 @@ def omnia_service() -> OmniaService:
     class MockOmniaService(OmniaService):
         def __init__(self) -> None:
             self.api = mock_api
+            self.chunker = AdaptiveChunker()
+            self.hedger = None
+            self.ingest_guard = build_omnia_guard("ingest", 8, 32)
+            self.read_guard = build_omnia_guard("read", 8, 32)
+            self.catalog_cache = SharedCache(MemoryCache(max_entries=4))
+            self.catalog_ids = {}
 
     omnia_service = MockOmniaService()
     return omnia_service
@@ -37,6 +55,59 @@ def test_get_or_add_timeseries(omnia_service: OmniaService) -> None:
     omnia_service.api.get_or_add_timeseries.assert_called_once()
 
 
+def test_catalog_is_cached_until_a_new_timeseries_is_added(
+    omnia_service: OmniaService,
+) -> None:
+    omnia_service.api.search_timeseries = Mock(
+        return_value={"data": {"items": [{"id": "existing", "facility": "kaa"}]}}
+    )
+
+    omnia_service.read_all_timeseries_by_description("CO2Measurement")
+    omnia_service.read_all_timeseries_by_description("CO2Measurement")
+    assert omnia_service.api.search_timeseries.call_count == 1
+
+    for timeseries_id in ("existing", "added"):
+        omnia_service.api.get_or_add_timeseries.return_value = {
+            "data": {"items": [{"id": timeseries_id}]}
+        }
+        omnia_service.get_or_add_timeseries(
+            name="name",
+            facility="kaa",
+            external_id="",
+            description="CO2Measurement",
+            unit="",
+            asset_id="",
+        )
+        omnia_service.read_all_timeseries_by_description("CO2Measurement")
+
+    assert omnia_service.api.search_timeseries.call_count == 2
+
+
+def test_known_timeseries_are_checked_without_parsing_the_catalog(
+    omnia_service: OmniaService,
+) -> None:
+    omnia_service.api.search_timeseries = Mock(
+        return_value={"data": {"items": [{"id": "existing", "facility": "kaa"}]}}
+    )
+    omnia_service.api.get_or_add_timeseries.return_value = {
+        "data": {"items": [{"id": "existing"}]}
+    }
+    omnia_service.read_all_timeseries_by_description("CO2Measurement")
+
+    with patch.object(omnia_service_module.orjson, "loads") as loads:
+        omnia_service.get_or_add_timeseries(
+            name="name",
+            facility="kaa",
+            external_id="",
+            description="CO2Measurement",
+            unit="",
+            asset_id="",
+        )
+
+    loads.assert_not_called()
+    assert omnia_service.catalog_cache.get("CO2Measurement") is not None
+
+
 def test_add_datapoint_to_timeseries(omnia_service: OmniaService) -> None:
     mock_response = MessageModel(
         statusCode=0, message="test_message", traceId="test_trace_id"
@@ -51,3 +122,158 @@ def test_add_datapoint_to_timeseries(omnia_service: OmniaService) -> None:
 
     assert result == mock_response
     omnia_service.api.write_data.assert_called_once()
+
+
+def test_read_datapoints_with_limit_skips_metadata(
+    omnia_service: OmniaService,
+) -> None:
+    datapoint = {"time": "2025-08-28T12:31:33Z", "value": 1.0, "status": 192}
+    omnia_service.api.get_multi_datapoints = Mock(
+        return_value={
+            "data": {"items": [{"id": "series", "datapoints": [datapoint] * 5}]}
+        }
+    )
+
+    result = omnia_service.read_datapoints_from_multiple_timeseries(
+        timeseries=[{"id": "series"}],
+        start_time=datetime(2025, 8, 28, tzinfo=UTC),
+        end_time=datetime(2025, 8, 29, tzinfo=UTC),
+        limit_per_series=2,
+    )
+
+    assert result == [datapoint, datapoint]
+    (request,) = omnia_service.api.get_multi_datapoints.call_args.args
+    assert request[0]["limit"] == 2
+    omnia_service.api.get_timeseries_by_id.assert_not_called()
+
+
+def test_read_with_plan_splits_series_and_window(omnia_service: OmniaService) -> None:
+    omnia_service.api.get_multi_datapoints = Mock(
+        side_effect=lambda request: {
+            "data": {
+                "items": [
+                    {
+                        "id": item["id"],
+                        "datapoints": [
+                            {"time": item["startTime"], "value": 1.0, "status": 192}
+                        ],
+                    }
+                    for item in request
+                ]
+            }
+        }
+    )
+    timeseries = [{"id": f"series_{i}", "metadata": {"tag_id": i}} for i in range(3)]
+    start_time = datetime(2025, 8, 28, tzinfo=UTC)
+
+    rows = omnia_service.read_with_plan(
+        timeseries,  # type: ignore
+        start_time,
+        start_time + timedelta(hours=4),
+        series_per_request=2,
+        time_slices=2,
+        parallelism=2,
+    )
+
+    requests = [
+        c.args[0] for c in omnia_service.api.get_multi_datapoints.call_args_list
+    ]
+    assert sorted(len(r) for r in requests) == [1, 1, 2, 2]
+    assert {r[0]["endTime"] for r in requests} == {
+        (start_time + timedelta(hours=2)).isoformat(),
+        (start_time + timedelta(hours=4)).isoformat(),
+    }
+    assert len(rows) == 6
+    assert rows[0]["tag_id"] == 0
+    omnia_service.api.get_timeseries_by_id.assert_not_called()
+
+
+def test_read_with_plan_reads_the_planned_chunks(omnia_service: OmniaService) -> None:
+    omnia_service.api.get_multi_datapoints = Mock(return_value={"data": {"items": []}})
+    omnia_service.chunker = AdaptiveChunker(
+        target_rows=1_000, default_rows_per_hour=0.1
+    )
+    start_time = datetime(2025, 8, 28, tzinfo=UTC)
+    dense = Chunk([{"id": "dense"}], start_time, start_time + timedelta(hours=10), 0, "")  # type: ignore
+    omnia_service.chunker.observe(dense, {"dense": 1_000}, seconds=0.1)
+    timeseries = [{"id": "dense"}, {"id": "sparse_a"}, {"id": "sparse_b"}]
+    end_time = start_time + timedelta(hours=100)
+
+    chunks = omnia_service.plan_chunks(timeseries, start_time, end_time)  # type: ignore
+    omnia_service.read_with_plan(
+        timeseries,  # type: ignore
+        start_time,
+        end_time,
+        series_per_request=100,
+        chunks=chunks,
+    )
+
+    requests = [
+        c.args[0] for c in omnia_service.api.get_multi_datapoints.call_args_list
+    ]
+    assert len(chunks) > 2
+    assert [[item["id"] for item in r] for r in requests] == [
+        [series["id"] for series in chunk.series] for chunk in chunks
+    ]
+
+
+def test_streamed_chunks_are_flattened_from_the_catalog(
+    omnia_service: OmniaService,
+) -> None:
+    datapoint = {"time": "2025-08-28T12:31:33Z", "value": 1.0, "status": 192}
+    omnia_service.api.get_multi_datapoints = Mock(
+        side_effect=lambda request: {
+            "data": {
+                "items": [
+                    {"id": item["id"], "datapoints": [datapoint] * 3}
+                    for item in request
+                ]
+            }
+        }
+    )
+    timeseries = [{"id": f"series_{i}", "metadata": {"tag_id": i}} for i in range(2)]
+    start_time = datetime(2025, 8, 28, tzinfo=UTC)
+
+    rows = [
+        row
+        for chunk in omnia_service.iter_data_from_multiple_timeseries(
+            timeseries, start_time, start_time + timedelta(hours=1)  # type: ignore
+        )
+        for row in chunk
+    ]
+
+    assert len(rows) == 6
+    assert {row["tag_id"] for row in rows} == {0, 1}
+    omnia_service.api.get_timeseries_by_id.assert_not_called()
+
+
+def test_chunk_reads_are_traced_with_chunking_decision(
+    omnia_service: OmniaService,
+) -> None:
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    omnia_service.api.get_multi_datapoints = Mock(
+        return_value={
+            "data": {
+                "items": [
+                    {
+                        "id": "series",
+                        "datapoints": [{"time": "2025-08-28T12:00:00Z", "value": 1.0}],
+                    }
+                ]
+            }
+        }
+    )
+    start_time = datetime(2025, 8, 28, tzinfo=UTC)
+    chunk = Chunk([{"id": "series"}], start_time, start_time + timedelta(hours=1), 1.0, "1 series packed")  # type: ignore
+
+    with patch.object(omnia_service_module, "tracer", provider.get_tracer("test")):
+        omnia_service._read_chunk(chunk)
+
+    (span,) = exporter.get_finished_spans()
+    assert span.name == "omnia.get_multi_datapoints"
+    assert span.attributes is not None
+    assert span.attributes["chunk.reason"] == "1 series packed"
+    assert span.attributes["chunk.rows"] == 1
+    assert omnia_service.chunker.rows_per_hour("series") > 0
@@ -0,0 +1,97 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from sara_timeseries.modules.sara_timeseries_api.adaptive_chunking import (
+    AdaptiveChunker,
+)
+from sara_timeseries.modules.sara_timeseries_api.models import (
+    PlanSource,
+    ReadMode,
+    SplitStrategy,
+)
+from sara_timeseries.modules.sara_timeseries_api.query_planner import (
+    QueryPlanner,
+    ReadStatistics,
+)
+
+start_time = datetime(2025, 7, 1, tzinfo=UTC)
+
+
+def _series(count: int) -> list:
+    return [{"id": f"series_{i}"} for i in range(count)]
+
+
+def test_short_windows_are_split_by_series_into_few_requests() -> None:
+    end_time = start_time + timedelta(days=1)
+    chunks = AdaptiveChunker(default_rows_per_hour=1.0).plan(
+        _series(250), start_time, end_time
+    )
+
+    plan = QueryPlanner().plan(250, start_time, end_time, chunks=chunks)
+
+    assert plan.source == PlanSource.LIVE
+    assert plan.split == SplitStrategy.SERIES
+    assert plan.series_per_request == 100
+    assert plan.requests == 3
+    assert plan.parallelism == 3
+    assert plan.estimated_rows == 250 * 24
+
+
+def test_dense_long_windows_follow_the_chunker_time_slices() -> None:
+    end_time = start_time + timedelta(days=7)
+    chunker = AdaptiveChunker(target_rows=50_000, default_rows_per_hour=3600.0)
+    chunks = chunker.plan(_series(10), start_time, end_time)
+    planner = QueryPlanner()
+
+    plan = planner.plan(10, start_time, end_time, chunks=chunks)
+
+    assert plan.split == SplitStrategy.TIME
+    assert plan.requests == len(chunks)
+    assert plan.time_slices == len(chunks) // 10
+    assert plan.estimated_rows / plan.requests <= 50_000
+    assert plan.parallelism == planner.max_parallelism
+
+
+def test_live_raw_reads_require_chunks() -> None:
+    with pytest.raises(ValueError):
+        QueryPlanner().plan(10, start_time, start_time + timedelta(days=1))
+
+
+def test_aggregate_reads_are_not_split_in_time() -> None:
+    planner = QueryPlanner()
+
+    plan = planner.plan(
+        10,
+        start_time,
+        start_time + timedelta(days=365),
+        mode=ReadMode.AGGREGATE,
+        processing_interval=timedelta(days=1),
+    )
+
+    assert plan.time_slices == 1
+    assert plan.estimated_rows == 10 * 365
+
+
+def test_cached_plans_issue_no_requests() -> None:
+    plan = QueryPlanner().plan(
+        10, start_time, start_time + timedelta(days=1), cached=True
+    )
+
+    assert plan.source == PlanSource.CACHE
+    assert plan.requests == 0
+
+
+def test_recorded_reads_update_cost_estimates() -> None:
+    statistics = ReadStatistics(request_overhead_seconds=1.0, smoothing=0.5)
+    planner = QueryPlanner(statistics)
+    end_time = start_time + timedelta(hours=10)
+    chunks = AdaptiveChunker().plan(_series(10), start_time, end_time)
+    plan = planner.plan(10, start_time, end_time, chunks=chunks)
+
+    executed = planner.record(plan, rows=100, seconds=0.2)
+
+    assert executed.actual_rows == 100
+    assert executed.actual_seconds == 0.2
+    assert statistics.request_overhead_seconds == (1.0 + 0.2) / 2
+    assert statistics.observations == 1
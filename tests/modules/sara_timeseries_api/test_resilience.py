@@ -0,0 +1,96 @@
+import threading
+from unittest.mock import Mock
+
+import pytest
+from omnia_timeseries.models import TimeseriesRequestFailedException
+
+from sara_timeseries.modules.sara_timeseries_api.resilience import (
+    AdaptiveLimiter,
+    BreakerState,
+    CircuitBreaker,
+    OmniaGuard,
+    OmniaUnavailableError,
+)
+
+
+def _omnia_error(status_code: int) -> TimeseriesRequestFailedException:
+    return TimeseriesRequestFailedException(
+        Mock(status_code=status_code, reason="", text='{"message": ""}')
+    )
+
+
+def test_limiter_grows_additively_and_backs_off_multiplicatively() -> None:
+    limiter = AdaptiveLimiter(initial_limit=4, latency_threshold_seconds=1.0)
+    for _ in range(4):
+        assert limiter.acquire()
+        limiter.release(0.1, overloaded=False)
+    assert limiter.limit == pytest.approx(4.9, abs=0.05)
+
+    assert limiter.acquire()
+    limiter.release(0.1, overloaded=True)
+    assert limiter.limit == pytest.approx(4.9 * 0.7, abs=0.05)
+
+    assert limiter.acquire()
+    limiter.release(2.0, overloaded=False)
+    assert limiter.limit < 4.9 * 0.7
+
+
+def test_limiter_rejects_callers_beyond_limit_after_timeout() -> None:
+    limiter = AdaptiveLimiter(initial_limit=1, acquire_timeout_seconds=0.01)
+    assert limiter.acquire()
+    assert not limiter.acquire()
+
+
+def test_breaker_opens_on_error_rate_and_closes_after_successful_probe() -> None:
+    breaker = CircuitBreaker("read", min_calls=4, open_seconds=0.0)
+    guard = OmniaGuard("read", AdaptiveLimiter(), breaker)
+
+    for _ in range(4):
+        with pytest.raises(TimeseriesRequestFailedException):
+            guard.call(Mock(side_effect=_omnia_error(503)))
+    assert breaker.state == BreakerState.OPEN
+
+    assert guard.call(lambda: "ok") == "ok"
+    assert breaker.state == BreakerState.CLOSED
+
+
+def test_open_breaker_fails_fast_and_client_errors_do_not_count() -> None:
+    breaker = CircuitBreaker("ingest", min_calls=2, open_seconds=60.0)
+    guard = OmniaGuard("ingest", AdaptiveLimiter(), breaker)
+
+    for _ in range(3):
+        with pytest.raises(TimeseriesRequestFailedException):
+            guard.call(Mock(side_effect=_omnia_error(404)))
+    assert breaker.state == BreakerState.CLOSED
+
+    for _ in range(3):
+        with pytest.raises(TimeseriesRequestFailedException):
+            guard.call(Mock(side_effect=_omnia_error(429)))
+    fn = Mock()
+    with pytest.raises(OmniaUnavailableError) as error:
+        guard.call(fn)
+    fn.assert_not_called()
+    assert error.value.retry_after_seconds > 0
+
+
+def test_ingest_is_not_starved_by_saturated_reads() -> None:
+    read = OmniaGuard(
+        "read",
+        AdaptiveLimiter(initial_limit=1, acquire_timeout_seconds=0.01),
+        CircuitBreaker("read"),
+    )
+    ingest = OmniaGuard(
+        "ingest", AdaptiveLimiter(initial_limit=1), CircuitBreaker("ingest")
+    )
+    release = threading.Event()
+    slow_read = threading.Thread(target=read.call, args=(lambda: release.wait(5),))
+    slow_read.start()
+    try:
+        while read.limiter.in_flight == 0:
+            pass
+        with pytest.raises(OmniaUnavailableError):
+            read.call(lambda: None)
+        assert ingest.call(lambda: "written") == "written"
+    finally:
+        release.set()
+        slow_read.join()
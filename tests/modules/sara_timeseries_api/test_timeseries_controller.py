@@ -1,6 +1,12 @@
+import io
+import json
+import time
 from datetime import datetime, timedelta
-from unittest.mock import MagicMock, Mock
+from unittest.mock import MagicMock, Mock, patch
 
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
@@ -14,7 +20,16 @@ from omnia_timeseries.models import (
 
 from sara_timeseries.api import API
 from sara_timeseries.authentication import validate_has_role
+from sara_timeseries.core.admission import AdmissionQueue
+from sara_timeseries.core.cache import MemoryCache, SharedCache
+from sara_timeseries.modules.sara_timeseries_api.adaptive_chunking import (
+    AdaptiveChunker,
+)
 from sara_timeseries.modules.sara_timeseries_api.omnia_service import OmniaService
+from sara_timeseries.modules.sara_timeseries_api.resilience import (
+    BreakerState,
+    build_omnia_guard,
+)
 from sara_timeseries.modules.sara_timeseries_api.timeseries_controller import (
     TimeseriesController,
 )
@@ -89,6 +104,12 @@ def mock_omnia_service() -> OmniaService:
     class MockOmniaService(OmniaService):
         def __init__(self) -> None:
             self.api = mock_api
+            self.chunker = AdaptiveChunker()
+            self.hedger = None
+            self.ingest_guard = build_omnia_guard("ingest", 8, 32)
+            self.read_guard = build_omnia_guard("read", 8, 32)
+            self.catalog_cache = SharedCache(MemoryCache(max_entries=4))
+            self.catalog_ids = {}
 
     omnia_service = MockOmniaService()
 
@@ -265,3 +286,415 @@ def test_get_datapoints_for_all_timeseries_matching_facility_and_description(
     assert len(output["data"]) == len(
         get_multi_datapoint_return_value["data"]["items"][0]["datapoints"]
     )
+
+
+def _measurements_window() -> dict:
+    return {
+        "facility": facility,
+        "start_time": (
+            datetime.fromisoformat(timestamp) - timedelta(weeks=1)
+        ).isoformat(),
+        "end_time": (
+            datetime.fromisoformat(timestamp) + timedelta(weeks=1)
+        ).isoformat(),
+    }
+
+
+def test_stream_co2_measurements_returns_ndjson(test_client: TestClient) -> None:
+    response = test_client.post(
+        "/timeseries/get-co2-measurements/stream", json=_measurements_window()
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 4
+    assert rows[0]["value"] == 1
+    assert rows[0]["robot_name"] == robot_name
+
+
+def test_co2_measurements_normalized_format_groups_datapoints_per_series(
+    test_client: TestClient, mock_omnia_service: OmniaService
+) -> None:
+    mock_omnia_service.api.get_multi_datapoints = Mock(
+        return_value={
+            "data": {
+                "items": [
+                    {"id": example_id, "datapoints": [datapoint, datapoint, datapoint]}
+                ]
+            },
+            "count": None,
+            "continuationToken": None,
+        }
+    )
+
+    response = test_client.post(
+        "/timeseries/get-co2-measurements",
+        params={"format": "normalized"},
+        json=_measurements_window(),
+    )
+
+    assert response.status_code == 200
+    series = response.json()["series"]
+    assert len(series) == 1
+    assert series[0]["metadata"]["id"] == example_id
+    assert series[0]["metadata"]["robot_name"] == robot_name
+    assert series[0]["time"] == [timestamp] * 3
+    assert series[0]["value"] == [1, 1, 1]
+    assert series[0]["status"] == [192, 192, 192]
+    mock_omnia_service.api.get_timeseries_by_id.assert_not_called()
+
+
+def test_co2_measurements_normalized_format_via_accept_header(
+    test_client: TestClient,
+) -> None:
+    response = test_client.post(
+        "/timeseries/get-co2-measurements",
+        headers={"Accept": "application/vnd.sara.normalized+json"},
+        json=_measurements_window(),
+    )
+
+    assert response.status_code == 200
+    assert "data" not in response.json()
+    assert len(response.json()["series"][0]["value"]) == 4
+
+
+@pytest.mark.parametrize("measurements_format", ["flat", "normalized"])
+def test_co2_measurements_downsampling_reports_reduction(
+    test_client: TestClient,
+    mock_omnia_service: OmniaService,
+    measurements_format: str,
+) -> None:
+    datapoints: list[AggregateModel] = [
+        {
+            "time": (
+                datetime.fromisoformat(timestamp) + timedelta(minutes=i)
+            ).isoformat(),
+            "value": float(i % 7),
+            "status": 192,
+        }
+        for i in range(200)
+    ]
+    mock_omnia_service.api.get_multi_datapoints = Mock(
+        return_value={
+            "data": {"items": [{"id": example_id, "datapoints": datapoints}]},
+            "count": None,
+            "continuationToken": None,
+        }
+    )
+
+    response = test_client.post(
+        "/timeseries/get-co2-measurements",
+        params={
+            "format": measurements_format,
+            "max_points": 20,
+            "downsampling": "min_max",
+        },
+        json=_measurements_window(),
+    )
+
+    assert response.status_code == 200
+    output: dict = response.json()
+    assert output["downsampling"]["method"] == "min_max"
+    assert output["downsampling"]["original_points"] == 200
+    assert output["downsampling"]["returned_points"] <= 20
+    assert output["downsampling"]["reduction_ratio"] >= 10
+
+
+@pytest.mark.parametrize("export_format", ["arrow", "parquet"])
+def test_co2_measurements_export_round_trips_json_output(
+    test_client: TestClient, export_format: str
+) -> None:
+    expected = test_client.post(
+        "/timeseries/get-co2-measurements", json=_measurements_window()
+    ).json()["data"]
+
+    response = test_client.post(
+        "/timeseries/get-co2-measurements/export",
+        params={"format": export_format},
+        json=_measurements_window(),
+    )
+
+    assert response.status_code == 200
+    table: pa.Table = (
+        pa.ipc.open_stream(response.content).read_all()
+        if export_format == "arrow"
+        else pq.read_table(io.BytesIO(response.content))
+    )
+    assert pa.types.is_dictionary(table.schema.field("robot_name").type)
+    rows: list[dict] = table.to_pylist()
+    assert len(rows) == len(expected)
+    for row, expected_row in zip(rows, expected, strict=True):
+        assert row["time"] == pd.Timestamp(expected_row["time"])
+        assert {k: v for k, v in row.items() if k != "time"} == {
+            k: v for k, v in expected_row.items() if k != "time"
+        }
+
+
+def test_co2_measurements_pages_follow_cursor(
+    test_client: TestClient, mock_omnia_service: OmniaService
+) -> None:
+    series_datapoints: dict[str, list[AggregateModel]] = {
+        # Datapoints sharing a timestamp span the page boundaries
+        "series_a": [
+            {"time": f"2025-08-28T12:0{min(i, 1)}:00Z", "value": i, "status": 192}
+            for i in range(4)
+        ],
+        "series_b": [
+            {"time": f"2025-08-28T13:0{i}:00Z", "value": 10 + i, "status": 192}
+            for i in range(2)
+        ],
+    }
+
+    def get_multi_datapoints(request: list[dict]) -> GetAggregatesResponseModel:
+        items = []
+        for item in request:
+            datapoints = [
+                dp
+                for dp in series_datapoints[item["id"]]
+                if dp["time"] >= item["startTime"]
+            ]
+            items.append({"id": item["id"], "datapoints": datapoints[: item["limit"]]})
+        return {"data": {"items": items}, "count": None, "continuationToken": None}
+
+    mock_omnia_service.api.search_timeseries = Mock(
+        return_value={
+            "data": {
+                "items": [
+                    {**search_timeseries_inner_value, "id": "series_b"},
+                    {**search_timeseries_inner_value, "id": "series_a"},
+                ]
+            }
+        }
+    )
+    mock_omnia_service.api.get_multi_datapoints = Mock(side_effect=get_multi_datapoints)
+
+    values: list[float] = []
+    cursor: str | None = None
+    pages: int = 0
+    while True:
+        response = test_client.post(
+            "/timeseries/get-co2-measurements/page",
+            json={**_measurements_window(), "page_size": 2, "cursor": cursor},
+        )
+        assert response.status_code == 200
+        pages += 1
+        output: dict = response.json()
+        assert len(output["data"]) <= 2
+        values.extend(row["value"] for row in output["data"])
+        cursor = output["next_cursor"]
+        if cursor is None:
+            break
+
+    assert values == [0, 1, 2, 3, 10, 11]
+    assert pages == 4
+    requests = [
+        c.args[0] for c in mock_omnia_service.api.get_multi_datapoints.call_args_list
+    ]
+    assert len(requests) == pages
+    assert [item["id"] for item in requests[0]] == ["series_a", "series_b"]
+
+
+def test_co2_measurements_page_rejects_foreign_cursor(
+    test_client: TestClient, mock_omnia_service: OmniaService
+) -> None:
+    mock_omnia_service.api.get_multi_datapoints = Mock(
+        side_effect=lambda request: {
+            "data": {
+                "items": [
+                    {"id": item["id"], "datapoints": [datapoint] * item["limit"]}
+                    for item in request
+                ]
+            }
+        }
+    )
+    first = test_client.post(
+        "/timeseries/get-co2-measurements/page",
+        json={**_measurements_window(), "page_size": 1},
+    ).json()
+    assert first["next_cursor"] is not None
+
+    response = test_client.post(
+        "/timeseries/get-co2-measurements/page",
+        json={
+            **_measurements_window(),
+            "facility": "another facility",
+            "cursor": first["next_cursor"],
+        },
+    )
+    assert response.status_code == 400
+
+    response = test_client.post(
+        "/timeseries/get-co2-measurements/page",
+        json={**_measurements_window(), "cursor": "not-a-cursor"},
+    )
+    assert response.status_code == 400
+
+
+def test_get_co2_concentrations_resolves_all_tasks_in_one_read(
+    test_client: TestClient, mock_omnia_service: OmniaService
+) -> None:
+    task_start = datetime.fromisoformat("2025-08-28T12:00:00+00:00")
+    datapoints: list[AggregateModel] = [
+        {"time": "2025-08-28T12:00:30Z", "value": 0.4, "status": 192},
+        {"time": "2025-08-28T13:00:10Z", "value": 0.5, "status": 192},
+        {"time": "2025-08-28T13:00:20Z", "value": 0.6, "status": 192},
+    ]
+
+    def get_multi_datapoints(request: list[dict]) -> GetAggregatesResponseModel:
+        assert len({item["id"] for item in request}) == len(request)
+        items = [
+            {
+                "id": item["id"],
+                "datapoints": [
+                    dp
+                    for dp in datapoints
+                    if item["startTime"]
+                    <= datetime.fromisoformat(dp["time"]).isoformat()
+                    <= item["endTime"]
+                ],
+            }
+            for item in request
+        ]
+        return {"data": {"items": items}, "count": None, "continuationToken": None}
+
+    mock_omnia_service.api.get_multi_datapoints = Mock(side_effect=get_multi_datapoints)
+    name: str = search_timeseries_inner_value["name"]
+
+    def task(inspection_name: str, hours: int) -> dict:
+        start = task_start + timedelta(hours=hours)
+        return {
+            "inspection_name": inspection_name,
+            "task_start_time": start.isoformat(),
+            "task_end_time": (start + timedelta(minutes=1)).isoformat(),
+        }
+
+    response = test_client.post(
+        "/timeseries/get-co2-concentrations",
+        json={
+            "facility": facility,
+            "tasks": [task(name, 0), task(name, 1), task(name, 2), task("unknown", 0)],
+        },
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["status_code"] for r in results] == [200, 400, 404, 404]
+    assert results[0]["value"] == 0.4
+    assert mock_omnia_service.api.search_timeseries.call_count == 1
+    # The same series is read for three windows, which need three requests
+    assert mock_omnia_service.api.get_multi_datapoints.call_count == 3
+    mock_omnia_service.api.get_timeseries_by_id.assert_not_called()
+
+
+def test_get_co2_concentration_stops_reading_after_two_datapoints(
+    test_client: TestClient, mock_omnia_service: OmniaService
+) -> None:
+    response = test_client.post(
+        "/timeseries/get-co2-concentration",
+        json={
+            "facility": facility,
+            "inspection_name": search_timeseries_inner_value["name"],
+            "task_start_time": _measurements_window()["start_time"],
+            "task_end_time": _measurements_window()["end_time"],
+        },
+    )
+
+    assert response.status_code == 400
+    (request,) = mock_omnia_service.api.get_multi_datapoints.call_args.args
+    assert all(item["limit"] == 2 for item in request)
+    mock_omnia_service.api.get_timeseries_by_id.assert_not_called()
+
+
+def test_explain_co2_measurements_reports_estimated_and_actual_cost(
+    test_client: TestClient,
+) -> None:
+    estimated = test_client.post(
+        "/timeseries/get-co2-measurements/explain", json=_measurements_window()
+    ).json()
+    assert estimated["source"] == "live"
+    assert estimated["series_count"] == 2
+    assert estimated["actual_rows"] is None
+
+    analyzed = test_client.post(
+        "/timeseries/get-co2-measurements/explain?analyze=true",
+        json=_measurements_window(),
+    ).json()
+    assert analyzed["actual_rows"] == 4
+    assert analyzed["actual_seconds"] >= 0
+
+    # The window is closed, so the executed read is now served from cache
+    cached = test_client.post(
+        "/timeseries/get-co2-measurements/explain", json=_measurements_window()
+    ).json()
+    assert cached["source"] == "cache"
+    assert cached["requests"] == 0
+
+
+def test_open_circuit_returns_service_unavailable_with_retry_after(
+    test_client: TestClient, mock_omnia_service: OmniaService
+) -> None:
+    mock_omnia_service.read_guard.breaker.state = BreakerState.OPEN
+    mock_omnia_service.read_guard.breaker._opened_at = time.monotonic()
+
+    response = test_client.post(
+        "/timeseries/get-co2-measurements", json=_measurements_window()
+    )
+
+    assert response.status_code == 503
+    assert int(response.headers["retry-after"]) > 0
+    mock_omnia_service.api.search_timeseries.assert_not_called()
+
+
+def test_readiness_reports_saturated_ingest(
+    mock_omnia_service: OmniaService,
+) -> None:
+    timeseries_service = TimeseriesService(omnia_service=mock_omnia_service)
+    ingest_admission = AdmissionQueue("ingest", max_in_flight=1, max_bytes=1024)
+    api: API = API(
+        timeseries_controller=TimeseriesController(
+            timeseries_service=timeseries_service
+        ),
+        insights_controller=InsightsController(
+            insights_service=InsightsService(timeseries_service=timeseries_service)
+        ),
+        ingest_admission=ingest_admission,
+    )
+    client = TestClient(api.create_app())
+    assert client.get("/health/ready").json()["status"] == "ready"
+
+    ingest_admission.try_admit(100)
+    response = client.get("/health/ready")
+
+    assert response.status_code == 503
+    assert response.json() == {
+        "status": "saturated",
+        "ingest_in_flight": 1,
+        "ingest_outstanding_bytes": 100,
+    }
+
+
+def test_consolidation_by_query_answers_not_modified(test_client: TestClient) -> None:
+    consolidated = pd.DataFrame(
+        [{"robot_name": robot_name, "tag_id": tag_id, "value_mean": 0.5}]
+    )
+    params: dict = {**_measurements_window(), "statistics": ["mean"]}
+
+    with patch.object(
+        InsightsService, "consolidate_co2_measurements", return_value=consolidated
+    ) as consolidate:
+        first = test_client.get("/insights/consolidate-co2-measurements", params=params)
+        repeat = test_client.get(
+            "/insights/consolidate-co2-measurements",
+            params=params,
+            headers={"If-None-Match": first.headers["etag"]},
+        )
+
+    assert first.status_code == 200
+    assert first.json() == [
+        {"robot_name": robot_name, "tag_id": tag_id, "value_mean": 0.5}
+    ]
+    assert first.headers["etag"].startswith('"')
+    assert repeat.status_code == 304
+    assert repeat.headers["etag"] == first.headers["etag"]
+    assert consolidate.call_args.kwargs["statistics"] == ["mean"]
@@ -0,0 +1,51 @@
+from datetime import UTC, datetime, timedelta
+
+from sara_timeseries.modules.sara_timeseries_api.omnia_service import (
+    format_processing_interval,
+)
+from sara_timeseries.modules.sara_timeseries_insights.consolidation_planner import (
+    ReadPath,
+    plan_consolidation_read,
+)
+from sara_timeseries.modules.sara_timeseries_insights.models import (
+    ConsolidationStatistic,
+)
+
+start_time = datetime(2025, 7, 1, tzinfo=UTC)
+
+
+def test_plan_uses_raw_data_for_order_statistics() -> None:
+    plan = plan_consolidation_read(
+        start_time,
+        start_time + timedelta(days=30),
+        [ConsolidationStatistic.MEAN, ConsolidationStatistic.P95],
+        min_aggregate_window=timedelta(days=1),
+    )
+
+    assert plan.path == ReadPath.RAW
+    assert "p95" in plan.reason
+
+
+def test_plan_uses_raw_data_for_short_windows() -> None:
+    plan = plan_consolidation_read(
+        start_time,
+        start_time + timedelta(hours=2),
+        [ConsolidationStatistic.MEAN],
+        min_aggregate_window=timedelta(days=1),
+    )
+
+    assert plan.path == ReadPath.RAW
+
+
+def test_plan_uses_aggregates_for_long_windows() -> None:
+    plan = plan_consolidation_read(
+        start_time,
+        start_time + timedelta(days=30),
+        [ConsolidationStatistic.MAX, ConsolidationStatistic.STD],
+        min_aggregate_window=timedelta(days=1),
+    )
+
+    assert plan.path == ReadPath.AGGREGATE
+    assert set(plan.aggregate_functions) == {"count", "avg", "max", "stddev"}
+    assert plan.processing_interval is not None
+    assert format_processing_interval(plan.processing_interval) == "1d"
@@ -1,23 +1,36 @@
+import io
 import json
 import math
 import os
 import webbrowser
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 from unittest.mock import MagicMock
 
+import numpy as np
 import pandas as pd
 import pytest
 from pandas.core.interchange.dataframe_protocol import DataFrame
+from PIL import Image
 from pytest_mock import MockerFixture
 
+from sara_timeseries.core.cache import MemoryCache, TieredCache
+from sara_timeseries.core.single_flight import SingleFlight
 from sara_timeseries.modules.sara_timeseries_api.models import DatapointsResponseModel
+from sara_timeseries.modules.sara_timeseries_insights import (
+    insights_service as insights_service_module,
+)
 from sara_timeseries.modules.sara_timeseries_insights.insights_service import (
     InsightsService,
 )
 from sara_timeseries.modules.sara_timeseries_insights.models import (
+    ConsolidationStatistic,
     InsightsRequest,
+    ReportFormat,
+    ReportOptions,
+    ResampleInterval,
 )
+from sara_timeseries.modules.sara_timeseries_insights.report_cache import ReportCache
 from sara_timeseries.modules.sara_timeseries_insights.visualize_gas_concentration import (
     MapCorners,
     Position,
@@ -31,6 +44,11 @@ def insights_service() -> InsightsService:
     class MockInsightsService(InsightsService):
         def __init__(self) -> None:
             self.timeseries_service = timeseries_service_mock
+            self.report_cache = ReportCache(
+                cache=TieredCache(memory=MemoryCache(max_entries=4))
+            )
+            self.surface_cache = MemoryCache(max_entries=4)
+            self.consolidation_flight = SingleFlight("test")
 
     insights_service = MockInsightsService()
     return insights_service
@@ -62,6 +80,41 @@ def test_consolidate_co2_measurements(insights_service: InsightsService) -> None
     assert math.isclose(df.loc[0, "value_p75"], 1.7461, abs_tol=0.01)
 
 
+@pytest.mark.parametrize(
+    "interval, expected_buckets",
+    [(ResampleInterval.HOUR, 3), (ResampleInterval.DAY, 2), (ResampleInterval.WEEK, 1)],
+)
+def test_resample_co2_measurements_groups_by_inspection_and_bucket(
+    insights_service: InsightsService,
+    interval: ResampleInterval,
+    expected_buckets: int,
+) -> None:
+    rows: list[dict] = _read_co2_test_data()[:3]
+    # Wednesday 10:00, Wednesday 11:00 and Thursday 10:00
+    for row, row_time in zip(
+        rows,
+        ["2025-08-27T10:15:00Z", "2025-08-27T11:15:00Z", "2025-08-28T10:15:00Z"],
+        strict=True,
+    ):
+        row["time"] = row_time
+    insights_service.timeseries_service.get_co2_measurements.return_value = (  # type: ignore
+        DatapointsResponseModel(data=rows)
+    )
+
+    df: DataFrame = insights_service.resample_co2_measurements(
+        facility="FACILITY",
+        start_time=datetime.now(UTC),
+        end_time=datetime.now(UTC),
+        interval=interval,
+    )
+
+    assert df.shape[0] == expected_buckets
+    assert df["value_count"].sum() == 3
+    if interval == ResampleInterval.WEEK:
+        assert df.loc[0, "bucket_start"] == pd.Timestamp("2025-08-25T00:00:00Z")
+        assert math.isclose(df.loc[0, "value_mean"], sum(r["value"] for r in rows) / 3)
+
+
 def _read_co2_test_data() -> list[dict]:
     data: list[dict]
     with open(
@@ -73,7 +126,7 @@ def _read_co2_test_data() -> list[dict]:
     return data
 
 
-def mock_get_map_and_corners() -> tuple[bytes, MapCorners]:
+def mock_get_map_and_corners() -> tuple[bytes, MapCorners, str]:
     corners = MapCorners(
         top_left=Position(east=68, north=322),
         top_right=Position(east=374, north=322),
@@ -84,7 +137,7 @@ def mock_get_map_and_corners() -> tuple[bytes, MapCorners]:
         "tests/modules/sara_timeseries_insights/test_data/map.jpeg"
     ).read_bytes()
 
-    return image_jpg, corners
+    return image_jpg, corners, '"0x8DCMAPETAG"'
 
 
 def mock_consolidate_co2_measurements() -> DataFrame:
@@ -120,6 +173,126 @@ def test_create_html_report(
     assert html is not None
 
 
+def test_create_html_report_is_cached_for_closed_window(
+    insights_service: InsightsService, mocker: MockerFixture
+) -> None:
+    consolidate = mocker.patch.object(
+        insights_service,
+        "consolidate_co2_measurements",
+        return_value=mock_consolidate_co2_measurements(),
+    )
+    mocker.patch(
+        "sara_timeseries.modules.sara_timeseries_insights.insights_service.get_map_and_corners",
+        lambda facility: mock_get_map_and_corners(),
+    )
+    render = mocker.spy(insights_service_module, "generate_gas_visualization_html")
+    end_time = datetime.now(UTC) - timedelta(days=2)
+    start_time = end_time - timedelta(days=1)
+
+    first: bytes = insights_service.create_CO2_report(
+        facility="FACILITY", start_time=start_time, end_time=end_time
+    )
+    second: bytes = insights_service.create_CO2_report(
+        facility="FACILITY", start_time=start_time, end_time=end_time
+    )
+
+    assert first == second
+    assert consolidate.call_count == 1
+    assert render.call_count == 1
+
+
+def test_create_html_report_is_rerendered_when_open_window_data_changes(
+    insights_service: InsightsService, mocker: MockerFixture
+) -> None:
+    consolidated: DataFrame = mock_consolidate_co2_measurements()
+    changed: DataFrame = consolidated.copy()
+    changed["value_mean"] = changed["value_mean"] + 1
+    consolidate = mocker.patch.object(
+        insights_service,
+        "consolidate_co2_measurements",
+        side_effect=[consolidated, consolidated, changed],
+    )
+    mocker.patch(
+        "sara_timeseries.modules.sara_timeseries_insights.insights_service.get_map_and_corners",
+        lambda facility: mock_get_map_and_corners(),
+    )
+    render = mocker.spy(insights_service_module, "generate_gas_visualization_html")
+    end_time = datetime.now(UTC)
+    start_time = end_time - timedelta(days=1)
+
+    for _ in range(3):
+        insights_service.create_CO2_report(
+            facility="FACILITY", start_time=start_time, end_time=end_time
+        )
+
+    assert consolidate.call_count == 3
+    assert render.call_count == 2
+
+
+def test_create_html_report_with_interpolation_reuses_surfaces(
+    insights_service: InsightsService, mocker: MockerFixture
+) -> None:
+    mocker.patch.object(
+        insights_service,
+        "consolidate_co2_measurements",
+        return_value=mock_consolidate_co2_measurements(),
+    )
+    mocker.patch(
+        "sara_timeseries.modules.sara_timeseries_insights.insights_service.get_map_and_corners",
+        lambda facility: mock_get_map_and_corners(),
+    )
+    interpolate = mocker.spy(insights_service_module, "compute_interpolated_surfaces")
+    end_time = datetime.now(UTC)
+
+    for spatial_grid in (False, True):
+        html: bytes = insights_service.create_CO2_report(
+            facility="FACILITY",
+            start_time=end_time - timedelta(days=1),
+            end_time=end_time,
+            options=ReportOptions(
+                interpolation=True,
+                interpolation_resolution=2.0,
+                spatial_grid=spatial_grid,
+            ),
+        )
+        assert b"heatmap" in html
+
+    assert interpolate.call_count == 1
+
+
+@pytest.mark.parametrize("report_format", [ReportFormat.PNG, ReportFormat.WEBP])
+def test_create_raster_report(
+    insights_service: InsightsService,
+    mocker: MockerFixture,
+    report_format: ReportFormat,
+) -> None:
+    mocker.patch.object(
+        insights_service,
+        "consolidate_co2_measurements",
+        return_value=mock_consolidate_co2_measurements(),
+    )
+    mocker.patch(
+        "sara_timeseries.modules.sara_timeseries_insights.insights_service.get_map_and_corners",
+        lambda facility: mock_get_map_and_corners(),
+    )
+
+    report: bytes = insights_service.create_CO2_report(
+        facility="FACILITY",
+        start_time=datetime.now(UTC),
+        end_time=datetime.now(UTC),
+        options=ReportOptions(
+            report_format=report_format,
+            interpolation=True,
+            interpolation_resolution=5.0,
+        ),
+    )
+
+    with Image.open(io.BytesIO(report)) as image:
+        assert image.format == report_format.value.upper()
+        assert image.width == 1600 + 110
+        assert image.height > 3 * 1200
+
+
 @pytest.mark.skip(reason="Manual test that generates a HTML page")
 def test_view_co2_report(
     insights_service: InsightsService, mocker: MockerFixture
@@ -146,3 +319,59 @@ def test_view_co2_report(
     path = os.path.abspath(filename)
     url = "file://" + path
     webbrowser.open(url)
+
+
+def test_consolidate_long_window_uses_server_side_aggregates(
+    insights_service: InsightsService,
+) -> None:
+    start_time = datetime(2025, 7, 1, tzinfo=UTC)
+    end_time = start_time + timedelta(days=3)
+    template: dict = _read_co2_test_data()[0]
+    rng = np.random.default_rng(0)
+    raw: list[dict] = [
+        {
+            **template,
+            "time": (start_time + timedelta(minutes=17 * i)).isoformat(),
+            "value": float(rng.random()),
+        }
+        for i in range(200)
+    ]
+    raw_frame = pd.DataFrame(raw)
+    raw_frame["time"] = pd.to_datetime(raw_frame["time"])
+    buckets = raw_frame.groupby(raw_frame["time"].dt.floor("h"))["value"]
+    aggregates: list[dict] = [
+        {**template, "time": bucket.isoformat(), **values}
+        for bucket, values in buckets.agg(
+            count="count", avg="mean", min="min", max="max", stddev="std"
+        )
+        .to_dict("index")
+        .items()
+    ]
+    insights_service.timeseries_service.get_co2_measurement_aggregates.return_value = (  # type: ignore
+        aggregates
+    )
+    insights_service.timeseries_service.get_co2_measurements.return_value = (  # type: ignore
+        DatapointsResponseModel(data=raw)
+    )
+    statistics = [
+        ConsolidationStatistic.MEAN,
+        ConsolidationStatistic.MIN,
+        ConsolidationStatistic.MAX,
+        ConsolidationStatistic.STD,
+        ConsolidationStatistic.COUNT,
+    ]
+
+    from_aggregates: DataFrame = insights_service.consolidate_co2_measurements(
+        "FACILITY", start_time, end_time, statistics=statistics
+    )
+    from_raw: DataFrame = insights_service.consolidate_co2_measurements(
+        "FACILITY", start_time, start_time + timedelta(hours=1), statistics=statistics
+    )
+
+    kwargs = insights_service.timeseries_service.get_co2_measurement_aggregates.call_args.kwargs  # type: ignore
+    assert kwargs["processing_interval"] == timedelta(hours=1)
+    assert "value_median" not in from_aggregates.columns
+    for column in ("value_mean", "value_min", "value_max", "value_std", "value_count"):
+        assert math.isclose(
+            from_aggregates.loc[0, column], from_raw.loc[0, column], rel_tol=1e-9
+        )
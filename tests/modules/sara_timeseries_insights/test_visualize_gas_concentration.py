@@ -0,0 +1,197 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from sara_timeseries.modules.sara_timeseries_insights.visualize_gas_concentration import (
+    MapCorners,
+    Position,
+    aggregate_positions_on_grid,
+    compute_grid_cell_size,
+    compute_idw_surface,
+    compute_idw_surfaces,
+    compute_interpolated_surfaces,
+    make_gas_concentration_figure,
+)
+
+corners = MapCorners(
+    top_left=Position(east=68, north=322),
+    top_right=Position(east=374, north=322),
+    bottom_left=Position(east=68, north=90),
+    bottom_right=Position(east=374, north=90),
+)
+
+
+def _consolidated(rows: list[tuple[str, float, float, float, int]]) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {
+                "inspection_description": description,
+                "time_min": "2025-07-17T11:49:29+00:00",
+                "time_max": "2025-07-17T20:49:29+00:00",
+                "unit": "% v/v",
+                "value_mean": mean,
+                "value_max": maximum,
+                "value_std": std,
+                "value_count": count,
+            }
+            for description, mean, maximum, std, count in rows
+        ]
+    )
+
+
+def test_compute_grid_cell_size_follows_floorplan_extent() -> None:
+    cell_size: float = compute_grid_cell_size(
+        corners, pd.DataFrame(), target_cells_along_longest_axis=64
+    )
+    assert cell_size == 5.0
+    assert compute_grid_cell_size(None, pd.DataFrame({"E": [1.0], "N": [1.0]})) == 1.0
+
+
+def test_aggregate_positions_on_grid_combines_metrics_per_cell() -> None:
+    dataframe = pd.DataFrame(
+        {
+            "E": [0.5, 1.5, 12.0],
+            "N": [0.5, 1.5, 12.0],
+            "value_mean": [1.0, 4.0, 2.0],
+            "value_max": [2.0, 5.0, 3.0],
+            "value_std": [0.0, 0.0, 0.5],
+            "value_count": [3, 1, 2],
+            "unit": ["% v/v"] * 3,
+        }
+    )
+
+    grid: pd.DataFrame = aggregate_positions_on_grid(dataframe, cell_size=10.0)
+    grid = grid.sort_values("E").reset_index(drop=True)
+
+    assert grid.shape[0] == 2
+    assert list(grid["E"]) == [5.0, 15.0]
+    assert list(grid["positions"]) == [2, 1]
+    assert list(grid["value_count"]) == [4, 2]
+    assert math.isclose(grid.loc[0, "value_mean"], (1.0 * 3 + 4.0 * 1) / 4)
+    assert grid.loc[0, "value_max"] == 5.0
+    expected_std = float(np.std([1.0, 1.0, 1.0, 4.0], ddof=1))
+    assert math.isclose(grid.loc[0, "value_std"], expected_std)
+    assert math.isclose(grid.loc[1, "value_std"], 0.5)
+
+
+def test_make_gas_concentration_figure_with_spatial_grid_reduces_markers() -> None:
+    dataframe = _consolidated(
+        [
+            ("CO2 E100 N100", 0.1, 0.2, 0.01, 10),
+            ("CO2 E101 N101", 0.3, 0.4, 0.01, 10),
+            ("CO2 E300 N300", 0.2, 0.3, 0.01, 10),
+        ]
+    )
+
+    figure = make_gas_concentration_figure(
+        dataframe, corners=corners, spatial_grid=True, grid_cell_size=10.0
+    )
+
+    assert len(figure.data[0].x) == 2
+    assert figure.data[0].marker.symbol == "square"
+
+
+def test_compute_idw_surface_matches_points_and_respects_max_distance() -> None:
+    grid_east = np.arange(0.0, 21.0, 1.0)
+    grid_north = np.array([0.0])
+
+    surface: np.ndarray = compute_idw_surface(
+        np.array([0.0, 10.0]),
+        np.array([0.0, 0.0]),
+        np.array([1.0, 3.0]),
+        grid_east=grid_east,
+        grid_north=grid_north,
+        max_distance=5.0,
+        max_chunk_bytes=64,
+    )
+
+    assert surface.shape == (1, 21)
+    assert surface[0, 0] == 1.0
+    assert surface[0, 10] == 3.0
+    assert math.isclose(float(surface[0, 5]), 2.0, rel_tol=1e-6)
+    assert 1.0 < surface[0, 3] < 2.0
+    assert np.isnan(surface[0, 20])
+
+
+def test_compute_idw_surface_is_independent_of_chunk_size() -> None:
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0, 100, size=(2, 50))
+    values = rng.uniform(0, 1, size=50)
+    grid = np.linspace(0, 100, 40)
+
+    small_chunks = compute_idw_surface(
+        points[0],
+        points[1],
+        values,
+        grid_east=grid,
+        grid_north=grid,
+        max_chunk_bytes=1024,
+    )
+    single_chunk = compute_idw_surface(
+        points[0], points[1], values, grid_east=grid, grid_north=grid
+    )
+
+    np.testing.assert_allclose(small_chunks, single_chunk, equal_nan=True)
+
+
+def test_compute_idw_surfaces_matches_per_metric_surfaces() -> None:
+    rng = np.random.default_rng(0)
+    points = rng.integers(0, 20, size=(2, 60)).astype(float)
+    values = rng.uniform(0, 1, size=(60, 3))
+    values[rng.uniform(size=values.shape) < 0.2] = np.nan
+    grid = np.arange(0.0, 20.0, 0.5)
+
+    surfaces = compute_idw_surfaces(
+        points[0],
+        points[1],
+        values,
+        grid_east=grid,
+        grid_north=grid,
+        max_distance=3.0,
+        max_chunk_bytes=4096,
+    )
+
+    for metric in range(values.shape[1]):
+        np.testing.assert_allclose(
+            surfaces[metric],
+            compute_idw_surface(
+                points[0],
+                points[1],
+                values[:, metric],
+                grid_east=grid,
+                grid_north=grid,
+                max_distance=3.0,
+            ),
+            rtol=1e-6,
+            equal_nan=True,
+        )
+
+
+def test_make_gas_concentration_figure_draws_heatmaps_under_markers() -> None:
+    dataframe = _consolidated(
+        [
+            ("CO2 E100 N100", 0.1, 0.2, 0.01, 10),
+            ("CO2 E200 N200", 0.3, 0.4, 0.01, 10),
+        ]
+    )
+    metrics = ("value_mean", "value_max")
+    surfaces = compute_interpolated_surfaces(
+        dataframe, metrics, corners, resolution=4.0
+    )
+
+    figure = make_gas_concentration_figure(
+        dataframe,
+        metric_columns=metrics,
+        corners=corners,
+        interpolated_surfaces=surfaces,
+    )
+
+    assert [trace.type for trace in figure.data] == [
+        "heatmap",
+        "heatmap",
+        "scattergl",
+        "scattergl",
+    ]
+    buttons = figure.layout.updatemenus[0].buttons
+    assert buttons[1].args[0]["visible"] == [False, True, False, True]
@@ -0,0 +1,136 @@
+import hashlib
+import time
+from datetime import UTC, datetime
+from typing import Any
+
+import anyio
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi.security import SecurityScopes
+from fastapi_azure_auth import SingleTenantAzureAuthorizationCodeBearer
+from fastapi_azure_auth.user import User
+from pytest import MonkeyPatch
+from starlette.requests import Request
+
+from sara_timeseries.authentication import CachingAzureAuthorizationCodeBearer
+from sara_timeseries.core.cache import MemoryCache
+
+CLIENT_ID = "dd7e115a-037e-4846-99c4-07561158a9cd"
+ISSUER = "https://login.microsoftonline.com/tenant/v2.0"
+SCOPE = "user_impersonation"
+
+private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def create_scheme(
+    scheme_class: type[SingleTenantAzureAuthorizationCodeBearer],
+    **kwargs: Any,
+) -> SingleTenantAzureAuthorizationCodeBearer:
+    scheme = scheme_class(
+        app_client_id=CLIENT_ID,
+        tenant_id="tenant",
+        scopes={f"api://{CLIENT_ID}/{SCOPE}": SCOPE},
+        **kwargs,
+    )
+    config = scheme.openid_config
+    config.signing_keys = {"key": private_key.public_key()}
+    config.issuer = ISSUER
+    config.authorization_endpoint = f"{ISSUER}/authorize"
+    config.token_endpoint = f"{ISSUER}/token"
+    config._config_timestamp = datetime.now()  # noqa: DTZ005
+    return scheme
+
+
+def create_token(expires_in: int = 3600) -> tuple[str, int]:
+    now: int = int(time.time())
+    exp: int = now + expires_in
+    token: str = jwt.encode(
+        {
+            "aud": CLIENT_ID,
+            "iss": ISSUER,
+            "iat": now,
+            "nbf": now,
+            "exp": exp,
+            "sub": "subject",
+            "ver": "2.0",
+            "scp": "user_impersonation",
+            "roles": ["PlantData.Read"],
+        },
+        private_key,
+        algorithm="RS256",
+        headers={"kid": "key"},
+    )
+    return token, exp
+
+
+def create_request(token: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "headers": [(b"authorization", f"Bearer {token}".encode())],
+        }
+    )
+
+
+def authenticate(
+    scheme: SingleTenantAzureAuthorizationCodeBearer, token: str, scopes: list[str]
+) -> User | None:
+    async def call() -> User | None:
+        return await scheme(create_request(token), SecurityScopes(scopes))
+
+    return anyio.run(call)
+
+
+def test_validated_token_is_served_from_cache_until_exp(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    cache = MemoryCache(max_entries=8)
+    scheme = create_scheme(CachingAzureAuthorizationCodeBearer, token_cache=cache)
+    validations: list[str] = []
+    validate = scheme.validate
+
+    def counting_validate(access_token: str, **kwargs: Any) -> dict[str, Any]:
+        validations.append(access_token)
+        return validate(access_token=access_token, **kwargs)
+
+    monkeypatch.setattr(scheme, "validate", counting_validate)
+    token, exp = create_token()
+
+    first = authenticate(scheme, token, [SCOPE])
+    second = authenticate(scheme, token, [SCOPE])
+    authenticate(scheme, token, [])
+
+    assert first is not None and first.roles == ["PlantData.Read"]
+    assert second is first
+    assert len(validations) == 2
+    key = f"{hashlib.sha256(token.encode()).hexdigest()}|{SCOPE}"
+    assert cache.get_with_expiry(key) == (first, exp)
+
+
+def test_invalid_token_is_not_cached() -> None:
+    cache = MemoryCache(max_entries=8)
+    scheme = create_scheme(CachingAzureAuthorizationCodeBearer, token_cache=cache)
+    token, _ = create_token()
+
+    with pytest.raises(Exception, match="Unable to validate token"):
+        authenticate(scheme, token[:-4] + "AAAA", [SCOPE])
+    assert len(cache) == 0
+
+
+def test_openid_config_is_not_reloaded_on_the_request_path(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    scheme = create_scheme(
+        CachingAzureAuthorizationCodeBearer, token_cache=MemoryCache(8)
+    )
+    scheme.openid_config._config_timestamp = datetime(2000, 1, 1, tzinfo=UTC)
+
+    async def fail() -> None:
+        raise AssertionError("OpenID config fetched on the request path")
+
+    monkeypatch.setattr(scheme.openid_config, "_load_openid_config", fail)
+
+    assert authenticate(scheme, create_token()[0], [SCOPE]) is not None
@@ -1,9 +1,19 @@
 import logging
+import os
+import random
+import time
 from uuid import uuid4
 
 from flask import Flask, jsonify, request
 
 app = Flask(__name__)
+# Injected latency: every request waits MOCK_LATENCY_SECONDS, and a fraction
+# MOCK_SLOW_RATE of them MOCK_SLOW_LATENCY_SECONDS instead, to simulate tail latency
+app.config["MOCK_LATENCY_SECONDS"] = float(os.getenv("MOCK_LATENCY_SECONDS", "0"))
+app.config["MOCK_SLOW_LATENCY_SECONDS"] = float(
+    os.getenv("MOCK_SLOW_LATENCY_SECONDS", "0")
+)
+app.config["MOCK_SLOW_RATE"] = float(os.getenv("MOCK_SLOW_RATE", "0"))
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -17,6 +27,14 @@ def _log() -> None:
         logger.error(f"Error logging JSON: {e}")
 
 
+@app.before_request
+def _inject_latency() -> None:
+    if random.random() < app.config["MOCK_SLOW_RATE"]:
+        time.sleep(app.config["MOCK_SLOW_LATENCY_SECONDS"])
+    else:
+        time.sleep(app.config["MOCK_LATENCY_SECONDS"])
+
+
 @app.route("/health", methods=["GET"])
 def health() -> tuple[str, int]:
     _log()